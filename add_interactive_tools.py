@@ -2,11 +2,11 @@
 Add Interactive BMI Calculator and Risk Assessment to Dashboard
 """
 
-import pandas as pd
+from data_index import load_index
 
 # Load the dataset for reference statistics
-df = pd.read_csv('obesity_data_cleaned.csv')
-latest_data = df[df['Survey_Year'] == 2019]
+index = load_index()
+latest_data = index.slice(year=2019)
 
 # Read the existing dashboard
 with open('obesity_dashboard_enhanced.html', 'r', encoding='utf-8') as f:
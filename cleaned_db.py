@@ -0,0 +1,118 @@
+"""
+SQLITE QUERY LAYER
+India Obesity Dashboard
+
+Thin read access to the SQLite store that the cleaning pipeline loads with
+`--sqlite`. Filters on Country, Survey_Year, Category and Subcategory are
+answered from the store's indexes, so a script pulls only the slice it
+needs instead of the whole dataset.
+
+    from cleaned_db import query_cleaned_data, query_metric_array
+
+    states = query_cleaned_data(categories='States', years=2019)
+    women = query_metric_array('Women_Overweight_Pct', categories='Total')
+
+Rows come back in load order with the same dtypes as load_cleaned_data().
+"""
+
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from data_loader import CLEANED_DTYPES
+from obesity_data_cleaning import COLUMN_ORDER, SQLITE_TABLE
+
+CLEANED_DB = 'obesity_data_cleaned.db'
+
+# Keyword argument → column it filters
+FILTER_COLUMNS = {
+    'countries': 'Country',
+    'years': 'Survey_Year',
+    'categories': 'Category',
+    'subcategories': 'Subcategory',
+}
+
+
+def _as_list(values):
+    if isinstance(values, (list, tuple, set, np.ndarray, pd.Series, pd.Index)):
+        return [value.item() if isinstance(value, np.generic) else value for value in values]
+    return [values.item() if isinstance(values, np.generic) else values]
+
+
+def _quoted(column):
+    return f'"{column}"'
+
+
+def _check_columns(columns):
+    unknown = [col for col in columns if col not in CLEANED_DTYPES]
+    if unknown:
+        raise ValueError(f"Unknown columns: {unknown}")
+
+
+def _select(db_path, columns, filters):
+    """Run one indexed SELECT of `columns` and return its rows"""
+    clauses = []
+    params = []
+    for keyword, values in filters.items():
+        if values is None:
+            continue
+        values = _as_list(values)
+        placeholders = ', '.join('?' for _ in values)
+        clauses.append(f'{_quoted(FILTER_COLUMNS[keyword])} IN ({placeholders})')
+        params.extend(values)
+
+    sql = f'SELECT {", ".join(_quoted(col) for col in columns)} FROM {SQLITE_TABLE}'
+    if clauses:
+        sql += ' WHERE ' + ' AND '.join(clauses)
+    sql += ' ORDER BY rowid'
+
+    connection = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    try:
+        return connection.execute(sql, params).fetchall()
+    finally:
+        connection.close()
+
+
+def query_cleaned_data(db_path=CLEANED_DB, columns=None, countries=None, years=None,
+                       categories=None, subcategories=None):
+    """
+    Rows of the SQLite store matching every given filter, as a DataFrame
+
+    Each filter takes a single value or a list of values; None means "any".
+    `columns` limits which columns are read (default: all in COLUMN_ORDER;
+    further indicators and SE/CI columns, when the store has them, must be
+    named).
+    """
+    columns = list(columns or COLUMN_ORDER)
+    _check_columns(columns)
+    rows = _select(db_path, columns, {
+        'countries': countries,
+        'years': years,
+        'categories': categories,
+        'subcategories': subcategories,
+    })
+
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    return df.astype({col: CLEANED_DTYPES[col] for col in columns})
+
+
+def query_metric_array(metrics, db_path=CLEANED_DB, countries=None, years=None,
+                       categories=None, subcategories=None):
+    """
+    Metric values for the matching rows as a float64 NumPy array
+
+    One metric name gives a 1-D array; a list of names gives a
+    (rows × metrics) array. Missing values are NaN.
+    """
+    names = _as_list(metrics)
+    _check_columns(names)
+    rows = _select(db_path, names, {
+        'countries': countries,
+        'years': years,
+        'categories': categories,
+        'subcategories': subcategories,
+    })
+
+    values = np.array(rows, dtype='float64').reshape(len(rows), len(names))
+    return values if isinstance(metrics, (list, tuple)) else values[:, 0]
@@ -0,0 +1,216 @@
+"""
+VECTORIZED CONFIDENCE INTERVALS
+India Obesity Dashboard
+
+Parametric bootstrap intervals for derived statistics (ratios, changes,
+trend slopes). Each estimate is redrawn from a normal distribution with
+its DHS standard error, and all replicates are drawn at once as one
+(replicates × series) NumPy array, so derived statistics are plain array
+arithmetic on replicates with no per-replicate Python loop.
+
+Standard errors are read per metric from either
+- `<metric>_SE`, or
+- `<metric>_CI_Low` / `<metric>_CI_High` (95% bounds; SE = width / 2z).
+
+The cleaning pipeline carries these through from an export made with
+standard errors or confidence intervals switched on ("<metric header> SE",
+"... CI low", "... CI high"; see RAW_UNCERTAINTY_NAMES), and
+load_cleaned_data() keeps them. The bundled export has neither, so
+has_uncertainty() is False for it and the *_intervals() helpers raise
+ValueError.
+
+    if has_uncertainty(df):
+        ratios = gap_intervals(df, 'urban_rural', 'Women_Overweight_Pct')
+        changes = absolute_change_intervals(df)
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from gap_metrics import GAP_DEFINITIONS, compute_gaps
+from obesity_data_cleaning import CI_HIGH_SUFFIX, CI_LOW_SUFFIX, METRIC_COLUMNS, SE_SUFFIX
+from trends import series_matrix
+
+# Two-sided 95% normal quantile
+Z_95 = 1.959963984540054
+
+DEFAULT_REPLICATES = 10000
+
+# Replicates are processed in blocks of this many for slopes, to bound memory
+SLOPE_BLOCK = 1000
+
+
+def standard_errors(df, metrics=None):
+    """
+    Standard error of each metric value, as a frame shaped like df[metrics]
+
+    Returns None if any metric has neither an SE column nor both CI columns.
+    """
+    metrics = metrics or METRIC_COLUMNS
+    errors = {}
+    for metric in metrics:
+        if metric + SE_SUFFIX in df.columns:
+            errors[metric] = pd.to_numeric(df[metric + SE_SUFFIX], errors='coerce')
+        elif metric + CI_LOW_SUFFIX in df.columns and metric + CI_HIGH_SUFFIX in df.columns:
+            low = pd.to_numeric(df[metric + CI_LOW_SUFFIX], errors='coerce')
+            high = pd.to_numeric(df[metric + CI_HIGH_SUFFIX], errors='coerce')
+            errors[metric] = (high - low) / (2 * Z_95)
+        else:
+            return None
+    return pd.DataFrame(errors, index=df.index)
+
+
+def has_uncertainty(df, metrics=None):
+    """True if every metric has SE or CI columns"""
+    return standard_errors(df, metrics) is not None
+
+
+def _require_errors(df, metrics):
+    errors = standard_errors(df, metrics)
+    if errors is None:
+        raise ValueError(f"No {SE_SUFFIX} or {CI_LOW_SUFFIX}/{CI_HIGH_SUFFIX} columns for: {metrics}")
+    return errors
+
+
+def draw_replicates(estimates, errors, n_replicates=DEFAULT_REPLICATES, seed=None):
+    """
+    Normal replicates of every estimate at once: shape (n_replicates, n_series)
+
+    A missing standard error gives NaN replicates for that series. `seed`
+    may also be a numpy Generator, to share one stream across calls.
+    """
+    estimates = np.asarray(estimates, dtype='float64')
+    errors = np.asarray(errors, dtype='float64')
+    rng = np.random.default_rng(seed)
+    return estimates + errors * rng.standard_normal((n_replicates, estimates.size))
+
+
+def percentile_interval(replicates, level=0.95):
+    """(low, high) percentile bounds of every column of a replicate array"""
+    tail = (1 - level) / 2 * 100
+    with warnings.catch_warnings():
+        # Series without an estimate or SE are all-NaN columns and stay NaN
+        warnings.simplefilter('ignore', RuntimeWarning)
+        low, high = np.nanpercentile(replicates, [tail, 100 - tail], axis=0)
+    return low, high
+
+
+def ratio_intervals(high, high_se, low, low_se, n_replicates=DEFAULT_REPLICATES, level=0.95, seed=None):
+    """Percentile interval of high / low for every pair of series"""
+    rng = np.random.default_rng(seed)
+    high_reps = draw_replicates(high, high_se, n_replicates, rng)
+    low_reps = draw_replicates(low, low_se, n_replicates, rng)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = np.where(low_reps > 0, high_reps / low_reps, np.nan)
+    return percentile_interval(ratios, level)
+
+
+def change_intervals(first, first_se, last, last_se, n_replicates=DEFAULT_REPLICATES, level=0.95, seed=None):
+    """Percentile interval of last - first for every series"""
+    rng = np.random.default_rng(seed)
+    changes = draw_replicates(last, last_se, n_replicates, rng) - draw_replicates(first, first_se, n_replicates, rng)
+    return percentile_interval(changes, level)
+
+
+def slope_weights(years, values):
+    """
+    Per-series weights c so that the least-squares slope is (c * values).sum(axis=1)
+
+    The slope is linear in the values, so replicate slopes are one matrix
+    product per block of replicates. Missing rounds get zero weight.
+    """
+    observed = ~np.isnan(values)
+    count = observed.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_year = (observed * years).sum(axis=1, keepdims=True) / count
+        centred = np.where(observed, years - mean_year, 0.0)
+        weights = centred / (centred ** 2).sum(axis=1, keepdims=True)
+    return np.where(np.isfinite(weights), weights, np.nan)
+
+
+def slope_intervals(years, values, errors, n_replicates=DEFAULT_REPLICATES, level=0.95, seed=None):
+    """
+    Percentile interval of the trend slope for every row of a (series × years) matrix
+
+    Replicate matrices are drawn SLOPE_BLOCK replicates at a time; each
+    block's slopes come from one einsum against slope_weights().
+    """
+    rng = np.random.default_rng(seed)
+    weights = slope_weights(years, values)
+    filled = np.where(np.isnan(values), 0.0, values)
+    spread = np.where(np.isnan(values), 0.0, errors)
+
+    slopes = np.empty((n_replicates, len(values)))
+    for start in range(0, n_replicates, SLOPE_BLOCK):
+        block = min(SLOPE_BLOCK, n_replicates - start)
+        noise = rng.standard_normal((block,) + values.shape)
+        slopes[start:start + block] = np.einsum('rsy,sy->rs', filled + spread * noise, np.nan_to_num(weights))
+    slopes[:, np.isnan(weights).any(axis=1)] = np.nan
+    return percentile_interval(slopes, level)
+
+
+def _series_matrices(df, metrics):
+    """series_matrix() of the values plus the matching (series × years) matrix of standard errors"""
+    errors = _require_errors(df, metrics)
+    keys, years, values = series_matrix(df, metrics)
+    error_keys, error_years, error_values = series_matrix(df.assign(**errors), metrics)
+    aligned = pd.DataFrame(error_values, index=pd.MultiIndex.from_frame(error_keys), columns=error_years)
+    error_matrix = aligned.reindex(index=pd.MultiIndex.from_frame(keys), columns=years).to_numpy()
+    return keys, years, values, error_matrix
+
+
+def trend_intervals(df, metrics=None, n_replicates=DEFAULT_REPLICATES, level=0.95, seed=None):
+    """Slope interval for every (Country, Category, Subcategory, Metric) series"""
+    metrics = metrics or METRIC_COLUMNS
+    keys, years, values, error_matrix = _series_matrices(df, metrics)
+
+    low, high = slope_intervals(years, values, error_matrix, n_replicates, level, seed)
+    result = keys.copy()
+    result['Slope_Low'] = low
+    result['Slope_High'] = high
+    return result
+
+
+def absolute_change_intervals(df, metrics=None, n_replicates=DEFAULT_REPLICATES, level=0.95, seed=None):
+    """
+    Interval of trends.compute_trends' Absolute_Change for every series
+
+    The change is the last observed round minus the first; series observed
+    in a single round get NaN bounds.
+    """
+    metrics = metrics or METRIC_COLUMNS
+    keys, years, values, error_matrix = _series_matrices(df, metrics)
+
+    observed = ~np.isnan(values)
+    if values.size:
+        first = np.argmax(observed, axis=1)
+        last = values.shape[1] - 1 - np.argmax(observed[:, ::-1], axis=1)
+    else:
+        first = last = np.zeros(len(values), dtype='int64')
+    rows = np.arange(len(values))
+    low, high = change_intervals(values[rows, first], error_matrix[rows, first],
+                                 values[rows, last], error_matrix[rows, last], n_replicates, level, seed)
+
+    has_change = last > first
+    result = keys.copy()
+    result['Change_Low'] = np.where(has_change, low, np.nan)
+    result['Change_High'] = np.where(has_change, high, np.nan)
+    return result
+
+
+def gap_intervals(df, gap, metric, n_replicates=DEFAULT_REPLICATES, level=0.95, seed=None):
+    """Ratio interval of one gap (see gap_metrics.GAP_DEFINITIONS) for every country and round"""
+    errors = _require_errors(df, [metric])
+    gaps = {gap: GAP_DEFINITIONS[gap]}
+    estimates = compute_gaps(df, [metric], gaps)
+    spreads = compute_gaps(df.assign(**errors), [metric], gaps)
+
+    low, high = ratio_intervals(estimates['High_Value'], spreads['High_Value'],
+                                estimates['Low_Value'], spreads['Low_Value'],
+                                n_replicates, level, seed)
+    result = estimates[['Country', 'Survey_Year', 'Gap', 'Metric', 'Ratio']].copy()
+    result['Ratio_Low'] = low
+    result['Ratio_High'] = high
+    return result
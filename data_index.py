@@ -0,0 +1,93 @@
+"""
+INDEXED LOOKUPS OVER THE CLEANED DATASET
+India Obesity Dashboard
+
+ObesityIndex answers the two questions every script asks of the cleaned
+data without scanning the whole frame with boolean masks:
+
+- get(country, year, category, subcategory): one row, from a hash index on
+  the full key (O(1))
+- slice(category=..., year=..., country=...): all matching rows, from a
+  sorted MultiIndex on (Category, Survey_Year, Country) (binary search,
+  O(log n) plus the size of the result)
+
+Both return rows of the original frame with their original index labels,
+and slices keep the file's row order, so they are drop-in replacements for
+`df[(df['Category'] == ...) & (df['Survey_Year'] == ...)]` and its `.iloc[0]`.
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_loader import CLEANED_DATA_CSV, load_cleaned_data
+
+KEY_COLUMNS = ['Country', 'Survey_Year', 'Category', 'Subcategory']
+SLICE_COLUMNS = ['Category', 'Survey_Year', 'Country']
+
+
+def _key_values(series):
+    """Column values as plain Python objects, with None for missing"""
+    return series.astype(object).where(series.notna(), None)
+
+
+class ObesityIndex:
+    """Prebuilt point and range lookups over one cleaned DataFrame"""
+
+    def __init__(self, df):
+        self.df = df
+
+        keys = zip(*(_key_values(df[col]) for col in KEY_COLUMNS))
+        self._positions = {}
+        for position, key in enumerate(keys):
+            # Keep the first row for a repeated key, like .iloc[0] on a mask
+            self._positions.setdefault(key, position)
+
+        order = pd.MultiIndex.from_frame(df[SLICE_COLUMNS])
+        self._sorted = pd.Series(np.arange(len(df)), index=order).sort_index()
+
+    def __len__(self):
+        return len(self.df)
+
+    def __contains__(self, key):
+        return tuple(key) in self._positions
+
+    def get(self, country, year, category, subcategory, default=None):
+        """
+        The row for one (Country, Survey_Year, Category, Subcategory) key
+
+        Returns `default` when the key is not in the data.
+        """
+        position = self._positions.get((country, year, category, subcategory))
+        if position is None:
+            return default
+        return self.df.iloc[position]
+
+    def slice(self, category=None, year=None, country=None):
+        """
+        All rows matching the given Category / Survey_Year / Country
+
+        Each argument may be a single value, a list of values, or None for
+        "any". Like an isin() mask, values that are not in the data simply
+        match nothing. Rows come back in their original order; an empty
+        frame is returned when nothing matches.
+        """
+        index = self._sorted.index
+        selectors = []
+        for level, value in zip(index.levels, (category, year, country)):
+            if value is None:
+                selectors.append(slice(None))
+                continue
+            # get_locs raises KeyError for any absent label, so keep only labels in the data
+            values = [value] if np.ndim(value) == 0 else list(value)
+            present = [label for label in values if label in level]
+            if not present:
+                return self.df.iloc[:0]
+            selectors.append(present)
+
+        positions = np.sort(self._sorted.to_numpy()[index.get_locs(selectors)])
+        return self.df.iloc[positions]
+
+
+def load_index(csv_path=CLEANED_DATA_CSV):
+    """Load the cleaned dataset and build its ObesityIndex"""
+    return ObesityIndex(load_cleaned_data(csv_path))
@@ -0,0 +1,228 @@
+"""
+SHARED CLEANED-DATA LOADER
+India Obesity Dashboard
+
+Every analysis and dashboard script loads the cleaned dataset through
+load_cleaned_data(), so dtypes are identical everywhere.
+
+The first load parses the CSV with an explicit schema and saves a typed
+binary snapshot (pickle) next to it. Later loads read the snapshot
+directly. The snapshot is rebuilt when the CSV's size/mtime change and its
+content hash no longer matches.
+
+For parallel builds, ensure_arrow_snapshot() also writes an uncompressed
+Arrow IPC (Feather v2) copy that worker processes open with
+map_cleaned_data(). Numeric columns are then memory-mapped, zero-copy
+views shared through the page cache instead of one parsed copy per worker.
+Both need pyarrow (the optional `arrow` extra).
+"""
+
+import contextlib
+import json
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from obesity_data_cleaning import CLEANED_DTYPES, cleaned_columns, file_content_hash, require_pyarrow
+
+CLEANED_DATA_CSV = 'obesity_data_cleaned.csv'
+
+# Bump when CLEANED_DTYPES changes so old snapshots are rebuilt
+SNAPSHOT_VERSION = 4
+
+
+def snapshot_paths(csv_path):
+    """(snapshot, metadata) file paths that sit next to the CSV"""
+    stem = os.path.splitext(csv_path)[0]
+    return stem + '.snapshot.pkl', stem + '.snapshot.json'
+
+
+def read_cleaned_csv(csv_path=CLEANED_DATA_CSV):
+    """
+    Parse the cleaned CSV with the explicit schema (no type inference)
+
+    Columns of further registered indicators and SE/CI columns are kept
+    when the CSV has them (see obesity_data_cleaning.cleaned_columns).
+    """
+    df = pd.read_csv(csv_path, dtype=CLEANED_DTYPES)
+    return df[cleaned_columns(df.columns)]
+
+
+def _csv_fingerprint(csv_path):
+    stat = os.stat(csv_path)
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def _read_snapshot_meta(meta_path):
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get('version') == SNAPSHOT_VERSION else None
+
+
+def _write_atomically(path, write):
+    """
+    Write a file through `write(tmp_path)`, then move it into place in one step
+
+    The temporary name is unique per call, so processes rebuilding the same
+    snapshot at once never see (or clobber) each other's half-written file.
+    """
+    tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+
+
+def _write_snapshot_meta(meta_path, meta):
+    def write(tmp_path):
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f, indent=2)
+
+    _write_atomically(meta_path, write)
+
+
+def load_cleaned_data(csv_path=CLEANED_DATA_CSV):
+    """
+    Load the cleaned dataset, from the binary snapshot whenever it is current
+
+    Fast path: the CSV's size and mtime match the snapshot metadata. If only
+    the mtime moved (e.g. a fresh checkout), the content hash decides and the
+    metadata is refreshed without reparsing. Otherwise the CSV is parsed and
+    the snapshot rebuilt. Both snapshot files are replaced atomically (the
+    pickle first), so loaders running in parallel read either the old or
+    the new snapshot, never a partial one. A snapshot that cannot be written
+    (read-only directory) just means the CSV is parsed every time.
+    """
+    snapshot_path, meta_path = snapshot_paths(csv_path)
+    fingerprint = _csv_fingerprint(csv_path)
+    meta = _read_snapshot_meta(meta_path)
+
+    if meta is not None and os.path.exists(snapshot_path):
+        if meta['mtime_ns'] == fingerprint['mtime_ns'] and meta['size'] == fingerprint['size']:
+            return pd.read_pickle(snapshot_path)
+
+        if meta['size'] == fingerprint['size'] and meta['sha256'] == file_content_hash(csv_path):
+            meta.update(fingerprint)
+            try:
+                _write_snapshot_meta(meta_path, meta)
+            except OSError:
+                pass
+            return pd.read_pickle(snapshot_path)
+
+    df = read_cleaned_csv(csv_path)
+    try:
+        _write_atomically(snapshot_path, df.to_pickle)
+        _write_snapshot_meta(meta_path, {
+            'version': SNAPSHOT_VERSION,
+            'sha256': file_content_hash(csv_path),
+            **fingerprint,
+        })
+    except OSError:
+        pass
+    return df
+
+
+def cleaned_data_hash(csv_path=CLEANED_DATA_CSV):
+    """
+    SHA-256 of the cleaned CSV, for caches derived from it
+
+    Read from the snapshot metadata that load_cleaned_data keeps current,
+    so the file is only hashed again when it has changed.
+    """
+    load_cleaned_data(csv_path)
+    meta = _read_snapshot_meta(snapshot_paths(csv_path)[1])
+    return meta['sha256'] if meta else file_content_hash(csv_path)
+
+
+def arrow_snapshot_path(csv_path=CLEANED_DATA_CSV):
+    """Arrow IPC snapshot path that sits next to the CSV"""
+    return os.path.splitext(csv_path)[0] + '.arrow'
+
+
+def _arrow_column(series):
+    """Arrow array for one column; NaN stays a value so numeric buffers have no validity bitmap"""
+    import pyarrow as pa
+
+    if pd.api.types.is_float_dtype(series.dtype):
+        return pa.array(series.to_numpy(dtype='float64'))
+    if str(series.dtype) == 'Int64' and not series.isna().any():
+        return pa.array(series.to_numpy(dtype='int64'))
+    return pa.array(series, from_pandas=True)
+
+
+def write_arrow_snapshot(df, arrow_path, source_sha256=None):
+    """Write the frame as one uncompressed Arrow IPC record batch"""
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    table = pa.table({col: _arrow_column(df[col]) for col in df.columns})
+    table = table.replace_schema_metadata({'source_sha256': source_sha256 or ''})
+    # A single record batch keeps every column contiguous, so it maps to one numpy view
+    _write_atomically(arrow_path, lambda tmp_path: feather.write_feather(
+        table, tmp_path, compression='uncompressed', chunksize=max(len(df), 1)))
+
+
+def _arrow_source_hash(arrow_path):
+    import pyarrow as pa
+
+    try:
+        with pa.memory_map(arrow_path) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    return metadata.get(b'source_sha256', b'').decode() or None
+
+
+def ensure_arrow_snapshot(csv_path=CLEANED_DATA_CSV):
+    """
+    Make sure the Arrow IPC snapshot matches the CSV and return its path
+
+    Call this once in the parent process before starting workers.
+    """
+    require_pyarrow('ensure_arrow_snapshot')
+    arrow_path = arrow_snapshot_path(csv_path)
+    source_sha256 = cleaned_data_hash(csv_path)
+
+    if _arrow_source_hash(arrow_path) != source_sha256:
+        write_arrow_snapshot(load_cleaned_data(csv_path), arrow_path, source_sha256=source_sha256)
+    return arrow_path
+
+
+def map_cleaned_data(arrow_path, columns=None):
+    """
+    Open the Arrow IPC snapshot as a DataFrame without copying numeric data
+
+    Float metrics (and years without missing values) are read-only numpy
+    views on the memory-mapped file, so N workers share one copy of those
+    buffers. Text and boolean columns are materialized per process. Treat
+    the result as read-only; .copy() it before modifying it in place.
+    """
+    require_pyarrow('map_cleaned_data')
+    import pyarrow as pa
+
+    source = pa.memory_map(arrow_path)
+    table = pa.ipc.open_file(source).read_all()
+    columns = columns or table.column_names
+
+    data = {}
+    for col in columns:
+        column = table.column(col)
+        is_numeric = pa.types.is_floating(column.type) or pa.types.is_integer(column.type)
+        if is_numeric and column.null_count == 0 and column.num_chunks == 1:
+            values = column.chunk(0).to_numpy(zero_copy_only=True)
+            if pa.types.is_integer(column.type):
+                # Wrap as Int64 without copying, to match load_cleaned_data's dtypes
+                values = pd.arrays.IntegerArray(values, np.zeros(len(values), dtype=bool), copy=False)
+            data[col] = values
+        elif pa.types.is_integer(column.type):
+            data[col] = column.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+        else:
+            data[col] = column.to_pandas()
+    return pd.DataFrame(data, copy=False)
@@ -1,116 +1,215 @@
+"""
+Data Exploration Report for India Obesity Dashboard
+
+Every grouped section of the report is answered from one aggregate over
+(Category, Subcategory, Survey_Year): row counts plus per-metric sums and
+counts. The frame is grouped once, however many sections, countries or
+survey rounds there are; on a multi-country dataset a group's value is the
+mean over its countries. Plotting libraries are only imported by --plot.
+"""
+
+import argparse
+
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# Load the dataset
-df = pd.read_csv('obesity_data_cleaned.csv')
-
-print("=" * 80)
-print("OBESITY DATASET EXPLORATION")
-print("=" * 80)
-
-# Basic Information
-print("\n1. DATASET SHAPE")
-print(f"   Rows: {df.shape[0]}")
-print(f"   Columns: {df.shape[1]}")
-
-# Column Information
-print("\n2. COLUMN INFORMATION")
-print(f"   Columns: {list(df.columns)}")
-
-# Data Types
-print("\n3. DATA TYPES")
-print(df.dtypes)
-
-# Missing Values
-print("\n4. MISSING VALUES")
-missing = df.isnull().sum()
-missing_pct = (missing / len(df)) * 100
-missing_df = pd.DataFrame({
-    'Missing Count': missing,
-    'Percentage': missing_pct
-})
-print(missing_df[missing_df['Missing Count'] > 0])
-
-# Unique Values
-print("\n5. UNIQUE VALUES PER COLUMN")
-for col in df.columns:
-    print(f"   {col}: {df[col].nunique()}")
-
-# Survey Years
-print("\n6. SURVEY YEARS DISTRIBUTION")
-print(df['Survey_Year'].value_counts().sort_index())
-
-# Categories
-print("\n7. CATEGORIES BREAKDOWN")
-print(df['Category'].value_counts())
-
-# Subcategories
-print("\n8. SUBCATEGORIES BREAKDOWN")
-print(df['Subcategory'].value_counts())
-
-# Obesity Statistics
-print("\n9. OBESITY STATISTICS SUMMARY")
-numeric_cols = ['Children_Overweight_Pct', 'Women_Overweight_Pct', 'Men_Overweight_Pct']
-print(df[numeric_cols].describe())
-
-# Overall Trends by Year
-print("\n10. AVERAGE OBESITY RATES BY SURVEY YEAR")
-year_stats = df[df['Category'] == 'Total'].groupby('Survey_Year')[numeric_cols].mean()
-print(year_stats)
-
-# Education Impact
-print("\n11. OBESITY RATES BY EDUCATION LEVEL (Latest Survey)")
-latest_year = df['Survey_Year'].max()
-education_data = df[(df['Category'] == 'Education') & (df['Survey_Year'] == latest_year)]
-if not education_data.empty:
-    print(education_data[['Subcategory', 'Children_Overweight_Pct',
-                          'Women_Overweight_Pct', 'Men_Overweight_Pct']].to_string(index=False))
-
-# Wealth Impact
-print("\n12. OBESITY RATES BY WEALTH QUINTILE (Latest Survey)")
-wealth_data = df[(df['Category'] == 'Wealth quintile') & (df['Survey_Year'] == latest_year)]
-if not wealth_data.empty:
-    print(wealth_data[['Subcategory', 'Children_Overweight_Pct',
-                       'Women_Overweight_Pct', 'Men_Overweight_Pct']].to_string(index=False))
-
-# Urban vs Rural
-print("\n13. OBESITY RATES: URBAN VS RURAL (Latest Survey)")
-residence_data = df[(df['Category'] == 'Residence') & (df['Survey_Year'] == latest_year)]
-if not residence_data.empty:
-    print(residence_data[['Subcategory', 'Children_Overweight_Pct',
-                          'Women_Overweight_Pct', 'Men_Overweight_Pct']].to_string(index=False))
-
-# Top 10 States by Women's Obesity (Latest Survey)
-print("\n14. TOP 10 STATES BY WOMEN'S OBESITY RATE (Latest Survey)")
-states_data = df[(df['Category'] == 'States') & (df['Survey_Year'] == latest_year)]
-if not states_data.empty:
-    top_states = states_data.nlargest(10, 'Women_Overweight_Pct')[
-        ['Subcategory', 'Women_Overweight_Pct', 'Men_Overweight_Pct', 'Children_Overweight_Pct']
-    ]
-    print(top_states.to_string(index=False))
-
-# Data Completeness
-print("\n15. DATA COMPLETENESS ANALYSIS")
-completeness_cols = ['Has_Complete_Children_Data', 'Has_Complete_Women_Data',
-                     'Has_Complete_Men_Data', 'Has_All_Metrics']
-for col in completeness_cols:
-    true_count = df[col].sum()
-    print(f"   {col}: {true_count} ({(true_count/len(df)*100):.1f}%)")
-
-# Age Group Analysis (Latest Survey)
-print("\n16. OBESITY RATES BY AGE GROUP (Latest Survey - Women)")
-age_data = df[(df['Category'] == 'Age (5-year groups)') & (df['Survey_Year'] == latest_year)]
-if not age_data.empty:
-    print(age_data[['Subcategory', 'Women_Overweight_Pct', 'Men_Overweight_Pct']].to_string(index=False))
-
-# Trend Analysis
-print("\n17. OVERALL OBESITY TREND OVER TIME")
-total_data = df[df['Category'] == 'Total'][['Survey_Year', 'Children_Overweight_Pct',
-                                             'Women_Overweight_Pct', 'Men_Overweight_Pct']]
-print(total_data.to_string(index=False))
-
-print("\n" + "=" * 80)
-print("EXPLORATION COMPLETE")
-print("=" * 80)
+
+from data_loader import load_cleaned_data
+from obesity_data_cleaning import COMPLETENESS_COLUMNS, METRIC_COLUMNS
+from projections import load_projections, projected_segment
+
+GROUP_KEYS = ['Category', 'Subcategory', 'Survey_Year']
+
+
+def aggregate_groups(df):
+    """
+    The single grouped scan behind the report
+
+    One row per (Category, Subcategory, Survey_Year) in first-appearance
+    order, with the group's row count and each metric's sum and count.
+    """
+    grouped = df.groupby(GROUP_KEYS, sort=False, dropna=False)
+    sums = grouped[METRIC_COLUMNS].sum()
+    counts = grouped[METRIC_COLUMNS].count()
+
+    aggregate = pd.concat({'sum': sums, 'count': counts}, axis=1)
+    aggregate['rows'] = grouped.size()
+    return aggregate
+
+
+def group_means(aggregate):
+    """Mean of each metric per group (NaN where a group has no values)"""
+    return aggregate['sum'].where(aggregate['count'] > 0) / aggregate['count']
+
+
+def rows_per(aggregate, level):
+    """Row counts per value of one grouping level, in first-appearance order"""
+    return aggregate['rows'].groupby(level=level, sort=False, dropna=False).sum().rename('count')
+
+
+def category_rows(means, category, year=None):
+    """Subcategory (and Survey_Year, without `year`) with metric means for one category"""
+    if category not in means.index.get_level_values('Category'):
+        return means.iloc[:0].reset_index()
+    rows = means.xs(category, level='Category').reset_index()
+    if year is not None:
+        rows = rows[rows['Survey_Year'] == year]
+    return rows
+
+
+def print_report(df):
+    """Print the 17-section exploration report"""
+    aggregate = aggregate_groups(df)
+    means = group_means(aggregate)
+    latest_year = means.index.get_level_values('Survey_Year').max()
+
+    print("=" * 80)
+    print("OBESITY DATASET EXPLORATION")
+    print("=" * 80)
+
+    # Basic Information
+    print("\n1. DATASET SHAPE")
+    print(f"   Rows: {df.shape[0]}")
+    print(f"   Columns: {df.shape[1]}")
+
+    # Column Information
+    print("\n2. COLUMN INFORMATION")
+    print(f"   Columns: {list(df.columns)}")
+
+    # Data Types
+    print("\n3. DATA TYPES")
+    print(df.dtypes)
+
+    # Missing Values
+    print("\n4. MISSING VALUES")
+    missing = df.isnull().sum()
+    missing_pct = (missing / len(df)) * 100
+    missing_df = pd.DataFrame({
+        'Missing Count': missing,
+        'Percentage': missing_pct
+    })
+    print(missing_df[missing_df['Missing Count'] > 0])
+
+    # Unique Values
+    print("\n5. UNIQUE VALUES PER COLUMN")
+    for col in df.columns:
+        print(f"   {col}: {df[col].nunique()}")
+
+    # Survey Years
+    print("\n6. SURVEY YEARS DISTRIBUTION")
+    print(rows_per(aggregate, 'Survey_Year').sort_index())
+
+    # Categories
+    print("\n7. CATEGORIES BREAKDOWN")
+    print(rows_per(aggregate, 'Category').sort_values(ascending=False, kind='stable'))
+
+    # Subcategories
+    print("\n8. SUBCATEGORIES BREAKDOWN")
+    print(rows_per(aggregate, 'Subcategory').sort_values(ascending=False, kind='stable'))
+
+    # Obesity Statistics
+    print("\n9. OBESITY STATISTICS SUMMARY")
+    print(df[METRIC_COLUMNS].describe())
+
+    # Overall Trends by Year
+    print("\n10. AVERAGE OBESITY RATES BY SURVEY YEAR")
+    total = aggregate.xs('Total', level='Category')
+    year_totals = total.groupby(level='Survey_Year').sum()
+    print(year_totals['sum'] / year_totals['count'])
+
+    # Education Impact
+    print("\n11. OBESITY RATES BY EDUCATION LEVEL (Latest Survey)")
+    education_data = category_rows(means, 'Education', latest_year)
+    if not education_data.empty:
+        print(education_data[['Subcategory'] + METRIC_COLUMNS].to_string(index=False))
+
+    # Wealth Impact
+    print("\n12. OBESITY RATES BY WEALTH QUINTILE (Latest Survey)")
+    wealth_data = category_rows(means, 'Wealth quintile', latest_year)
+    if not wealth_data.empty:
+        print(wealth_data[['Subcategory'] + METRIC_COLUMNS].to_string(index=False))
+
+    # Urban vs Rural
+    print("\n13. OBESITY RATES: URBAN VS RURAL (Latest Survey)")
+    residence_data = category_rows(means, 'Residence', latest_year)
+    if not residence_data.empty:
+        print(residence_data[['Subcategory'] + METRIC_COLUMNS].to_string(index=False))
+
+    # Top 10 States by Women's Obesity (Latest Survey)
+    print("\n14. TOP 10 STATES BY WOMEN'S OBESITY RATE (Latest Survey)")
+    states_data = category_rows(means, 'States', latest_year)
+    if not states_data.empty:
+        top_states = states_data.nlargest(10, 'Women_Overweight_Pct')[
+            ['Subcategory', 'Women_Overweight_Pct', 'Men_Overweight_Pct', 'Children_Overweight_Pct']
+        ]
+        print(top_states.to_string(index=False))
+
+    # Data Completeness
+    print("\n15. DATA COMPLETENESS ANALYSIS")
+    for col in COMPLETENESS_COLUMNS:
+        true_count = df[col].sum()
+        print(f"   {col}: {true_count} ({(true_count/len(df)*100):.1f}%)")
+
+    # Age Group Analysis (Latest Survey)
+    print("\n16. OBESITY RATES BY AGE GROUP (Latest Survey - Women)")
+    age_data = category_rows(means, 'Age (5-year groups)', latest_year)
+    if not age_data.empty:
+        print(age_data[['Subcategory', 'Women_Overweight_Pct', 'Men_Overweight_Pct']].to_string(index=False))
+
+    # Trend Analysis
+    print("\n17. OVERALL OBESITY TREND OVER TIME")
+    total_data = category_rows(means, 'Total')[['Survey_Year'] + METRIC_COLUMNS]
+    print(total_data.to_string(index=False))
+
+    print("\n" + "=" * 80)
+    print("EXPLORATION COMPLETE")
+    print("=" * 80)
+
+    return aggregate
+
+
+def plot_report(aggregate, output_path):
+    """
+    Save national trend and latest-round category charts from the aggregate
+
+    The national trend lines continue as dashed projected segments with
+    their prediction bands, read from the cached projections table.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    means = group_means(aggregate)
+    latest_year = means.index.get_level_values('Survey_Year').max()
+
+    projections = load_projections()
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+    total = category_rows(means, 'Total').sort_values('Survey_Year')
+    for col in METRIC_COLUMNS:
+        line, = axes[0].plot(total['Survey_Year'].astype(int), total[col], marker='o', label=col)
+        segment = projected_segment(projections, col)
+        axes[0].plot(segment['Year'], segment['Value'], linestyle='--', color=line.get_color())
+        axes[0].fill_between(segment['Year'].astype(int), segment['PI_Low'].astype(float),
+                             segment['PI_High'].astype(float), color=line.get_color(), alpha=0.15)
+    axes[0].set_title('Overweight/obesity over time (Total, dashed: projected)')
+    axes[0].set_ylabel('%')
+    axes[0].legend()
+
+    wealth = category_rows(means, 'Wealth quintile', latest_year)
+    axes[1].bar(wealth['Subcategory'], wealth['Women_Overweight_Pct'])
+    axes[1].set_title(f'Women overweight by wealth quintile ({latest_year})')
+    axes[1].set_ylabel('%')
+
+    fig.tight_layout()
+    fig.savefig(output_path)
+    plt.close(fig)
+    print(f"✓ Saved exploration charts to: {output_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print the exploration report for the cleaned dataset")
+    parser.add_argument('--plot', default=None, help="also save summary charts to this image file")
+    args = parser.parse_args()
+
+    aggregate = print_report(load_cleaned_data())
+    if args.plot:
+        plot_report(aggregate, args.plot)
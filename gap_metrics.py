@@ -0,0 +1,86 @@
+"""
+INEQUALITY GAP METRICS
+India Obesity Dashboard
+
+Urban/rural, richest/poorest and education gaps for every country, survey
+round and metric at once. The gap categories are pivoted so each
+Subcategory becomes a column, and every gap is then plain array
+arithmetic between a "high" and a "low" column:
+
+- Difference: high - low (percentage points)
+- Ratio: high / low
+- Pct_Higher: (Ratio - 1) * 100, e.g. "urban women are 69% more likely"
+
+    gaps = compute_gaps(load_cleaned_data())
+    gap_value(gaps, 'urban_rural', 'Women_Overweight_Pct', 2019, 'Pct_Higher')
+"""
+
+import numpy as np
+import pandas as pd
+
+from obesity_data_cleaning import METRIC_COLUMNS
+
+# Each gap compares two subcategories of one category
+GAP_DEFINITIONS = {
+    'urban_rural': {'category': 'Residence', 'high': 'Urban', 'low': 'Rural'},
+    'richest_poorest': {'category': 'Wealth quintile', 'high': 'Highest', 'low': 'Lowest'},
+    'education': {'category': 'Education', 'high': 'Higher', 'low': 'No education'},
+}
+
+GAP_COLUMNS = ['Country', 'Survey_Year', 'Gap', 'Metric', 'High_Group', 'Low_Group',
+               'High_Value', 'Low_Value', 'Difference', 'Ratio', 'Pct_Higher']
+
+
+def compute_gaps(df, metrics=None, gaps=None):
+    """
+    Tidy table of every gap for every (Country, Survey_Year, Metric)
+
+    One row per country, round, gap and metric (see GAP_COLUMNS). Rows
+    where either group is missing are kept with NaN figures so the table
+    shape does not depend on data availability; drop them with dropna().
+    """
+    metrics = metrics or METRIC_COLUMNS
+    gaps = gaps or GAP_DEFINITIONS
+    categories = {gap['category'] for gap in gaps.values()}
+
+    subset = df[df['Category'].isin(categories)]
+    long = subset.melt(id_vars=['Country', 'Survey_Year', 'Category', 'Subcategory'], value_vars=metrics,
+                       var_name='Metric', value_name='Value')
+    wide = long.pivot_table(index=['Country', 'Survey_Year', 'Metric'], columns=['Category', 'Subcategory'],
+                            values='Value', aggfunc='first', dropna=False, sort=True)
+
+    high_columns = pd.MultiIndex.from_tuples([(gap['category'], gap['high']) for gap in gaps.values()])
+    low_columns = pd.MultiIndex.from_tuples([(gap['category'], gap['low']) for gap in gaps.values()])
+    high = wide.reindex(columns=high_columns).to_numpy(dtype='float64')
+    low = wide.reindex(columns=low_columns).to_numpy(dtype='float64')
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(low > 0, high / low, np.nan)
+    difference = high - low
+
+    # Rows are (country, round, metric) × gaps, flattened row-major
+    n_gaps = len(gaps)
+    keys = wide.index.to_frame(index=False).loc[np.repeat(np.arange(len(wide)), n_gaps)].reset_index(drop=True)
+    names = np.tile(list(gaps), len(wide))
+
+    table = pd.DataFrame({
+        'Country': keys['Country'],
+        'Survey_Year': keys['Survey_Year'],
+        'Gap': names,
+        'Metric': keys['Metric'],
+        'High_Group': np.tile([gap['high'] for gap in gaps.values()], len(wide)),
+        'Low_Group': np.tile([gap['low'] for gap in gaps.values()], len(wide)),
+        'High_Value': high.ravel(),
+        'Low_Value': low.ravel(),
+        'Difference': difference.ravel(),
+        'Ratio': ratio.ravel(),
+        'Pct_Higher': ((ratio - 1) * 100).ravel(),
+    })
+    return table[GAP_COLUMNS]
+
+
+def gap_value(gaps, gap, metric, year, column='Pct_Higher', country='India'):
+    """One figure from the gap table, e.g. the 2019 urban/rural Pct_Higher for women"""
+    match = gaps[(gaps['Country'] == country) & (gaps['Survey_Year'] == year)
+                 & (gaps['Gap'] == gap) & (gaps['Metric'] == metric)]
+    return match[column].iloc[0]
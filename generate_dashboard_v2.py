@@ -1,9 +1,11 @@
-import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from data_index import load_index
+
 # Load the dataset
-df = pd.read_csv('obesity_data_cleaned.csv')
+index = load_index()
+df = index.df
 
 # Professional color palette
 COLORS = {
@@ -224,8 +226,8 @@ html_content = f"""
 """
 
 # Calculate key statistics
-latest_data = df[df['Category'] == 'Total'].sort_values('Survey_Year').iloc[-1]
-earliest_data = df[df['Category'] == 'Total'].sort_values('Survey_Year').iloc[0]
+latest_data = index.slice(category='Total').sort_values('Survey_Year').iloc[-1]
+earliest_data = index.slice(category='Total').sort_values('Survey_Year').iloc[0]
 
 children_change = latest_data['Children_Overweight_Pct'] - earliest_data['Children_Overweight_Pct']
 women_change = latest_data['Women_Overweight_Pct'] - earliest_data['Women_Overweight_Pct']
@@ -282,7 +284,7 @@ html_content += f"""
 """
 
 # Chart 1: Overall Trends
-total_data = df[df['Category'] == 'Total'].sort_values('Survey_Year')
+total_data = index.slice(category='Total').sort_values('Survey_Year')
 
 fig1 = go.Figure()
 
@@ -337,9 +339,9 @@ html_content += f"""
 """
 
 # Chart 2: State Comparison
-states_data = df[(df['Category'] == 'States') & (df['Survey_Year'] == 2019)].copy()
+states_data = index.slice(category='States', year=2019).copy()
 states_data = states_data.nlargest(15, 'Women_Overweight_Pct')
-states_data['State_Short'] = states_data['Subcategory'].str.replace('States : ', '').str.replace(' (L1)', '')
+states_data['State_Short'] = states_data['Geo_Name']
 
 fig2 = go.Figure()
 
@@ -389,7 +391,7 @@ html_content += f"""
 """
 
 # Chart 3: Urban vs Rural
-residence_data = df[df['Category'] == 'Residence'].sort_values('Survey_Year')
+residence_data = index.slice(category='Residence').sort_values('Survey_Year')
 urban_data = residence_data[residence_data['Subcategory'] == 'Urban']
 rural_data = residence_data[residence_data['Subcategory'] == 'Rural']
 
@@ -474,7 +476,7 @@ html_content += f"""
 """
 
 # Chart 4: Wealth Quintile
-wealth_data = df[df['Category'] == 'Wealth quintile'].sort_values(['Survey_Year', 'Subcategory'])
+wealth_data = index.slice(category='Wealth quintile').sort_values(['Survey_Year', 'Subcategory'])
 latest_wealth = wealth_data[wealth_data['Survey_Year'] == 2019]
 wealth_order = ['Lowest', 'Second', 'Middle', 'Fourth', 'Highest']
 latest_wealth = latest_wealth.set_index('Subcategory').reindex(wealth_order).reset_index()
@@ -523,7 +525,7 @@ html_content += f"""
 """
 
 # Chart 5: Age Groups
-age_data = df[df['Category'] == 'Age (5-year groups)']
+age_data = index.slice(category='Age (5-year groups)')
 latest_age = age_data[age_data['Survey_Year'] == 2019]
 
 fig5 = go.Figure()
@@ -563,7 +565,7 @@ html_content += f"""
 """
 
 # Chart 6: Education Level
-education_data = df[df['Category'] == 'Education']
+education_data = index.slice(category='Education')
 latest_edu = education_data[education_data['Survey_Year'] == 2019]
 
 fig6 = go.Figure()
@@ -3,25 +3,30 @@ Educational Materials Generator for India Obesity Dashboard
 Creates patient handouts, doctor protocols, and campaign materials
 """
 
-import pandas as pd
 from datetime import datetime
 
+from data_index import load_index
+from gap_metrics import compute_gaps, gap_value
+
 # Load the dataset
-df = pd.read_csv('obesity_data_cleaned.csv')
+index = load_index()
 
 # Extract key statistics
-latest_data = df[df['Survey_Year'] == 2019]
-total_2019 = latest_data[latest_data['Category'] == 'Total'].iloc[0]
-total_1998 = df[(df['Survey_Year'] == 1998) & (df['Category'] == 'Total')].iloc[0]
+total_2019 = index.get('India', 2019, 'Total', 'Total')
+total_1998 = index.get('India', 1998, 'Total', 'Total')
+
+urban_2019 = index.get('India', 2019, 'Residence', 'Urban')
+rural_2019 = index.get('India', 2019, 'Residence', 'Rural')
+urban_pct_higher = gap_value(compute_gaps(index.df), 'urban_rural', 'Women_Overweight_Pct', 2019)
+
+lowest_wealth = index.get('India', 2019, 'Wealth quintile', 'Lowest')
+highest_wealth = index.get('India', 2019, 'Wealth quintile', 'Highest')
 
-urban_2019 = latest_data[(latest_data['Category'] == 'Residence') & (latest_data['Subcategory'] == 'Urban')].iloc[0]
-rural_2019 = latest_data[(latest_data['Category'] == 'Residence') & (latest_data['Subcategory'] == 'Rural')].iloc[0]
 
-wealth_data = latest_data[latest_data['Category'] == 'Wealth quintile'].sort_values('Subcategory')
-lowest_wealth = wealth_data[wealth_data['Subcategory'] == 'Lowest'].iloc[0]
-highest_wealth = wealth_data[wealth_data['Subcategory'] == 'Highest'].iloc[0]
+def women_pct_2019_by_age(age_group):
+    """Women overweight % in 2019 for one 5-year age group"""
+    return index.get('India', 2019, 'Age (5-year groups)', age_group)['Women_Overweight_Pct']
 
-age_data = latest_data[latest_data['Category'] == 'Age (5-year groups)'].sort_values('Subcategory')
 
 print("=" * 80)
 print("EDUCATIONAL MATERIALS GENERATOR")
@@ -63,7 +68,7 @@ THE URBAN DANGER: City Life is Making You Sick
 The data is clear:
 - Urban obesity: {urban_2019['Women_Overweight_Pct']:.1f}%
 - Rural obesity: {rural_2019['Women_Overweight_Pct']:.1f}%
-- Urban areas are {((urban_2019['Women_Overweight_Pct']/rural_2019['Women_Overweight_Pct'])-1)*100:.0f}% MORE at risk!
+- Urban areas are {urban_pct_higher:.0f}% MORE at risk!
 
 Why cities are dangerous:
 1. Sedentary office jobs (vs agricultural work)
@@ -224,8 +229,8 @@ Demographic Profile:
 - Family history of diabetes/CVD
 
 Current Prevalence:
-- Urban women 35-39: {age_data[age_data['Subcategory'] == '35-39']['Women_Overweight_Pct'].values[0]:.1f}% obesity
-- Urban women 40-44: {age_data[age_data['Subcategory'] == '40-44']['Women_Overweight_Pct'].values[0]:.1f}% obesity
+- Urban women 35-39: {women_pct_2019_by_age('35-39'):.1f}% obesity
+- Urban women 40-44: {women_pct_2019_by_age('40-44'):.1f}% obesity
 
 Screening Protocol:
 ✓ BMI calculation at EVERY visit
@@ -352,7 +357,7 @@ Key Barriers to Address:
 - Time constraints (simple, quick healthy options)
 
 FOR URBAN PATIENTS
-Risk Profile: {urban_2019['Women_Overweight_Pct']:.1f}% obesity ({((urban_2019['Women_Overweight_Pct']/rural_2019['Women_Overweight_Pct'])-1)*100:.0f}% higher than rural)
+Risk Profile: {urban_2019['Women_Overweight_Pct']:.1f}% obesity ({urban_pct_higher:.0f}% higher than rural)
 
 Your Message:
 "Urban living is a major risk factor. Your environment works against you:
@@ -578,7 +583,7 @@ Platform: Instagram, Twitter, LinkedIn
 POST 1:
 🏙️ URBAN DANGER ALERT
 
-City dwellers have {((urban_2019['Women_Overweight_Pct']/rural_2019['Women_Overweight_Pct'])-1)*100:.0f}% HIGHER obesity rates than villages!
+City dwellers have {urban_pct_higher:.0f}% HIGHER obesity rates than villages!
 
 Why?
 • Desk jobs = No movement
@@ -615,9 +620,9 @@ Platform: Instagram, TikTok, YouTube
 POST 1:
 ⚠️ THE AGE CREEP
 
-At 20: {age_data[age_data['Subcategory'] == '20-24']['Women_Overweight_Pct'].values[0]:.1f}% of you are overweight
-At 30: {age_data[age_data['Subcategory'] == '30-34']['Women_Overweight_Pct'].values[0]:.1f}% of you are overweight
-At 40: {age_data[age_data['Subcategory'] == '40-44']['Women_Overweight_Pct'].values[0]:.1f}% of you are overweight
+At 20: {women_pct_2019_by_age('20-24'):.1f}% of you are overweight
+At 30: {women_pct_2019_by_age('30-34'):.1f}% of you are overweight
+At 40: {women_pct_2019_by_age('40-44'):.1f}% of you are overweight
 
 You don't notice gaining 0.5 kg per year.
 But in 20 years, you're 20 kg heavier.
@@ -1,10 +1,12 @@
-import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 
+from data_index import load_index
+
 # Load the dataset
-df = pd.read_csv('obesity_data_cleaned.csv')
+index = load_index()
+df = index.df
 
 # HTML header and styling
 html_content = """
@@ -214,8 +216,8 @@ html_content = """
 """
 
 # Calculate key statistics
-latest_data = df[df['Category'] == 'Total'].sort_values('Survey_Year').iloc[-1]
-earliest_data = df[df['Category'] == 'Total'].sort_values('Survey_Year').iloc[0]
+latest_data = index.slice(category='Total').sort_values('Survey_Year').iloc[-1]
+earliest_data = index.slice(category='Total').sort_values('Survey_Year').iloc[0]
 
 children_change = latest_data['Children_Overweight_Pct'] - earliest_data['Children_Overweight_Pct']
 women_change = latest_data['Women_Overweight_Pct'] - earliest_data['Women_Overweight_Pct']
@@ -280,7 +282,7 @@ html_content += """
 """
 
 # Overall trend chart
-total_data = df[df['Category'] == 'Total'].sort_values('Survey_Year')
+total_data = index.slice(category='Total').sort_values('Survey_Year')
 
 fig1 = go.Figure()
 
@@ -333,14 +335,14 @@ html_content += f"""
 """
 
 # State comparison - Top 15 states for latest year
-states_data = df[(df['Category'] == 'States') & (df['Survey_Year'] == 2019)].copy()
+states_data = index.slice(category='States', year=2019).copy()
 states_data = states_data.nlargest(15, 'Women_Overweight_Pct')
 
 fig2 = go.Figure()
 
 fig2.add_trace(go.Bar(
     name='Women',
-    x=states_data['Subcategory'].str.replace('States : ', '').str.replace(' (L1)', ''),
+    x=states_data['Geo_Name'],
     y=states_data['Women_Overweight_Pct'],
     marker_color='#4ECDC4',
     hovertemplate='%{x}<br>Women: %{y:.1f}%<extra></extra>'
@@ -348,7 +350,7 @@ fig2.add_trace(go.Bar(
 
 fig2.add_trace(go.Bar(
     name='Men',
-    x=states_data['Subcategory'].str.replace('States : ', '').str.replace(' (L1)', ''),
+    x=states_data['Geo_Name'],
     y=states_data['Men_Overweight_Pct'],
     marker_color='#95E1D3',
     hovertemplate='%{x}<br>Men: %{y:.1f}%<extra></extra>'
@@ -356,7 +358,7 @@ fig2.add_trace(go.Bar(
 
 fig2.add_trace(go.Bar(
     name='Children',
-    x=states_data['Subcategory'].str.replace('States : ', '').str.replace(' (L1)', ''),
+    x=states_data['Geo_Name'],
     y=states_data['Children_Overweight_Pct'],
     marker_color='#FF6B6B',
     hovertemplate='%{x}<br>Children: %{y:.1f}%<extra></extra>'
@@ -382,7 +384,7 @@ html_content += f"""
 """
 
 # Education level analysis - All years
-education_data = df[df['Category'] == 'Education'].sort_values('Survey_Year')
+education_data = index.slice(category='Education').sort_values('Survey_Year')
 
 fig3 = make_subplots(
     rows=1, cols=3,
@@ -457,7 +459,7 @@ html_content += f"""
 """
 
 # Wealth quintile detailed analysis
-wealth_data = df[df['Category'] == 'Wealth quintile'].sort_values(['Survey_Year', 'Subcategory'])
+wealth_data = index.slice(category='Wealth quintile').sort_values(['Survey_Year', 'Subcategory'])
 wealth_order = ['Lowest', 'Second', 'Middle', 'Fourth', 'Highest']
 
 fig4 = make_subplots(
@@ -566,7 +568,7 @@ html_content += f"""
 """
 
 # Urban vs Rural over time
-residence_data = df[df['Category'] == 'Residence'].sort_values('Survey_Year')
+residence_data = index.slice(category='Residence').sort_values('Survey_Year')
 
 fig5 = make_subplots(
     rows=1, cols=3,
@@ -650,7 +652,7 @@ html_content += f"""
 """
 
 # Age group analysis
-age_data = df[df['Category'] == 'Age (5-year groups)'].sort_values(['Survey_Year', 'Subcategory'])
+age_data = index.slice(category='Age (5-year groups)').sort_values(['Survey_Year', 'Subcategory'])
 
 fig6 = make_subplots(
     rows=1, cols=2,
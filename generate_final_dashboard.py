@@ -1,9 +1,12 @@
-import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from data_index import load_index
+from gap_metrics import compute_gaps, gap_value
+from trends import compute_trends, trend_for
+
 # Load the dataset
-df = pd.read_csv('obesity_data_cleaned.csv')
+index = load_index()
 
 # Professional color palette
 COLORS = {
@@ -23,11 +26,13 @@ COLORS = {
 print("Building dashboard with explanations...")
 
 # Calculate key statistics
-latest_data = df[df['Category'] == 'Total'].sort_values('Survey_Year').iloc[-1]
-earliest_data = df[df['Category'] == 'Total'].sort_values('Survey_Year').iloc[0]
+latest_data = index.slice(category='Total').sort_values('Survey_Year').iloc[-1]
+earliest_data = index.slice(category='Total').sort_values('Survey_Year').iloc[0]
 
-children_change = latest_data['Children_Overweight_Pct'] - earliest_data['Children_Overweight_Pct']
-women_change = latest_data['Women_Overweight_Pct'] - earliest_data['Women_Overweight_Pct']
+trends = compute_trends(index.df)
+gaps = compute_gaps(index.df)
+children_change = trend_for(trends, 'Children_Overweight_Pct')['Absolute_Change']
+women_change = trend_for(trends, 'Women_Overweight_Pct')['Absolute_Change']
 
 # HTML header with improved styling
 html_content = f"""
@@ -222,7 +227,7 @@ html_content = f"""
 """
 
 # Chart 1: Overall Trends (THIS ONE WAS MISSING DATA!)
-total_data = df[df['Category'] == 'Total'].sort_values('Survey_Year')
+total_data = index.slice(category='Total').sort_values('Survey_Year')
 
 fig1 = go.Figure()
 
@@ -297,7 +302,7 @@ html_content += f"""
 """
 
 # Chart 2: Urban vs Rural (FIX THE DATA DISPLAY!)
-residence_data = df[df['Category'] == 'Residence'].sort_values('Survey_Year')
+residence_data = index.slice(category='Residence').sort_values('Survey_Year')
 urban_data = residence_data[residence_data['Subcategory'] == 'Urban']
 rural_data = residence_data[residence_data['Subcategory'] == 'Rural']
 
@@ -407,7 +412,7 @@ html_content += f"""
                 <ul>
                     <li><strong>Women in cities:</strong> {latest_urban['Women_Overweight_Pct']:.1f}% obese</li>
                     <li><strong>Women in villages:</strong> {latest_rural['Women_Overweight_Pct']:.1f}% obese</li>
-                    <li><strong>Difference:</strong> City women are {((latest_urban['Women_Overweight_Pct']/latest_rural['Women_Overweight_Pct'])-1)*100:.0f}% MORE likely to be obese!</li>
+                    <li><strong>Difference:</strong> City women are {gap_value(gaps, 'urban_rural', 'Women_Overweight_Pct', 2019):.0f}% MORE likely to be obese!</li>
                 </ul>
 
                 <p><strong>Why Cities Are Riskier:</strong></p>
@@ -424,7 +429,7 @@ html_content += f"""
 """
 
 # Chart 3: Education Level
-education_data = df[df['Category'] == 'Education']
+education_data = index.slice(category='Education')
 latest_edu = education_data[education_data['Survey_Year'] == 2019]
 
 fig6 = go.Figure()
@@ -509,7 +514,7 @@ html_content += f"""
 """
 
 # Chart 4: Age Groups
-age_data = df[df['Category'] == 'Age (5-year groups)']
+age_data = index.slice(category='Age (5-year groups)')
 latest_age = age_data[age_data['Survey_Year'] == 2019]
 
 fig5 = go.Figure()
@@ -579,7 +584,7 @@ html_content += f"""
 """
 
 # Chart 5: Wealth Impact (Use simple language!)
-wealth_data = df[df['Category'] == 'Wealth quintile']
+wealth_data = index.slice(category='Wealth quintile')
 latest_wealth = wealth_data[wealth_data['Survey_Year'] == 2019]
 wealth_order = ['Lowest', 'Second', 'Middle', 'Fourth', 'Highest']
 latest_wealth_sorted = latest_wealth.set_index('Subcategory').reindex(wealth_order).reset_index()
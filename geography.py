@@ -0,0 +1,224 @@
+"""
+GEOGRAPHY TREE
+India Obesity Dashboard
+
+The cleaning pipeline tags every subnational row with Geo_Level (1 = state,
+2 = district, ...), Geo_Name and Geo_Parent. GeographyTree links those rows
+into one tree per survey round, country → states → districts, so that
+drilldowns never need to parse "States : Kerala (L1)" strings.
+
+Units are identified by a key (Country, Survey_Year, Geo_Parent, Geo_Name):
+names alone are not unique (there is an Aurangabad district in both Bihar
+and Maharashtra), and boundaries change between rounds (e.g. Jammu &
+Kashmir and Ladakh). A country's own key is (Country, Survey_Year, None,
+Country).
+
+    tree = load_geography()
+    india = tree.root('India', 2019)
+    tree.children(india)                          # state keys in NFHS-5
+    kerala = tree.unit('Kerala', 2019)
+    tree.ancestors(tree.unit('Alappuzha', 2019, parent='Kerala'))   # [kerala, india]
+    tree.units(level=2, year=2019, parent=kerala) # Kerala's district rows
+    tree.rollup(level=1, year=2019)               # districts averaged up to states
+"""
+
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from data_loader import CLEANED_DATA_CSV, load_cleaned_data
+from obesity_data_cleaning import METRIC_COLUMNS
+
+UNIT_KEY = ['Country', 'Survey_Year', 'Geo_Parent', 'Geo_Name']
+
+
+class GeographyTree:
+    """Parent/children links between the geographic units of a cleaned frame"""
+
+    def __init__(self, df):
+        is_unit = df['Geo_Level'].notna().to_numpy()
+        self.df = df
+        self.unit_rows = df[is_unit]
+
+        # Every unit (and every country root) is a node id; arrays below are indexed by it
+        self._keys = []
+        self._ids = {}
+        levels = []
+        positions = []
+
+        def add_node(key, level, position):
+            self._ids[key] = len(self._keys)
+            self._keys.append(key)
+            levels.append(level)
+            positions.append(position)
+
+        # Countries are the roots (level 0)
+        for country, year in zip(df['Country'], df['Survey_Year'].astype(object)):
+            root = (country, year, None, country)
+            if root not in self._ids:
+                add_node(root, 0, -1)
+
+        # A unit listed twice (same key) is one node; its first row is the one kept
+        units = self.unit_rows
+        row_ids = []
+        for position, key, level in zip(
+                np.flatnonzero(is_unit),
+                zip(units['Country'], units['Survey_Year'].astype(object), units['Geo_Parent'], units['Geo_Name']),
+                units['Geo_Level'].astype(int)):
+            if key not in self._ids:
+                add_node(key, level, position)
+            row_ids.append(self._ids[key])
+
+        self._level = np.array(levels, dtype='int64')
+        self._position = np.array(positions, dtype='int64')
+        self._row_ids = np.array(row_ids, dtype='int64')
+        self._parent = self._resolve_parents()
+        self._children = defaultdict(list)
+        for node, parent in enumerate(self._parent):
+            if parent >= 0:
+                self._children[parent].append(node)
+
+    def _resolve_parents(self):
+        """
+        Node id of each node's parent (-1 for roots and orphans)
+
+        Geo_Parent is a name, so it is matched against the units one level up
+        in the same country and round. If several share that name, the
+        closest one listed before the child wins, which is how the cleaning
+        step assigned Geo_Parent in the first place.
+        """
+        by_name = defaultdict(list)
+        for node, (country, year, _, name) in enumerate(self._keys):
+            by_name[(country, year, self._level[node], name)].append(node)
+
+        parents = np.full(len(self._keys), -1, dtype='int64')
+        for node, (country, year, parent_name, _) in enumerate(self._keys):
+            if self._level[node] == 0 or parent_name is None:
+                continue
+            candidates = by_name.get((country, year, self._level[node] - 1, parent_name), [])
+            preceding = [candidate for candidate in candidates
+                         if self._position[candidate] < self._position[node]]
+            if preceding:
+                parents[node] = preceding[-1]
+            elif candidates:
+                parents[node] = candidates[0]
+        return parents
+
+    def __contains__(self, key):
+        return tuple(key) in self._ids
+
+    def _id(self, key):
+        return self._ids[tuple(key)]
+
+    def root(self, country, year):
+        """Key of a country in one survey round"""
+        key = (country, year, None, country)
+        self._id(key)
+        return key
+
+    def find(self, name, year=None, country=None):
+        """Keys of every unit called `name`, optionally within one round and/or country"""
+        return [key for key in self._keys
+                if key[3] == name and key[2] is not None
+                and (year is None or key[1] == year) and (country is None or key[0] == country)]
+
+    def unit(self, name, year, country=None, parent=None):
+        """
+        Key of the one unit called `name` in a round
+
+        Raises KeyError if there is none and ValueError if the name is
+        ambiguous; pass `parent` (a name) and/or `country` to narrow it down.
+        """
+        matches = [key for key in self.find(name, year, country) if parent is None or key[2] == parent]
+        if not matches:
+            raise KeyError((name, year, country, parent))
+        if len(matches) > 1:
+            raise ValueError(f"{name!r} is ambiguous in {year}: {matches}; pass parent= or country=")
+        return matches[0]
+
+    def level(self, key):
+        """Geography level of a unit (0 for the country)"""
+        return int(self._level[self._id(key)])
+
+    def parent(self, key):
+        """Key of the unit one level up, or None for the country"""
+        parent = self._parent[self._id(key)]
+        return self._keys[parent] if parent >= 0 else None
+
+    def children(self, key):
+        """Keys of the units directly below `key`, in file order"""
+        return [self._keys[child] for child in self._children.get(self._id(key), [])]
+
+    def ancestors(self, key):
+        """Keys from the parent up to the country"""
+        chain = []
+        parent = self._parent[self._id(key)]
+        while parent >= 0:
+            chain.append(self._keys[parent])
+            parent = self._parent[parent]
+        return chain
+
+    def descendants(self, key, level=None):
+        """Every unit below `key` (depth first), optionally only those at `level`"""
+        found = []
+        stack = list(reversed(self._children.get(self._id(key), [])))
+        while stack:
+            child = stack.pop()
+            if level is None or self._level[child] == level:
+                found.append(self._keys[child])
+            stack.extend(reversed(self._children.get(child, [])))
+        return found
+
+    def row(self, key):
+        """The cleaned row for one subnational unit"""
+        position = self._position[self._id(key)]
+        if position < 0:
+            raise KeyError(f"{key} is a country and has no unit row")
+        return self.df.iloc[position]
+
+    def _unit_mask(self, level, year=None, parent=None):
+        mask = (self.unit_rows['Geo_Level'] == level).to_numpy(dtype=bool, na_value=False)
+        if year is not None:
+            mask &= (self.unit_rows['Survey_Year'] == year).to_numpy(dtype=bool, na_value=False)
+        if parent is not None:
+            mask &= self._parent[self._row_ids] == self._id(parent)
+        return mask
+
+    def units(self, level, year=None, parent=None):
+        """Rows for every unit at `level`, optionally within one round and/or below one parent key"""
+        return self.unit_rows[self._unit_mask(level, year, parent)]
+
+    def rollup(self, metrics=None, level=0, from_level=None, year=None, how='mean'):
+        """
+        Aggregate metrics of lower-level units up to their ancestors at `level`
+
+        By default the units one level below `level` are aggregated (e.g.
+        level=1 averages districts into their state). The aggregation is
+        unweighted: DHS exports carry no population weights, so 'mean' is
+        the mean of the unit percentages, not a population estimate.
+        Returns one row per ancestor, identified by its UNIT_KEY columns,
+        with a `Units` count. Units whose parent could not be resolved are
+        left out.
+        """
+        metrics = metrics or METRIC_COLUMNS
+        from_level = level + 1 if from_level is None else from_level
+        mask = self._unit_mask(from_level, year=year)
+        rows = self.unit_rows[mask]
+
+        # Walk each row's node up to `level` through the parent array
+        ancestor = self._row_ids[mask]
+        for _ in range(from_level - level):
+            ancestor = np.where(ancestor >= 0, self._parent[np.maximum(ancestor, 0)], -1)
+        resolved = ancestor >= 0
+
+        grouped = rows[metrics][resolved].groupby(ancestor[resolved], sort=False)
+        result = grouped.agg(how)
+        result['Units'] = grouped.size()
+        keys = pd.DataFrame([self._keys[node] for node in result.index], columns=UNIT_KEY)
+        return pd.concat([keys, result.reset_index(drop=True)], axis=1)
+
+
+def load_geography(csv_path=CLEANED_DATA_CSV):
+    """Load the cleaned dataset and build its GeographyTree"""
+    return GeographyTree(load_cleaned_data(csv_path))
@@ -0,0 +1,150 @@
+"""
+LONG-FORMAT INDICATOR STORE
+India Obesity Dashboard
+
+The cleaned dataset is wide: one column per metric plus one completeness
+flag per metric. IndicatorStore keeps the same data long instead, so adding
+a DHS indicator (anemia, stunting, BMI >= 30, ...) adds rows, not columns:
+
+- series: one row per series key (Country, Survey, years, Category,
+  Subcategory, Characteristic, geography); its position is the series_id
+- values: one row per (indicator, series_id) that has a value, sorted by
+  indicator so each indicator is one contiguous block
+
+INDICATOR_REGISTRY (defined in obesity_data_cleaning, re-exported here)
+holds each indicator's metadata (label, raw export column, wide column name,
+completeness flag, unit, population). The cleaning pipeline reads its metric
+columns from the registry, so registering an indicator before cleaning an
+export that has it carries it through to the cleaned data and into the
+store. wide() pivots any subset of indicators back to the familiar wide
+layout, reading only those indicators' blocks; completeness flags are
+derived at that point rather than stored.
+
+    store = load_indicator_store()
+    women = store.wide(['women_overweight'])
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_loader import CLEANED_DATA_CSV, load_cleaned_data
+from obesity_data_cleaning import (  # noqa: F401  (the registry is re-exported from here)
+    ALL_METRICS_FLAG,
+    INDICATOR_REGISTRY,
+    SERIES_KEY_COLUMNS,
+    register_indicator,
+)
+
+
+def indicator_metadata(indicators=None):
+    """Registry entries as a DataFrame indexed by indicator id"""
+    ids = list(INDICATOR_REGISTRY) if indicators is None else list(indicators)
+    return pd.DataFrame.from_dict({i: INDICATOR_REGISTRY[i] for i in ids}, orient='index')
+
+
+def _source_columns(df, indicators):
+    """Indicator id → the column holding it in `df` (wide or raw export name)"""
+    columns = {}
+    for indicator_id, meta in INDICATOR_REGISTRY.items():
+        if indicators is not None and indicator_id not in indicators:
+            continue
+        for col in (meta['wide_column'], meta['raw_column']):
+            if col in df.columns:
+                columns[indicator_id] = col
+                break
+    if indicators is not None:
+        missing = [i for i in indicators if i not in columns]
+        if missing:
+            raise KeyError(f"No column for indicators: {missing}")
+    return columns
+
+
+class IndicatorStore:
+    """Series keys plus one long table of (indicator, series_id, value)"""
+
+    def __init__(self, series, values):
+        self.series = series
+        self.values = values
+
+        # values is sorted by indicator, so block i is offsets[i]:offsets[i + 1]
+        codes = values['indicator'].cat.codes.to_numpy()
+        categories = values['indicator'].cat.categories
+        self._offsets = dict(zip(
+            categories,
+            zip(np.searchsorted(codes, np.arange(len(categories)), side='left'),
+                np.searchsorted(codes, np.arange(len(categories)), side='right')),
+        ))
+
+    @classmethod
+    def from_frame(cls, df, indicators=None):
+        """
+        Build a store from a frame with series key columns and indicator columns
+
+        Indicator columns may carry either their wide or raw export name;
+        values are coerced to numbers and missing ones are not stored.
+        `indicators` limits which registered indicators are read (default:
+        every registered indicator that has a column in `df`).
+        """
+        columns = _source_columns(df, indicators)
+        ids = list(columns)
+
+        series = df[[col for col in SERIES_KEY_COLUMNS if col in df.columns]].reset_index(drop=True)
+        matrix = np.empty((len(ids), len(df)), dtype='float64')
+        for row, indicator_id in enumerate(ids):
+            matrix[row] = pd.to_numeric(df[columns[indicator_id]], errors='coerce').to_numpy(dtype='float64')
+
+        present = ~np.isnan(matrix)
+        indicator_codes, series_ids = np.nonzero(present)
+        values = pd.DataFrame({
+            'indicator': pd.Categorical.from_codes(indicator_codes, categories=ids),
+            'series_id': series_ids.astype('int32'),
+            'value': matrix[present],
+        })
+        return cls(series, values)
+
+    def indicators(self):
+        """Ids of the indicators held in the store"""
+        return list(self._offsets)
+
+    def _block(self, indicator_id):
+        if indicator_id not in self._offsets:
+            raise KeyError(f"Indicator not in store: {indicator_id}")
+        start, end = self._offsets[indicator_id]
+        return self.values.iloc[start:end]
+
+    def long(self, indicators=None):
+        """One row per series key per indicator, for the selected indicators"""
+        ids = self.indicators() if indicators is None else list(indicators)
+        blocks = pd.concat([self._block(i) for i in ids], ignore_index=True) if ids else self.values.iloc[:0]
+        keys = self.series.iloc[blocks['series_id'].to_numpy()].reset_index(drop=True)
+        return pd.concat([keys, blocks[['indicator', 'value']].reset_index(drop=True)], axis=1)
+
+    def wide(self, indicators=None, flags=True):
+        """
+        Pivot the selected indicators to one column each, one row per series
+
+        With `flags`, each indicator's completeness flag and ALL_METRICS_FLAG
+        (every selected indicator present) are added after the values.
+        """
+        ids = self.indicators() if indicators is None else list(indicators)
+        df = self.series.copy()
+
+        present = {}
+        for indicator_id in ids:
+            block = self._block(indicator_id)
+            column = np.full(len(df), np.nan)
+            column[block['series_id'].to_numpy()] = block['value'].to_numpy()
+            df[INDICATOR_REGISTRY[indicator_id]['wide_column']] = column
+            present[indicator_id] = ~np.isnan(column)
+
+        if flags:
+            for indicator_id in ids:
+                df[INDICATOR_REGISTRY[indicator_id]['flag_column']] = present[indicator_id]
+            df[ALL_METRICS_FLAG] = np.logical_and.reduce(list(present.values())) if ids \
+                else np.ones(len(df), dtype=bool)
+        return df
+
+
+def load_indicator_store(csv_path=CLEANED_DATA_CSV, indicators=None):
+    """Load the cleaned dataset and convert it to an IndicatorStore"""
+    return IndicatorStore.from_frame(load_cleaned_data(csv_path), indicators=indicators)
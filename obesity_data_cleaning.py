@@ -1,7 +1,50 @@
+import argparse
+import contextlib
+import cProfile
+import glob
+import hashlib
+import io
+import json
+import os
+import pstats
+import shutil
+import sqlite3
+import time
+import tracemalloc
 import pandas as pd
 import numpy as np
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+
+from streaming_stats import (
+    finalize_metric_stats,
+    merge_metric_stats,
+    new_metric_stats,
+    update_metric_stats,
+)
+from validation_rules import (
+    empty_violations,
+    evaluate_rules,
+    finish_rule_state,
+    is_frame_rule,
+    new_rule_state,
+    update_rule_state,
+)
+
+try:
+    import pyarrow  # noqa: F401  (needed by pandas for Parquet; the optional `arrow` extra)
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+def require_pyarrow(feature):
+    """Fail with an install hint when a pyarrow-only feature is used without it"""
+    if not HAS_PYARROW:
+        raise ImportError(f"{feature} needs pyarrow: install the optional `arrow` extra "
+                          f"(uv sync --extra arrow, or pip install pyarrow)")
 
 """
 OBESITY DATA CLEANING PIPELINE
@@ -10,13 +53,311 @@ Healthcare Domain - India DHS Survey Data
 This script cleans the contaminated obesity dataset and prepares it for dashboard visualization.
 """
 
-def load_raw_data(filepath):
+RAW_DATA_PATH = '/home/claude/obesity_data_raw.csv'
+CLEANED_DATA_PATH = '/home/claude/obesity_data_cleaned.csv'
+
+# Columns that identify a series (one row of the cleaned dataset), ahead of the indicators
+SERIES_KEY_COLUMNS = [
+    'Country',
+    'Survey',
+    'Survey_Year',
+    'Survey_Start_Year',
+    'Survey_End_Year',
+    'Category',
+    'Subcategory',
+    'Characteristic',
+    'Geo_Level',
+    'Geo_Name',
+    'Geo_Parent',
+]
+
+# Set on a row when every indicator it carries has a value
+ALL_METRICS_FLAG = 'Has_All_Metrics'
+
+# dtypes of the cleaned columns, used to read the CSV back and to type the
+# Parquet dataset; register_indicator adds each indicator's value and flag
+CLEANED_DTYPES = {
+    'Country': object,
+    'Survey': object,
+    'Survey_Year': 'Int64',
+    'Survey_Start_Year': 'Int64',
+    'Survey_End_Year': 'Int64',
+    'Category': object,
+    'Subcategory': object,
+    'Characteristic': object,
+    'Geo_Level': 'Int64',
+    'Geo_Name': object,
+    'Geo_Parent': object,
+    ALL_METRICS_FLAG: 'bool',
+}
+
+# Indicator metadata: label, raw export column, cleaned value and
+# completeness flag columns, unit, population and definition. The cleaning
+# steps read their metric columns from here, so an export that also carries
+# a registered indicator (anemia, stunting, ...) keeps it; see indicator_store.py
+INDICATOR_REGISTRY = {}
+
+
+def register_indicator(indicator_id, label, raw_column, wide_column=None, flag_column=None,
+                       unit='%', population=None, definition=None):
+    """
+    Add (or replace) an indicator in INDICATOR_REGISTRY
+    
+    `raw_column` is the StatCompiler export header. `wide_column` and
+    `flag_column` name the indicator's value and completeness columns in
+    the cleaned data; they default to the indicator id in title case with a
+    _Pct suffix and a Has_ prefix respectively.
+    """
+    wide_column = wide_column or '_'.join(part.capitalize() for part in indicator_id.split('_')) + '_Pct'
+    INDICATOR_REGISTRY[indicator_id] = {
+        'label': label,
+        'raw_column': raw_column,
+        'wide_column': wide_column,
+        'flag_column': flag_column or f'Has_{wide_column}',
+        'unit': unit,
+        'population': population,
+        'definition': definition,
+    }
+    CLEANED_DTYPES[wide_column] = 'float64'
+    CLEANED_DTYPES[INDICATOR_REGISTRY[indicator_id]['flag_column']] = 'bool'
+    return INDICATOR_REGISTRY[indicator_id]
+
+
+register_indicator(
+    'children_overweight', 'Children overweight',
+    raw_column='Children overweight',
+    wide_column='Children_Overweight_Pct', flag_column='Has_Complete_Children_Data',
+    population='Children under 5', definition='Weight-for-height above +2 SD (WHO growth standards)',
+)
+register_indicator(
+    'women_overweight', 'Women overweight or obese',
+    raw_column='Women who are overweight or obese according to BMI (>=25.0)',
+    wide_column='Women_Overweight_Pct', flag_column='Has_Complete_Women_Data',
+    population='Women 15-49', definition='BMI >= 25.0',
+)
+register_indicator(
+    'men_overweight', 'Men overweight or obese',
+    raw_column='Men who are overweight or obese according to BMI (>=25.0)',
+    wide_column='Men_Overweight_Pct', flag_column='Has_Complete_Men_Data',
+    population='Men 15-49', definition='BMI >= 25.0',
+)
+
+# Every export has these; they make up the published COLUMN_ORDER
+CORE_INDICATORS = ['children_overweight', 'women_overweight', 'men_overweight']
+
+# Raw StatCompiler export layout. Everything is read as raw text: contaminated
+# rows put citations in the metric columns, so numbers are converted later
+# (convert_numeric_columns) instead of being inferred at parse time. `object`
+# rather than `str` keeps empty cells missing under the pyarrow engine.
+RAW_SCHEMA = {
+    'Country': object,
+    'Survey': object,
+    'Characteristic': object,
+    **{INDICATOR_REGISTRY[indicator_id]['raw_column']: object for indicator_id in CORE_INDICATORS},
+}
+
+# The Parquet dataset is hive-partitioned on these columns
+PARTITION_COLUMNS = ['Country', 'Survey_Year']
+
+METRIC_COLUMNS = [INDICATOR_REGISTRY[indicator_id]['wide_column'] for indicator_id in CORE_INDICATORS]
+
+COMPLETENESS_COLUMNS = [INDICATOR_REGISTRY[indicator_id]['flag_column'] for indicator_id in CORE_INDICATORS] + [
+    ALL_METRICS_FLAG
+]
+
+COLUMN_ORDER = SERIES_KEY_COLUMNS + METRIC_COLUMNS + COMPLETENESS_COLUMNS
+
+# Raw export metric headers → clean names (create_clean_column_names)
+CLEAN_COLUMN_NAMES = {
+    INDICATOR_REGISTRY[indicator_id]['raw_column']: INDICATOR_REGISTRY[indicator_id]['wide_column']
+    for indicator_id in CORE_INDICATORS
+}
+
+# Optional uncertainty columns. An export made with standard errors or
+# confidence intervals switched on has "<metric header> SE", "... CI low" and
+# "... CI high" columns; they are kept, renamed to <metric>_SE, _CI_Low and
+# _CI_High, after the COLUMN_ORDER columns (read by confidence_intervals.py).
+SE_SUFFIX = '_SE'
+CI_LOW_SUFFIX = '_CI_Low'
+CI_HIGH_SUFFIX = '_CI_High'
+RAW_UNCERTAINTY_SUFFIXES = {' SE': SE_SUFFIX, ' CI low': CI_LOW_SUFFIX, ' CI high': CI_HIGH_SUFFIX}
+RAW_UNCERTAINTY_NAMES = {
+    raw + raw_suffix: clean + suffix
+    for raw, clean in CLEAN_COLUMN_NAMES.items()
+    for raw_suffix, suffix in RAW_UNCERTAINTY_SUFFIXES.items()
+}
+UNCERTAINTY_COLUMNS = list(RAW_UNCERTAINTY_NAMES.values())
+CLEANED_DTYPES.update({col: 'float64' for col in UNCERTAINTY_COLUMNS})
+
+# Checked by validate_cleaned_data right after add_derived_columns (see validation_rules.py)
+VALIDATION_RULES = [
+    {'name': 'percentage_out_of_range', 'check': 'range', 'columns': METRIC_COLUMNS, 'min': 0, 'max': 100,
+     'severity': 'error', 'message': 'percentage outside 0-100'},
+    {'name': 'duplicate_key', 'check': 'unique', 'columns': ['Country', 'Survey', 'Characteristic'],
+     'severity': 'error', 'message': 'more than one row for this Country/Survey/Characteristic'},
+    {'name': 'end_before_start', 'check': 'not_before', 'column': 'Survey_End_Year', 'other': 'Survey_Start_Year',
+     'severity': 'error', 'message': 'survey end year before start year'},
+    {'name': 'state_vanished', 'check': 'persists', 'level': 1,
+     'severity': 'warning', 'message': 'state missing from the next survey round'},
+]
+
+# SQLite store: one table in COLUMN_ORDER, indexed on the lookup columns
+SQLITE_TABLE = 'cleaned_data'
+SQLITE_INDEX_COLUMNS = ['Country', 'Survey_Year', 'Category', 'Subcategory']
+
+
+def raw_csv_options(engine=None, optional_columns=()):
+    """
+    read_csv keyword arguments for the raw export layout
+    
+    Columns outside RAW_SCHEMA (plus the given optional raw columns) are
+    never materialized and no type inference runs. The pyarrow CSV engine is
+    used when it is installed, unless an `engine` is passed explicitly.
+    """
+    if engine is None:
+        engine = 'pyarrow' if HAS_PYARROW else 'c'
+    return {
+        'skiprows': 1,
+        'usecols': list(RAW_SCHEMA) + list(optional_columns),
+        'dtype': {**RAW_SCHEMA, **{col: object for col in optional_columns}},
+        'engine': engine,
+    }
+
+
+def raw_optional_columns(filepath):
+    """
+    Raw columns beyond RAW_SCHEMA that an export's header has and the pipeline keeps
+    
+    Those are the raw columns of the non-core registered indicators, then
+    the SE/CI columns (RAW_UNCERTAINTY_NAMES).
+    """
+    # The pyarrow engine rejects a callable usecols, so the header is read first
+    header = pd.read_csv(filepath, skiprows=1, nrows=0).columns
+    extra_indicators = [meta['raw_column'] for indicator_id, meta in INDICATOR_REGISTRY.items()
+                        if indicator_id not in CORE_INDICATORS]
+    return [col for col in extra_indicators + list(RAW_UNCERTAINTY_NAMES) if col in header and col not in RAW_SCHEMA]
+
+
+def present_indicators(columns, name='wide_column'):
+    """Registry entries of the indicators whose `name` column ('wide_column' or 'raw_column') is in `columns`"""
+    return [meta for meta in INDICATOR_REGISTRY.values() if meta[name] in columns]
+
+
+def uncertainty_columns(columns):
+    """Clean SE/CI column names present in `columns`, in UNCERTAINTY_COLUMNS order"""
+    return [col for col in UNCERTAINTY_COLUMNS if col in columns]
+
+
+def cleaned_columns(columns):
+    """
+    Published column order of a cleaned frame with `columns`
+    
+    COLUMN_ORDER, with the values and flags of any further registered
+    indicators after the core ones, followed by the SE/CI columns.
+    """
+    indicators = present_indicators(columns)
+    return (SERIES_KEY_COLUMNS
+            + [meta['wide_column'] for meta in indicators]
+            + [meta['flag_column'] for meta in indicators]
+            + [ALL_METRICS_FLAG]
+            + uncertainty_columns(columns))
+
+
+def load_raw_data(filepath, engine=None):
     """Load the raw CSV file, skipping the blank first row"""
-    df = pd.read_csv(filepath, skiprows=1)
+    df = pd.read_csv(filepath, **raw_csv_options(engine, raw_optional_columns(filepath)))
     print(f"✓ Loaded raw data: {df.shape[0]} rows × {df.shape[1]} columns")
     return df
 
 
+def load_raw_data_chunks(filepath, chunksize):
+    """Lazily load the raw CSV file in chunks of `chunksize` rows"""
+    # The pyarrow engine cannot stream, so chunks always use the C parser
+    options = raw_csv_options('c', raw_optional_columns(filepath))
+    with pd.read_csv(filepath, chunksize=chunksize, **options) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+# Reason codes for contaminated rows, in priority order
+CONTAMINATION_REASONS = ['citation', 'column_header', 'description', 'numeric_country']
+
+# Column names that leak into the data as values
+METRIC_HEADER_PATTERN = 'Children overweight|Women who are overweight|Men who are overweight'
+
+# Reason code → case-insensitive pattern, per scanned column, tried in order.
+# A Survey cell starting "Percentage of" is a description even when it names
+# a metric ("Percentage of women who are overweight").
+COUNTRY_CONTAMINATION_PATTERNS = {
+    'citation': re.compile('http|ICF|USAID|statcompiler', re.IGNORECASE),
+    'column_header': re.compile(METRIC_HEADER_PATTERN, re.IGNORECASE),
+}
+SURVEY_CONTAMINATION_PATTERNS = {
+    'description': re.compile('^Percentage of', re.IGNORECASE),
+    'column_header': re.compile(METRIC_HEADER_PATTERN, re.IGNORECASE),
+}
+
+
+def _classify_column_values(values, patterns, flag_numeric=False):
+    """
+    Return a reason code (or None) per row of one column
+    
+    The column is factorized so the patterns only run once per distinct
+    value, and the per-value reasons are broadcast back to the rows. A value
+    matching several patterns gets the first reason in `patterns`.
+    """
+    codes, uniques = pd.factorize(values)
+    unique_str = pd.Series(uniques, dtype=object).astype(str)
+    
+    conditions = [unique_str.str.contains(pattern).to_numpy() for pattern in patterns.values()]
+    choices = list(patterns)
+    
+    if flag_numeric:
+        # A numeric value in a text column means the row is a stray data/footer line
+        conditions.append(pd.to_numeric(pd.Series(uniques, dtype=object), errors='coerce').notna().to_numpy())
+        choices.append('numeric_country')
+    
+    unique_reasons = np.select(conditions, choices, default=None).astype(object)
+    
+    # Trailing None for missing values (code -1)
+    unique_reasons = np.append(unique_reasons, None)
+    return unique_reasons[codes]
+
+
+def classify_contaminated_rows(df):
+    """
+    Classify contaminated rows (metadata, citations, headers) with a reason code
+    
+    Reason codes:
+    - citation: citation text in Country column ("http", "ICF", "USAID", ...)
+    - column_header: column names appearing as data values
+    - description: description text in Survey column ("Percentage of ...")
+    - numeric_country: a number where the Country name should be
+    
+    Each column is scanned once and gives each row at most one reason (the
+    first of its patterns that matches). When Country and Survey both give
+    one, the row gets the one that comes first in CONTAMINATION_REASONS.
+    Returns (contaminated_mask, reasons) where reasons is a categorical
+    Series that is NaN for clean rows.
+    """
+    country_reasons = _classify_column_values(df['Country'], COUNTRY_CONTAMINATION_PATTERNS, flag_numeric=True)
+    survey_reasons = _classify_column_values(df['Survey'], SURVEY_CONTAMINATION_PATTERNS)
+    
+    # Position in CONTAMINATION_REASONS (len() when clean); the lower one wins
+    clean = len(CONTAMINATION_REASONS)
+    country_rank = pd.Categorical(country_reasons, categories=CONTAMINATION_REASONS).codes
+    survey_rank = pd.Categorical(survey_reasons, categories=CONTAMINATION_REASONS).codes
+    rank = np.minimum(np.where(country_rank < 0, clean, country_rank), np.where(survey_rank < 0, clean, survey_rank))
+    
+    reasons = pd.Series(
+        pd.Categorical.from_codes(np.where(rank == clean, -1, rank), categories=CONTAMINATION_REASONS),
+        index=df.index,
+        name='Contamination_Reason'
+    )
+    contaminated_mask = reasons.notna().rename(None)
+    return contaminated_mask, reasons
+
+
 def identify_contaminated_rows(df):
     """
     Identify and flag contaminated rows (metadata, citations, headers)
@@ -25,45 +366,84 @@ def identify_contaminated_rows(df):
     1. Citation text in Country column
     2. Column names appearing as data values
     3. Description text in Survey column
+    4. Numeric values in Country column
     """
-    contaminated_mask = pd.Series([False] * len(df), index=df.index)
-    
-    # Check for citation text (contains "http", "ICF", "USAID", etc.)
-    contaminated_mask |= df['Country'].astype(str).str.contains('http|ICF|USAID|statcompiler', case=False, na=False)
-    
-    # Check for column names appearing as values
-    column_names = ['Children overweight', 'Women who are overweight', 'Men who are overweight']
-    for col_name in column_names:
-        contaminated_mask |= df['Country'].astype(str).str.contains(col_name, case=False, na=False)
-        contaminated_mask |= df['Survey'].astype(str).str.contains(col_name, case=False, na=False)
-    
-    # Check for description text (starts with "Percentage of")
-    contaminated_mask |= df['Survey'].astype(str).str.contains('^Percentage of', case=False, na=False)
-    
-    # Check for rows where numeric columns have non-numeric country names
-    numeric_cols = df.columns[3:]  # Last 3 columns should be numeric
-    for col in numeric_cols:
-        # If the Country column value appears to be numeric, it's probably a contaminated row
-        try:
-            contaminated_mask |= pd.to_numeric(df['Country'], errors='coerce').notna()
-        except:
-            pass
+    contaminated_mask, reasons = classify_contaminated_rows(df)
     
     print(f"✓ Identified {contaminated_mask.sum()} contaminated rows")
     return contaminated_mask
 
 
-def remove_contaminated_rows(df):
-    """Remove contaminated rows from the dataset"""
-    contaminated_mask = identify_contaminated_rows(df)
+def reset_quarantine(quarantine_path):
+    """Delete an earlier run's quarantine (or violations) file so this run starts fresh"""
+    if quarantine_path is None:
+        return
+    if os.path.isdir(quarantine_path):
+        shutil.rmtree(quarantine_path)
+    elif os.path.exists(quarantine_path):
+        os.remove(quarantine_path)
+
+
+def write_quarantine(dropped_df, quarantine_path):
+    """
+    Append dropped rows to the quarantine file in one bulk write
+    
+    A path ending in .parquet is a Parquet dataset partitioned by reason,
+    written with quarantine_parquet_schema() so every write agrees on the
+    column types; anything else is a CSV that gets its header on first write.
+    """
+    if len(dropped_df) == 0:
+        return
+    if quarantine_path.endswith('.parquet'):
+        dropped_df = dropped_df.astype({'Contamination_Reason': object})
+        dropped_df.to_parquet(quarantine_path, partition_cols=['Contamination_Reason'], index=False,
+                              schema=quarantine_parquet_schema(dropped_df.columns))
+    else:
+        header = not os.path.exists(quarantine_path)
+        dropped_df.to_csv(quarantine_path, mode='a', header=header, index=False)
+
+
+def quarantined_rows(df, contaminated_mask, reasons):
+    """The dropped rows as written to the quarantine: source row number and reason code first"""
+    dropped = df[contaminated_mask].copy()
+    dropped.insert(0, 'Contamination_Reason', reasons[contaminated_mask])
+    dropped.insert(0, 'Source_Row', dropped.index)
+    return dropped
+
+
+def remove_contaminated_rows(df, quarantine_path=None, verbose=False, dropped_rows=None):
+    """
+    Remove contaminated rows from the dataset
+    
+    Dropped rows go to `quarantine_path` (if given) with their reason code
+    and source row number. With `dropped_rows` (a list), that quarantine
+    frame is appended to it instead, for callers that write it later (the
+    batch workers). The console gets counts per reason; `verbose` brings
+    back the old one-line-per-row listing.
+    """
+    contaminated_mask, reasons = classify_contaminated_rows(df)
+    n_contaminated = int(contaminated_mask.sum())
+    print(f"✓ Identified {n_contaminated} contaminated rows")
+    
+    if n_contaminated > 0:
+        print(f"\n🗑️  REMOVING {n_contaminated} CONTAMINATED ROWS:")
+        for reason, count in reasons[contaminated_mask].value_counts(sort=False).items():
+            if count > 0:
+                print(f"  - {reason}: {count} rows")
+        
+        if verbose:
+            contaminated_df = df[contaminated_mask]
+            country_str = contaminated_df['Country'].astype(str).str[:50].where(contaminated_df['Country'].notna(), 'NULL')
+            survey_str = contaminated_df['Survey'].astype(str).str[:50].where(contaminated_df['Survey'].notna(), 'NULL')
+            lines = "  Row " + contaminated_df.index.astype(str) + ": Country='" + country_str + "', Survey='" + survey_str + "'"
+            print("\n".join(lines))
+        
+        if quarantine_path is not None and dropped_rows is None:
+            write_quarantine(quarantined_rows(df, contaminated_mask, reasons), quarantine_path)
+            print(f"  Quarantined to: {quarantine_path}")
     
-    if contaminated_mask.sum() > 0:
-        print(f"\n🗑️  REMOVING {contaminated_mask.sum()} CONTAMINATED ROWS:")
-        contaminated_df = df[contaminated_mask]
-        for idx, row in contaminated_df.iterrows():
-            country_str = str(row['Country'])[:50] if pd.notna(row['Country']) else 'NULL'
-            survey_str = str(row['Survey'])[:50] if pd.notna(row['Survey']) else 'NULL'
-            print(f"  Row {idx}: Country='{country_str}', Survey='{survey_str}'")
+    if dropped_rows is not None:
+        dropped_rows.append(quarantined_rows(df, contaminated_mask, reasons))
     
     df_clean = df[~contaminated_mask].copy()
     df_clean = df_clean.reset_index(drop=True)
@@ -72,20 +452,26 @@ def remove_contaminated_rows(df):
     return df_clean
 
 
-def extract_year_from_survey(survey_name):
-    """
-    Extract start and end year from survey name
-    Examples:
-    - "2019-21 DHS" → start=2019, end=2021
-    - "2015-16 DHS" → start=2015, end=2016
-    - "2005-06 DHS" → start=2005, end=2006
-    - "1998-99 DHS" → start=1998, end=1999
-    """
-    if pd.isna(survey_name):
-        return None, None
-    
+# NFHS rounds are published under the DHS survey years they were fielded in
+NFHS_ROUND_YEARS = {
+    1: (1992, 1993),
+    2: (1998, 1999),
+    3: (2005, 2006),
+    4: (2015, 2016),
+    5: (2019, 2021),
+    6: (2023, 2024),
+}
+
+SURVEY_RANGE_PATTERN = re.compile(r'(\d{4})\s*[-–/]\s*(\d{2,4})')
+SURVEY_SINGLE_YEAR_PATTERN = re.compile(r'(?<!\d)(\d{4})(?!\d)')
+SURVEY_NFHS_PATTERN = re.compile(r'NFHS\s*[-–]?\s*(\d+)', re.IGNORECASE)
+
+
+@lru_cache(maxsize=None)
+def _parse_survey_name(survey_name):
+    """Parse one survey name; cached because exports repeat a handful of names"""
     # Pattern: "YYYY-YY DHS" or "YYYY-YYYY DHS"
-    match = re.search(r'(\d{4})-(\d{2,4})', str(survey_name))
+    match = SURVEY_RANGE_PATTERN.search(survey_name)
     if match:
         start_year = int(match.group(1))
         end_year_str = match.group(2)
@@ -95,14 +481,69 @@ def extract_year_from_survey(survey_name):
             # Get century from start year
             century = (start_year // 100) * 100
             end_year = century + int(end_year_str)
+            # "1999-00 DHS" ends in the next century
+            if end_year < start_year:
+                end_year += 100
         else:
             end_year = int(end_year_str)
         
         return start_year, end_year
     
+    # Pattern: "YYYY DHS" (single-year survey)
+    match = SURVEY_SINGLE_YEAR_PATTERN.search(survey_name)
+    if match:
+        year = int(match.group(1))
+        return year, year
+    
+    # Pattern: "NFHS-5" (round number only)
+    match = SURVEY_NFHS_PATTERN.search(survey_name)
+    if match:
+        return NFHS_ROUND_YEARS.get(int(match.group(1)), (None, None))
+    
     return None, None
 
 
+def extract_year_from_survey(survey_name):
+    """
+    Extract start and end year from survey name
+    Examples:
+    - "2019-21 DHS" → start=2019, end=2021
+    - "2015-16 DHS" → start=2015, end=2016
+    - "2005-06 DHS" → start=2005, end=2006
+    - "1998-99 DHS" → start=1998, end=1999
+    - "1999-00 DHS" → start=1999, end=2000
+    - "2022 DHS" → start=2022, end=2022
+    - "NFHS-5 (2019-21)" → start=2019, end=2021
+    - "NFHS-4" → start=2015, end=2016
+    """
+    if pd.isna(survey_name):
+        return None, None
+    
+    return _parse_survey_name(str(survey_name))
+
+
+def extract_years_from_survey_column(surveys):
+    """
+    Vectorized extract_year_from_survey over a whole Survey column
+    
+    Each distinct survey name is parsed once and the years are broadcast back
+    to every row. Returns (start_years, end_years) as nullable Int64 Series.
+    """
+    codes, uniques = pd.factorize(surveys)
+    
+    # One row per unique survey name, plus a trailing all-missing row for code -1
+    years = np.full((len(uniques) + 1, 2), np.nan)
+    for i, survey_name in enumerate(uniques):
+        start_year, end_year = extract_year_from_survey(survey_name)
+        if start_year is not None:
+            years[i] = (start_year, end_year)
+    
+    row_years = years[codes]
+    start_years = pd.Series(row_years[:, 0], index=surveys.index).astype('Int64')
+    end_years = pd.Series(row_years[:, 1], index=surveys.index).astype('Int64')
+    return start_years, end_years
+
+
 def split_characteristic_column(df):
     """
     Split 'Characteristic' column into 'Category' and 'Subcategory'
@@ -112,24 +553,18 @@ def split_characteristic_column(df):
     - "Total" → Category="Total", Subcategory="Total"
     - "Age (5-year groups) : 15-19" → Category="Age (5-year groups)", Subcategory="15-19"
     """
-    df['Category'] = None
-    df['Subcategory'] = None
+    has_value = df['Characteristic'].notna()
+    char_str = df['Characteristic'].astype(str).str.strip()
     
-    for idx, char in df['Characteristic'].items():
-        if pd.isna(char):
-            continue
-        
-        char_str = str(char).strip()
-        
-        if ':' in char_str:
-            # Split by colon
-            parts = char_str.split(':', 1)
-            df.at[idx, 'Category'] = parts[0].strip()
-            df.at[idx, 'Subcategory'] = parts[1].strip()
-        else:
-            # No colon - use the value for both
-            df.at[idx, 'Category'] = char_str
-            df.at[idx, 'Subcategory'] = char_str
+    # Split the whole column on the first colon in one pass
+    parts = char_str.str.partition(':').reindex(columns=[0, 1, 2], fill_value='')
+    has_colon = parts[1] == ':'
+    
+    # No colon - use the value for both; missing values stay None
+    category = parts[0].str.strip().where(has_colon, char_str)
+    subcategory = parts[2].str.strip().where(has_colon, char_str)
+    df['Category'] = category.astype(object).where(has_value, None)
+    df['Subcategory'] = subcategory.astype(object).where(has_value, None)
     
     print(f"✓ Split Characteristic into Category and Subcategory")
     print(f"  Unique Categories: {df['Category'].nunique()}")
@@ -139,12 +574,9 @@ def split_characteristic_column(df):
 
 
 def convert_numeric_columns(df):
-    """Convert obesity metric columns to numeric, handling any remaining non-numeric values"""
-    numeric_cols = [
-        'Children overweight',
-        'Women who are overweight or obese according to BMI (>=25.0)',
-        'Men who are overweight or obese according to BMI (>=25.0)'
-    ]
+    """Convert indicator (and SE/CI) columns to numeric, handling any remaining non-numeric values"""
+    numeric_cols = [meta['raw_column'] for meta in present_indicators(df.columns, 'raw_column')]
+    numeric_cols += [col for col in RAW_UNCERTAINTY_NAMES if col in df.columns]
     
     for col in numeric_cols:
         # Convert to numeric, coercing errors to NaN
@@ -154,166 +586,1116 @@ def convert_numeric_columns(df):
     return df
 
 
-def add_derived_columns(df):
+# Subnational units end in their DHS geography level, e.g. "Kerala (L1)"
+GEO_LEVEL_PATTERN = r'^(?P<name>.*?)\s*\(L(?P<level>\d+)\)$'
+
+
+def add_geography_columns(df, open_parents=None):
+    """
+    Parse the DHS geography level and parent of every subnational row
+    
+    - Geo_Level: 1 for states (L1), 2 for districts (L2), ...; missing for
+      rows that are not a geographic unit
+    - Geo_Name: the unit name without the level suffix, e.g. "Kerala"
+    - Geo_Parent: the Country for L1 units; for deeper levels, the closest
+      preceding unit one level up in the same survey (exports list each
+      unit's children right after it)
+    
+    `open_parents` carries the last unit seen per (Country, Survey, level)
+    from one chunk to the next; the streaming pipeline passes the same dict
+    for every chunk so districts still find a state from an earlier chunk.
+    """
+    parts = df['Subcategory'].str.extract(GEO_LEVEL_PATTERN)
+    level = pd.to_numeric(parts['level']).astype('Int64')
+    df['Geo_Level'] = level
+    df['Geo_Name'] = parts['name'].astype(object).where(level.notna(), None)
+    
+    parent = df['Country'].where((level == 1).fillna(False))
+    survey_key = [df['Country'], df['Survey']]
+    for child_level in sorted(int(value) for value in level.dropna().unique() if value > 1):
+        # Name of the latest unit one level up, carried forward within each survey
+        candidates = df['Geo_Name'].where(level == child_level - 1)
+        carried = candidates.groupby(survey_key, sort=False).ffill()
+        # Rows before the chunk's first unit one level up continue the last earlier chunk's
+        open_units = {(country, survey): name for (country, survey, open_level), name in (open_parents or {}).items()
+                      if open_level == child_level - 1}
+        if open_units:
+            previous = pd.Series(list(open_units.values()), index=pd.MultiIndex.from_tuples(list(open_units)),
+                                 dtype=object).reindex(pd.MultiIndex.from_arrays(survey_key))
+            carried = carried.fillna(pd.Series(previous.to_numpy(), index=df.index))
+        parent = parent.mask((level == child_level).fillna(False), carried)
+    df['Geo_Parent'] = parent.astype(object).where(level.notna() & parent.notna(), None)
+    
+    if open_parents is not None:
+        units = df[level.notna()]
+        last_units = units.groupby(['Country', 'Survey', 'Geo_Level'], sort=False)['Geo_Name'].last()
+        open_parents.update({(country, survey, int(lvl)): name for (country, survey, lvl), name in last_units.items()})
+    
+    return df
+
+
+def add_completeness_flags(df, name='wide_column'):
+    """
+    Set each present indicator's Has_* flag and ALL_METRICS_FLAG from its values
+    
+    `name` says whether the values are still under their raw export headers
+    ('raw_column') or already renamed ('wide_column').
+    """
+    indicators = present_indicators(df.columns, name)
+    for meta in indicators:
+        df[meta['flag_column']] = df[meta[name]].notna()
+    
+    # Overall completeness flag
+    df[ALL_METRICS_FLAG] = np.logical_and.reduce([df[meta['flag_column']].to_numpy() for meta in indicators])
+    return df
+
+
+def add_derived_columns(df, open_parents=None):
     """Add useful derived columns for analysis"""
     
     # Extract years from survey
-    df[['Survey_Start_Year', 'Survey_End_Year']] = df['Survey'].apply(
-        lambda x: pd.Series(extract_year_from_survey(x))
-    )
+    df['Survey_Start_Year'], df['Survey_End_Year'] = extract_years_from_survey_column(df['Survey'])
     
     # Add mid-year for time series plotting
     df['Survey_Year'] = df['Survey_Start_Year']  # Use start year as primary year
     
-    # Add flag for complete data (no missing values in obesity metrics)
-    df['Has_Complete_Children_Data'] = df['Children overweight'].notna()
-    df['Has_Complete_Women_Data'] = df['Women who are overweight or obese according to BMI (>=25.0)'].notna()
-    df['Has_Complete_Men_Data'] = df['Men who are overweight or obese according to BMI (>=25.0)'].notna()
+    # Geography level, clean unit name and parent unit
+    df = add_geography_columns(df, open_parents=open_parents)
     
-    # Overall completeness flag
-    df['Has_All_Metrics'] = (
-        df['Has_Complete_Children_Data'] & 
-        df['Has_Complete_Women_Data'] & 
-        df['Has_Complete_Men_Data']
-    )
+    # Add flag for complete data (no missing values in the indicators)
+    df = add_completeness_flags(df, 'raw_column')
     
     print(f"✓ Added derived columns:")
     print(f"  - Survey_Start_Year, Survey_End_Year, Survey_Year")
+    print(f"  - Geography level, name and parent (Geo_Level, Geo_Name, Geo_Parent)")
     print(f"  - Data completeness flags (Has_Complete_*)")
     
     return df
 
 
+def write_violations(violations, violations_path):
+    """Append violations to the CSV at `violations_path`, writing its header on first use"""
+    if violations_path is None or len(violations) == 0:
+        return
+    header = not os.path.exists(violations_path)
+    violations.to_csv(violations_path, mode='a', header=header, index=False)
+
+
+def report_violations(violations):
+    """Print violation counts per rule"""
+    if len(violations) == 0:
+        print(f"✓ Validation passed: no rule violations")
+        return
+    print(f"⚠️  {len(violations)} validation rule violations:")
+    for (rule, severity), count in violations.groupby(['Rule', 'Severity'], sort=False).size().items():
+        print(f"  - {rule} ({severity}): {count} rows")
+
+
+def validate_cleaned_data(df, violations_path=None, rules=None, rule_state=None):
+    """
+    Check the frame against VALIDATION_RULES and report the violations
+    
+    Runs after add_derived_columns (raw metric headers are read under their
+    clean names). The frame itself is returned unchanged; violations are
+    printed per rule and appended to `violations_path` when it is given.
+    
+    With `rule_state` (from validation_rules.new_rule_state), rules that
+    compare rows with each other are checked against everything seen in
+    earlier chunks through that running state instead of within this frame
+    alone; validate_deferred_rules finishes them after the last chunk.
+    """
+    rules = VALIDATION_RULES if rules is None else rules
+    view = df.rename(columns=clean_column_names())
+    if rule_state is None:
+        violations = evaluate_rules(view, rules)
+    else:
+        row_violations = evaluate_rules(view, [rule for rule in rules if not is_frame_rule(rule)])
+        frame_violations = update_rule_state(rule_state, view, rules)
+        violations = pd.concat([row_violations, frame_violations], ignore_index=True) \
+            if len(frame_violations) else row_violations
+    
+    report_violations(violations)
+    write_violations(violations, violations_path)
+    return df
+
+
+def validate_deferred_rules(rule_state, violations_path=None, rules=None):
+    """Report the cross-row violations that need every chunk (states missing from the next round)"""
+    rules = [rule for rule in (VALIDATION_RULES if rules is None else rules) if is_frame_rule(rule)]
+    if not rules:
+        return empty_violations()
+    violations = finish_rule_state(rule_state, rules)
+    report_violations(violations)
+    write_violations(violations, violations_path)
+    return violations
+
+
+def clean_column_names():
+    """Raw export header → clean name, for every registered indicator and its SE/CI columns"""
+    return {**{meta['raw_column']: meta['wide_column'] for meta in INDICATOR_REGISTRY.values()},
+            **RAW_UNCERTAINTY_NAMES}
+
+
 def create_clean_column_names(df):
     """Rename columns to shorter, cleaner names"""
-    rename_map = {
-        'Children overweight': 'Children_Overweight_Pct',
-        'Women who are overweight or obese according to BMI (>=25.0)': 'Women_Overweight_Pct',
-        'Men who are overweight or obese according to BMI (>=25.0)': 'Men_Overweight_Pct'
-    }
-    
-    df = df.rename(columns=rename_map)
+    df = df.rename(columns=clean_column_names())
     print(f"✓ Renamed columns to cleaner names")
     
     return df
 
 
-def generate_data_quality_report(df):
-    """Generate comprehensive data quality report"""
+def reorder_columns(df):
+    """Put columns in the published order (see cleaned_columns)"""
+    return df[cleaned_columns(df.columns)]
+
+
+# Repeated string columns stored as categoricals in the compact frame
+CATEGORICAL_COLUMNS = ['Country', 'Survey', 'Category', 'Subcategory', 'Characteristic', 'Geo_Name', 'Geo_Parent']
+
+# Bit assigned to each completeness flag in the packed Completeness_Flags column
+COMPLETENESS_BITS = {
+    'Has_Complete_Children_Data': 1,
+    'Has_Complete_Women_Data': 2,
+    'Has_Complete_Men_Data': 4,
+    'Has_All_Metrics': 8,
+}
+
+
+def compact_cleaned_frame(df):
+    """
+    Shrink the cleaned frame in memory
+    
+    - Country/Survey/Category/Subcategory/Characteristic/Geo_* names → categoricals
+    - Metric percentages → float32
+    - The four Has_* flags → one uint8 Completeness_Flags bitmask
+    
+    The old flag names stay readable through the `completeness` accessor,
+    e.g. df.completeness['Has_All_Metrics'].
+    """
+    before = df.memory_usage(deep=True).sum()
+    
+    df = df.copy()
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype('category')
+    for col in METRIC_COLUMNS:
+        df[col] = df[col].astype('float32')
+    
+    flags = np.zeros(len(df), dtype='uint8')
+    for col, bit in COMPLETENESS_BITS.items():
+        flags |= df[col].to_numpy(dtype=bool).astype('uint8') * np.uint8(bit)
+    flag_position = df.columns.get_loc('Has_Complete_Children_Data')
+    df = df.drop(columns=list(COMPLETENESS_BITS))
+    df.insert(flag_position, 'Completeness_Flags', flags)
+    
+    after = df.memory_usage(deep=True).sum()
+    print(f"✓ Compacted cleaned frame: {before / 1024:.1f} KB → {after / 1024:.1f} KB "
+          f"({(1 - after / before) * 100 if before else 0:.1f}% smaller)")
+    return df
+
+
+def expand_completeness_flags(df):
+    """Restore the Has_* boolean columns from a compact frame's bitmask"""
+    df = df.copy()
+    flag_position = df.columns.get_loc('Completeness_Flags')
+    for offset, col in enumerate(COMPLETENESS_BITS):
+        df.insert(flag_position + offset, col, df.completeness[col])
+    return df.drop(columns=['Completeness_Flags'])
+
+
+@pd.api.extensions.register_dataframe_accessor('completeness')
+class CompletenessAccessor:
+    """Read Has_* flags by their old names from either a wide or a compact frame"""
+    
+    def __init__(self, df):
+        self._df = df
+    
+    def __getitem__(self, name):
+        if name in self._df.columns:
+            return self._df[name]
+        bit = COMPLETENESS_BITS[name]
+        return pd.Series((self._df['Completeness_Flags'].to_numpy() & bit) != 0, index=self._df.index, name=name)
+    
+    def __getattr__(self, name):
+        if name in COMPLETENESS_BITS:
+            return self[name]
+        raise AttributeError(name)
+
+
+def _arrow_type(dtype):
+    import pyarrow as pa
+    
+    if pd.api.types.is_bool_dtype(dtype):
+        return pa.bool_()
+    if pd.api.types.is_integer_dtype(dtype):
+        return pa.int64()
+    if pd.api.types.is_float_dtype(dtype):
+        return pa.float64()
+    return pa.string()
+
+
+def cleaned_parquet_schema(columns=COLUMN_ORDER):
+    """
+    Arrow schema of the cleaned Parquet dataset, from CLEANED_DTYPES
+    
+    Passed on every write so each file gets the same types, whatever a
+    chunk's values are (an all-missing Geo_Name chunk would otherwise be
+    inferred as `null` and clash with the `string` files on read). Pass the
+    frame's columns when it carries SE/CI columns.
+    """
+    import pyarrow as pa
+    
+    return pa.schema([(col, _arrow_type(CLEANED_DTYPES[col])) for col in columns])
+
+
+def quarantine_parquet_schema(columns):
+    """Arrow schema of the Parquet quarantine: raw columns as text, Source_Row as integer"""
+    import pyarrow as pa
+    
+    return pa.schema([(col, pa.int64() if col == 'Source_Row' else pa.string()) for col in columns])
+
+
+def partitioned_output_path(output_path):
+    """Parquet dataset directory that sits next to the cleaned CSV path"""
+    return os.path.splitext(output_path)[0] + '.parquet'
+
+
+def write_cleaned_data(df, output_path, write_csv=True, append=False, sqlite_path=None):
+    """
+    Write the cleaned CSV and a Parquet dataset partitioned by Country and Survey_Year
+    
+    The CSV at `output_path` is what data_loader.load_cleaned_data (and so
+    every dashboard script) reads; it can be skipped with `write_csv=False`
+    when only the Parquet dataset is wanted. The dataset keeps real dtypes
+    (booleans, integer years, float metrics) and is written when pyarrow is
+    installed; read it back with read_cleaned_parquet. With `sqlite_path`,
+    the frame is also loaded into the SQLite store there. With `append`, the
+    frame is added to what earlier calls wrote (used by the streaming pipeline).
+    """
+    if HAS_PYARROW:
+        dataset_path = partitioned_output_path(output_path)
+        if not append and os.path.exists(dataset_path):
+            shutil.rmtree(dataset_path)
+        if len(df) > 0:
+            df.to_parquet(dataset_path, partition_cols=PARTITION_COLUMNS, index=False,
+                          schema=cleaned_parquet_schema(df.columns))
+        if not append:
+            print(f"✓ Saved partitioned Parquet dataset to: {dataset_path}")
+    elif not write_csv:
+        print("⚠️  pyarrow is not installed - writing CSV instead of Parquet")
+        write_csv = True
+    elif not append:
+        print("⚠️  pyarrow is not installed - skipping the partitioned Parquet dataset "
+              "(uv sync --extra arrow, or pip install pyarrow)")
+    
+    if write_csv:
+        df.to_csv(output_path, mode='a' if append else 'w', header=not append, index=False)
+        if not append:
+            print(f"✓ Saved cleaned data to: {output_path}")
+    
+    if sqlite_path:
+        write_cleaned_sqlite(df, sqlite_path, append=append)
+
+
+def _sqlite_type(dtype):
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'REAL'
+    return 'TEXT'
+
+
+def write_cleaned_sqlite(df, db_path, append=False):
+    """
+    Bulk-load the cleaned frame into the SQLite store at `db_path`
+    
+    All rows go in with one executemany inside a single transaction. Without
+    `append` the table is recreated, loaded, and then indexed on
+    SQLITE_INDEX_COLUMNS (building indexes after the load is cheaper than
+    maintaining them row by row). Missing values are stored as NULL and
+    booleans as 0/1.
+    """
+    columns = list(df.columns)
+    column_list = ', '.join(f'"{col}"' for col in columns)
+    placeholders = ', '.join('?' for _ in columns)
+    rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+    
+    connection = sqlite3.connect(db_path)
+    try:
+        with connection:
+            if not append:
+                connection.execute(f'DROP TABLE IF EXISTS {SQLITE_TABLE}')
+            definitions = ', '.join(f'"{col}" {_sqlite_type(df[col].dtype)}' for col in columns)
+            connection.execute(f'CREATE TABLE IF NOT EXISTS {SQLITE_TABLE} ({definitions})')
+            connection.executemany(
+                f'INSERT INTO {SQLITE_TABLE} ({column_list}) VALUES ({placeholders})', rows
+            )
+            for col in SQLITE_INDEX_COLUMNS:
+                connection.execute(
+                    f'CREATE INDEX IF NOT EXISTS idx_{SQLITE_TABLE}_{col.lower()} ON {SQLITE_TABLE} ("{col}")'
+                )
+    finally:
+        connection.close()
+    
+    if not append:
+        print(f"✓ Loaded cleaned data into SQLite store: {db_path}")
+
+
+def read_cleaned_parquet(dataset_path, columns=None, countries=None, years=None):
+    """
+    Read the partitioned cleaned dataset, touching only the requested data
+    
+    `countries` and `years` prune whole partitions before any file is opened,
+    and `columns` limits which columns are decoded.
+    
+    Use this rather than a plain pd.read_parquet on the directory: hive
+    discovery would infer Survey_Year as a dictionary-encoded int32
+    partition, which pandas cannot convert back to the Int64 column
+    recorded in the file metadata. The partition types are given here
+    explicitly, and the files' own columns follow cleaned_parquet_schema().
+    """
+    require_pyarrow('read_cleaned_parquet')
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    
+    partitioning = ds.partitioning(
+        pa.schema([('Country', pa.string()), ('Survey_Year', pa.int64())]),
+        flavor='hive'
+    )
+    dataset = ds.dataset(dataset_path, format='parquet', partitioning=partitioning)
+    
+    row_filter = None
+    if countries is not None:
+        row_filter = ds.field('Country').isin(list(countries))
+    if years is not None:
+        year_filter = ds.field('Survey_Year').isin([int(year) for year in years])
+        row_filter = year_filter if row_filter is None else row_filter & year_filter
+    
+    df = dataset.to_table(columns=columns, filter=row_filter).to_pandas()
+    
+    ordered = [col for col in cleaned_columns(df.columns) if col in df.columns]
+    return df[ordered].reset_index(drop=True)
+
+
+COMPLETENESS_LABELS = {
+    'Has_All_Metrics': 'ALL metrics',
+    'Has_Complete_Children_Data': 'Children data',
+    'Has_Complete_Women_Data': 'Women data',
+    'Has_Complete_Men_Data': 'Men data',
+}
+
+
+def _json_value(value):
+    """Plain Python scalar for JSON (numpy/pandas scalars → int/float, missing → None)"""
+    if value is None or pd.isna(value):
+        return None
+    if isinstance(value, (np.integer, int)):
+        return int(value)
+    if isinstance(value, (np.floating, float)):
+        return float(value)
+    return value
+
+
+def build_quality_report(df):
+    """
+    Compute every data quality figure for the cleaned frame
+    
+    Category row counts and per-category missingness come from a single
+    groupby over the missing-value mask; descriptive statistics come from one
+    agg call over the metric columns. Returns a JSON-ready dict that
+    render_quality_report prints.
+    """
+    missing = df[METRIC_COLUMNS].isna()
+    per_category = missing.assign(rows=1).groupby(df['Category']).sum()
+    stats = df[METRIC_COLUMNS].agg(['min', 'max', 'mean', 'median', 'std'])
+    missing_totals = missing.sum()
+    completeness = df[COMPLETENESS_COLUMNS].sum()
+    rows = len(df)
+    
+    return {
+        'rows': rows,
+        'columns': df.shape[1],
+        'min_start_year': _json_value(df['Survey_Start_Year'].min()),
+        'max_end_year': _json_value(df['Survey_End_Year'].max()),
+        'surveys': sorted(df['Survey'].dropna().unique().tolist()),
+        'countries': sorted(df['Country'].dropna().unique().tolist()),
+        'categories': {cat: int(count) for cat, count in per_category['rows'].items()},
+        'missing': {
+            col: {
+                'count': int(missing_totals[col]),
+                'pct': missing_totals[col] / rows * 100 if rows else 0.0,
+                'by_category': {cat: int(count) for cat, count in per_category[col].items() if count > 0},
+            }
+            for col in METRIC_COLUMNS
+        },
+        'completeness': {
+            col: {'count': int(completeness[col]), 'pct': completeness[col] / rows * 100 if rows else 0.0}
+            for col in COMPLETENESS_COLUMNS
+        },
+        'statistics': {
+            col: {stat: _json_value(stats.at[stat, col]) for stat in stats.index}
+            for col in METRIC_COLUMNS
+        },
+    }
+
+
+def _format_stat(value):
+    return "nan" if value is None else f"{value:.1f}"
+
+
+def render_quality_report(report):
+    """Print a quality report built by build_quality_report"""
+    rows = report['rows']
+    
     print("\n" + "=" * 100)
     print("DATA QUALITY REPORT")
     print("=" * 100)
     
     print(f"\n📊 FINAL DATASET DIMENSIONS:")
-    print(f"   Rows: {df.shape[0]}")
-    print(f"   Columns: {df.shape[1]}")
+    print(f"   Rows: {rows}")
+    print(f"   Columns: {report['columns']}")
     
     print(f"\n📅 TIME COVERAGE:")
-    print(f"   Years: {df['Survey_Start_Year'].min()} - {df['Survey_End_Year'].max()}")
-    print(f"   Surveys: {df['Survey'].nunique()}")
-    print(f"   Survey names: {sorted(df['Survey'].dropna().unique())}")
+    print(f"   Years: {report['min_start_year']} - {report['max_end_year']}")
+    print(f"   Surveys: {len(report['surveys'])}")
+    print(f"   Survey names: {report['surveys']}")
     
     print(f"\n🌍 GEOGRAPHIC COVERAGE:")
-    print(f"   Countries: {df['Country'].nunique()}")
-    print(f"   Country names: {sorted(df['Country'].unique())}")
+    print(f"   Countries: {len(report['countries'])}")
+    print(f"   Country names: {report['countries']}")
     
     print(f"\n📂 CATEGORIES:")
-    print(f"   Unique categories: {df['Category'].nunique()}")
-    for cat in sorted(df['Category'].dropna().unique()):
-        count = (df['Category'] == cat).sum()
+    print(f"   Unique categories: {len(report['categories'])}")
+    for cat, count in report['categories'].items():
         print(f"   - {cat}: {count} rows")
     
     print(f"\n🔢 MISSING VALUES:")
-    for col in ['Children_Overweight_Pct', 'Women_Overweight_Pct', 'Men_Overweight_Pct']:
-        total = len(df)
-        missing = df[col].isnull().sum()
-        pct = (missing / total) * 100
-        print(f"   {col}: {missing}/{total} ({pct:.1f}% missing)")
+    for col, missing in report['missing'].items():
+        print(f"   {col}: {missing['count']}/{rows} ({missing['pct']:.1f}% missing)")
         
         # Breakdown by category
-        if missing > 0:
-            missing_by_cat = df[df[col].isnull()].groupby('Category').size()
+        if missing['count'] > 0:
             print(f"      Missing breakdown by category:")
-            for cat, cnt in missing_by_cat.items():
+            for cat, cnt in missing['by_category'].items():
                 print(f"        - {cat}: {cnt} rows")
     
     print(f"\n✓ DATA COMPLETENESS:")
-    print(f"   Rows with ALL metrics: {df['Has_All_Metrics'].sum()} ({df['Has_All_Metrics'].sum()/len(df)*100:.1f}%)")
-    print(f"   Rows with Children data: {df['Has_Complete_Children_Data'].sum()} ({df['Has_Complete_Children_Data'].sum()/len(df)*100:.1f}%)")
-    print(f"   Rows with Women data: {df['Has_Complete_Women_Data'].sum()} ({df['Has_Complete_Women_Data'].sum()/len(df)*100:.1f}%)")
-    print(f"   Rows with Men data: {df['Has_Complete_Men_Data'].sum()} ({df['Has_Complete_Men_Data'].sum()/len(df)*100:.1f}%)")
+    for col, label in COMPLETENESS_LABELS.items():
+        completeness = report['completeness'][col]
+        print(f"   Rows with {label}: {completeness['count']} ({completeness['pct']:.1f}%)")
     
     print(f"\n📈 OBESITY STATISTICS (where data exists):")
-    for col in ['Children_Overweight_Pct', 'Women_Overweight_Pct', 'Men_Overweight_Pct']:
+    for col, stats in report['statistics'].items():
         print(f"\n   {col}:")
-        print(f"      Min: {df[col].min():.1f}%")
-        print(f"      Max: {df[col].max():.1f}%")
-        print(f"      Mean: {df[col].mean():.1f}%")
-        print(f"      Median: {df[col].median():.1f}%")
-        print(f"      Std Dev: {df[col].std():.1f}%")
+        print(f"      Min: {_format_stat(stats['min'])}%")
+        print(f"      Max: {_format_stat(stats['max'])}%")
+        print(f"      Mean: {_format_stat(stats['mean'])}%")
+        print(f"      Median: {_format_stat(stats['median'])}%")
+        print(f"      Std Dev: {_format_stat(stats['std'])}%")
     
     print("\n" + "=" * 100)
 
 
-def main():
-    """Main cleaning pipeline"""
-    print("\n" + "=" * 100)
-    print("OBESITY DATA CLEANING PIPELINE - START")
-    print("=" * 100 + "\n")
+def write_quality_report_json(report, json_path):
+    """Write a quality report as JSON for monitoring"""
+    with open(json_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"✓ Saved data quality report to: {json_path}")
+
+
+def generate_data_quality_report(df):
+    """Generate comprehensive data quality report; prints it and returns the report dict"""
+    report = build_quality_report(df)
+    render_quality_report(report)
+    return report
+
+
+def init_quality_aggregates():
+    """Empty running aggregates for the streaming data quality report"""
+    return {
+        'rows': 0,
+        'columns': len(COLUMN_ORDER),
+        'min_start_year': None,
+        'max_end_year': None,
+        'surveys': set(),
+        'countries': set(),
+        'category_counts': pd.Series(dtype='int64'),
+        'missing_by_category': {col: pd.Series(dtype='int64') for col in METRIC_COLUMNS},
+        'completeness': {col: 0 for col in COMPLETENESS_COLUMNS},
+        'metric_stats': {col: new_metric_stats() for col in METRIC_COLUMNS},
+    }
+
+
+def _min_defined(a, b):
+    return b if a is None else a if b is None else min(a, b)
+
+
+def _max_defined(a, b):
+    return b if a is None else a if b is None else max(a, b)
+
+
+def update_quality_aggregates(aggregates, df):
+    """Fold one cleaned chunk into the running quality aggregates"""
+    aggregates['rows'] += len(df)
+    if len(df) == 0:
+        return aggregates
+    
+    start_year = df['Survey_Start_Year'].min()
+    end_year = df['Survey_End_Year'].max()
+    aggregates['min_start_year'] = _min_defined(aggregates['min_start_year'], None if pd.isna(start_year) else start_year)
+    aggregates['max_end_year'] = _max_defined(aggregates['max_end_year'], None if pd.isna(end_year) else end_year)
+    
+    aggregates['surveys'].update(df['Survey'].dropna().unique())
+    aggregates['countries'].update(df['Country'].unique())
+    aggregates['category_counts'] = aggregates['category_counts'].add(
+        df['Category'].value_counts(), fill_value=0
+    ).astype('int64')
+    
+    for col in COMPLETENESS_COLUMNS:
+        aggregates['completeness'][col] += int(df[col].sum())
+    
+    for col in METRIC_COLUMNS:
+        missing = df[col].isnull()
+        aggregates['missing_by_category'][col] = aggregates['missing_by_category'][col].add(
+            df.loc[missing, 'Category'].value_counts(), fill_value=0
+        ).astype('int64')
+        update_metric_stats(aggregates['metric_stats'][col], df[col].to_numpy(dtype='float64', na_value=np.nan))
+    
+    return aggregates
+
+
+def merge_quality_aggregates(aggregates, other):
+    """Merge aggregates built elsewhere (another worker, another chunk range) into `aggregates`"""
+    aggregates['rows'] += other['rows']
+    aggregates['min_start_year'] = _min_defined(aggregates['min_start_year'], other['min_start_year'])
+    aggregates['max_end_year'] = _max_defined(aggregates['max_end_year'], other['max_end_year'])
+    aggregates['surveys'] |= other['surveys']
+    aggregates['countries'] |= other['countries']
+    aggregates['category_counts'] = aggregates['category_counts'].add(
+        other['category_counts'], fill_value=0
+    ).astype('int64')
+    
+    for col in COMPLETENESS_COLUMNS:
+        aggregates['completeness'][col] += other['completeness'][col]
+    
+    for col in METRIC_COLUMNS:
+        aggregates['missing_by_category'][col] = aggregates['missing_by_category'][col].add(
+            other['missing_by_category'][col], fill_value=0
+        ).astype('int64')
+        merge_metric_stats(aggregates['metric_stats'][col], other['metric_stats'][col])
+    
+    return aggregates
+
+
+def quality_report_from_aggregates(aggregates):
+    """Turn running aggregates into the same report dict build_quality_report returns"""
+    rows = aggregates['rows']
+    report = {
+        'rows': rows,
+        'columns': aggregates['columns'],
+        'min_start_year': _json_value(aggregates['min_start_year']),
+        'max_end_year': _json_value(aggregates['max_end_year']),
+        'surveys': sorted(aggregates['surveys']),
+        'countries': sorted(aggregates['countries']),
+        'categories': {cat: int(count) for cat, count in aggregates['category_counts'].sort_index().items()},
+        'missing': {},
+        'completeness': {},
+        'statistics': {},
+    }
+    
+    for col in METRIC_COLUMNS:
+        missing = rows - aggregates['metric_stats'][col]['count']
+        report['missing'][col] = {
+            'count': int(missing),
+            'pct': missing / rows * 100 if rows else 0.0,
+            'by_category': {cat: int(cnt) for cat, cnt in aggregates['missing_by_category'][col].sort_index().items()},
+        }
+    
+    for col in COMPLETENESS_COLUMNS:
+        count = aggregates['completeness'][col]
+        report['completeness'][col] = {'count': int(count), 'pct': count / rows * 100 if rows else 0.0}
+    
+    for col in METRIC_COLUMNS:
+        stats = finalize_metric_stats(aggregates['metric_stats'][col])
+        report['statistics'][col] = {
+            stat: _json_value(stats[stat]) for stat in ['min', 'max', 'mean', 'median', 'std']
+        }
+    
+    return report
+
+
+def generate_streaming_quality_report(aggregates):
+    """Print the data quality report from running aggregates and return the report dict"""
+    report = quality_report_from_aggregates(aggregates)
+    render_quality_report(report)
+    return report
+
+
+def new_run_report(mode, input_path, output_path, profile_dir=None):
+    """Empty machine-readable run report; steps are appended as they run"""
+    return {
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'mode': mode,
+        'input': input_path,
+        'output': output_path,
+        'profile_dir': profile_dir,
+        'steps': [],
+    }
+
+
+def _step_record(run_report, name):
+    """Find the record for step `name`, creating it on first use"""
+    for record in run_report['steps']:
+        if record['name'] == name:
+            return record
+    record = {
+        'step': len(run_report['steps']) + 1,
+        'name': name,
+        'calls': 0,
+        'wall_seconds': 0.0,
+        'cpu_seconds': 0.0,
+        'rows_in': None,
+        'rows_out': None,
+        'peak_memory_mb': 0.0,
+        'profile': None,
+    }
+    run_report['steps'].append(record)
+    return record
+
+
+def _add_rows(record, key, rows):
+    if rows is not None:
+        record[key] = (record[key] or 0) + rows
+
+
+@contextlib.contextmanager
+def measure_step(run_report, name):
+    """
+    Record wall time, CPU time and peak memory of one step call
+    
+    Repeated calls under the same name (one per chunk in streaming mode)
+    accumulate into a single record. peak_memory_mb is how far traced memory
+    rose above its level when the step started (the largest rise over all
+    calls), so memory still held by earlier steps is not charged to this one.
+    With a profile_dir in the report, the step also runs under cProfile and
+    its stats go to <step>_<name>.prof.
+    """
+    if run_report is None:
+        yield None
+        return
+    
+    record = _step_record(run_report, name)
+    profiler = cProfile.Profile() if run_report['profile_dir'] else None
+    traced_start = 0
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+        traced_start = tracemalloc.get_traced_memory()[0]
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield record
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        record['calls'] += 1
+        record['wall_seconds'] += time.perf_counter() - wall_start
+        record['cpu_seconds'] += time.process_time() - cpu_start
+        if tracemalloc.is_tracing():
+            peak_mb = (tracemalloc.get_traced_memory()[1] - traced_start) / 1024 ** 2
+            record['peak_memory_mb'] = max(record['peak_memory_mb'], peak_mb)
+        if profiler is not None:
+            os.makedirs(run_report['profile_dir'], exist_ok=True)
+            profile_path = os.path.join(run_report['profile_dir'], f"step{record['step']}_{name}.prof")
+            if record['profile'] is not None:
+                stats = pstats.Stats(profile_path)
+                stats.add(profiler)
+                stats.dump_stats(profile_path)
+            else:
+                profiler.dump_stats(profile_path)
+            record['profile'] = profile_path
+
+
+def run_step(run_report, name, func, df, *args, **kwargs):
+    """
+    Call a pipeline step on `df` under measure_step and record rows in/out
+    
+    Rows are only counted for frames: rows_in when `df` is a DataFrame, and
+    rows_out when the step turns a frame (or a file path, for loads) into a
+    frame. Steps that write or report, or whose input is accumulated state,
+    leave the counts empty.
+    """
+    with measure_step(run_report, name) as record:
+        result = func(df, *args, **kwargs)
+    if record is not None and isinstance(df, (pd.DataFrame, str)):
+        _add_rows(record, 'rows_in', len(df) if isinstance(df, pd.DataFrame) else None)
+        _add_rows(record, 'rows_out', len(result) if isinstance(result, pd.DataFrame) else None)
+    return result
+
+
+def _measured_chunks(run_report, name, chunks):
+    """Yield from `chunks`, timing each pull as one call of step `name`"""
+    iterator = iter(chunks)
+    while True:
+        with measure_step(run_report, name) as record:
+            chunk = next(iterator, None)
+        if chunk is None:
+            # The pull that finds the input exhausted keeps its time but is not a chunk
+            if record is not None:
+                record['calls'] -= 1
+            return
+        if record is not None:
+            _add_rows(record, 'rows_out', len(chunk))
+        yield chunk
+
+
+def write_run_report(run_report, report_path):
+    """Write the run report as JSON"""
+    run_report['total_wall_seconds'] = sum(record['wall_seconds'] for record in run_report['steps'])
+    run_report['total_cpu_seconds'] = sum(record['cpu_seconds'] for record in run_report['steps'])
+    with open(report_path, 'w') as f:
+        json.dump(run_report, f, indent=2)
+    print(f"✓ Saved run report to: {report_path}")
+
+
+def _map_step(run_report, step, chunks, **kwargs):
+    """Lazily apply one pipeline step to every chunk"""
+    for chunk in chunks:
+        yield run_step(run_report, step.__name__, step, chunk, **kwargs)
+
+
+def clean_chunks(chunks, run_report=None, quarantine_path=None, verbose=False, violations_path=None,
+                 rule_state=None):
+    """
+    Push raw chunks through the cleaning steps as a lazy generator chain
+    
+    Only one chunk is materialized per step at a time, so memory stays
+    bounded by the chunk size rather than the file size. With `rule_state`,
+    cross-row validation rules are checked across chunks through that
+    running state (which keeps keys, not rows) instead of per chunk.
+    """
+    chunks = _map_step(run_report, remove_contaminated_rows, chunks,
+                       quarantine_path=quarantine_path, verbose=verbose)
+    chunks = _map_step(run_report, split_characteristic_column, chunks)
+    chunks = _map_step(run_report, convert_numeric_columns, chunks)
+    # One dict shared by every chunk, so geography parents carry across chunk boundaries
+    chunks = _map_step(run_report, add_derived_columns, chunks, open_parents={})
+    chunks = _map_step(run_report, validate_cleaned_data, chunks, violations_path=violations_path,
+                       rule_state=rule_state)
+    chunks = _map_step(run_report, create_clean_column_names, chunks)
+    chunks = _map_step(run_report, reorder_columns, chunks)
+    return chunks
+
+
+def run_streaming_pipeline(input_path, output_path, chunksize, write_csv=True, run_report=None,
+                           quarantine_path=None, verbose=False, quality_json_path=None, sqlite_path=None,
+                           violations_path=None):
+    """Clean a raw file chunk by chunk, appending each cleaned chunk to the output"""
+    aggregates = init_quality_aggregates()
+    rule_state = new_rule_state(VALIDATION_RULES)
+    reset_quarantine(quarantine_path)
+    reset_quarantine(violations_path)
+    
+    print(f"STEPS 1-8: Streaming raw data in chunks of {chunksize} rows...")
+    raw_chunks = _measured_chunks(run_report, 'load_raw_data', load_raw_data_chunks(input_path, chunksize))
+    cleaned_chunks = clean_chunks(raw_chunks, run_report, quarantine_path=quarantine_path, verbose=verbose,
+                                  violations_path=violations_path, rule_state=rule_state)
+    for chunk_number, chunk in enumerate(cleaned_chunks):
+        run_step(run_report, 'write_cleaned_data', write_cleaned_data, chunk, output_path,
+                 write_csv=write_csv, append=chunk_number > 0, sqlite_path=sqlite_path)
+        run_step(run_report, 'update_quality_aggregates', lambda chunk: update_quality_aggregates(aggregates, chunk), chunk)
+        print(f"✓ Chunk {chunk_number + 1}: wrote {len(chunk)} rows ({aggregates['rows']} total)")
+    
+    print("\nValidating rules across all chunks...")
+    run_step(run_report, 'validate_deferred_rules', validate_deferred_rules, rule_state,
+             violations_path=violations_path)
+    
+    # Step 9: Generate data quality report
+    with measure_step(run_report, 'generate_data_quality_report'):
+        report = generate_streaming_quality_report(aggregates)
+    if quality_json_path:
+        write_quality_report_json(report, quality_json_path)
+    
+    return aggregates
+
+
+def resolve_input_files(pattern):
+    """Expand a directory (all *.csv inside) or a glob pattern into sorted file paths"""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, '*.csv')
+    return sorted(glob.glob(pattern))
+
+
+def clean_raw_file(filepath):
+    """
+    Run steps 1-7 on one raw export and return (filepath, cleaned df, raw row count, dropped rows)
+    
+    The dropped rows are the file's quarantine frame with a Source_File
+    column in front; the parent writes all files' rows in one go, so workers
+    never append to the same quarantine file. Used as the process pool
+    worker, so the per-step console output is swallowed to keep the batch
+    log readable.
+    """
+    dropped_rows = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = load_raw_data(filepath)
+        raw_rows = len(df)
+        df = remove_contaminated_rows(df, dropped_rows=dropped_rows)
+        df = split_characteristic_column(df)
+        df = convert_numeric_columns(df)
+        df = add_derived_columns(df)
+        df = create_clean_column_names(df)
+        df = reorder_columns(df)
+    dropped = dropped_rows[0]
+    dropped.insert(0, 'Source_File', filepath)
+    return filepath, df, raw_rows, dropped
+
+
+# Bump when the cleaning steps change so cached partitions are rebuilt
+CLEANING_VERSION = 5
+MANIFEST_FILENAME = 'manifest.json'
+
+
+def file_content_hash(filepath):
+    """SHA-256 of a file's contents, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(cache_dir):
+    """Load the cleaning manifest, or an empty one if missing or from an older version"""
+    manifest_path = os.path.join(cache_dir, MANIFEST_FILENAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get('version') == CLEANING_VERSION:
+            return manifest
+    return {'version': CLEANING_VERSION, 'files': {}}
+
+
+def save_manifest(cache_dir, manifest):
+    """Write the manifest atomically and drop partitions no input refers to any more"""
+    manifest_path = os.path.join(cache_dir, MANIFEST_FILENAME)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+    
+    referenced = {entry[name] for entry in manifest['files'].values() for name in ('partition', 'quarantine')}
+    for name in os.listdir(cache_dir):
+        if name.endswith('.pkl') and name not in referenced:
+            os.remove(os.path.join(cache_dir, name))
+
+
+def run_batch_pipeline(pattern, output_path, max_workers=None, cache_dir=None, write_csv=True, run_report=None,
+                       quality_json_path=None, sqlite_path=None, violations_path=None, quarantine_path=None):
+    """
+    Clean every raw export matching `pattern` in parallel, one file per worker
+    
+    The cleaned frames are merged in file order into a single dataset. With
+    `cache_dir` set, a manifest there records each input's content hash and
+    the cleaned partition (and dropped rows) it produced; only inputs whose
+    hash changed are re-cleaned and the rest are read back from their
+    partitions. With `quarantine_path`, every file's dropped rows are
+    written there in one go after the merge, tagged with their Source_File.
+    """
+    input_files = resolve_input_files(pattern)
+    if not input_files:
+        raise FileNotFoundError(f"No raw CSV files match: {pattern}")
+    
+    manifest = None
+    to_clean = input_files
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        manifest = load_manifest(cache_dir)
+        hashes = {filepath: file_content_hash(filepath) for filepath in input_files}
+        to_clean = []
+        for filepath in input_files:
+            entry = manifest['files'].get(os.path.abspath(filepath))
+            if (entry is None or entry['sha256'] != hashes[filepath]
+                    or not os.path.exists(os.path.join(cache_dir, entry['partition']))
+                    or not os.path.exists(os.path.join(cache_dir, entry['quarantine']))):
+                to_clean.append(filepath)
+        print(f"✓ Manifest: {len(input_files) - len(to_clean)} unchanged, {len(to_clean)} to clean")
     
-    # Step 1: Load raw data
-    print("STEP 1: Loading raw data...")
-    df = load_raw_data('/home/claude/obesity_data_raw.csv')
-    
-    # Step 2: Remove contaminated rows
-    print("\nSTEP 2: Removing contaminated rows...")
-    df = remove_contaminated_rows(df)
-    
-    # Step 3: Split Characteristic column
-    print("\nSTEP 3: Splitting Characteristic column...")
-    df = split_characteristic_column(df)
-    
-    # Step 4: Convert numeric columns
-    print("\nSTEP 4: Converting numeric columns...")
-    df = convert_numeric_columns(df)
-    
-    # Step 5: Add derived columns
-    print("\nSTEP 5: Adding derived columns...")
-    df = add_derived_columns(df)
-    
-    # Step 6: Rename columns
-    print("\nSTEP 6: Creating clean column names...")
-    df = create_clean_column_names(df)
-    
-    # Step 7: Reorder columns for better readability
-    print("\nSTEP 7: Reordering columns...")
-    column_order = [
-        'Country',
-        'Survey',
-        'Survey_Year',
-        'Survey_Start_Year',
-        'Survey_End_Year',
-        'Category',
-        'Subcategory',
-        'Characteristic',
-        'Children_Overweight_Pct',
-        'Women_Overweight_Pct',
-        'Men_Overweight_Pct',
-        'Has_Complete_Children_Data',
-        'Has_Complete_Women_Data',
-        'Has_Complete_Men_Data',
-        'Has_All_Metrics'
-    ]
-    df = df[column_order]
+    print(f"STEPS 1-7: Cleaning {len(to_clean)} raw files in parallel...")
+    cleaned = {}
+    with measure_step(run_report, 'clean_raw_files') as record:
+        if to_clean:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                for filepath, df_file, raw_rows, dropped in executor.map(clean_raw_file, to_clean):
+                    cleaned[filepath] = (df_file, raw_rows, dropped)
+    if record is not None:
+        _add_rows(record, 'rows_in', sum(raw_rows for _, raw_rows, _ in cleaned.values()))
+        _add_rows(record, 'rows_out', sum(len(df_file) for df_file, _, _ in cleaned.values()))
+    
+    results = []
+    for filepath in input_files:
+        key = os.path.abspath(filepath)
+        if filepath in cleaned:
+            df_file, raw_rows, dropped = cleaned[filepath]
+            if manifest is not None:
+                partition = f"{hashes[filepath]}.pkl"
+                df_file.to_pickle(os.path.join(cache_dir, partition))
+                dropped.to_pickle(os.path.join(cache_dir, f"{hashes[filepath]}.quarantine.pkl"))
+                manifest['files'][key] = {
+                    'sha256': hashes[filepath],
+                    'partition': partition,
+                    'quarantine': f"{hashes[filepath]}.quarantine.pkl",
+                    'raw_rows': raw_rows,
+                }
+        else:
+            entry = manifest['files'][key]
+            df_file = pd.read_pickle(os.path.join(cache_dir, entry['partition']))
+            raw_rows = entry['raw_rows']
+            dropped = pd.read_pickle(os.path.join(cache_dir, entry['quarantine']))
+            dropped['Source_File'] = filepath
+        results.append((filepath, df_file, raw_rows, dropped))
+    
+    if manifest is not None:
+        current = {os.path.abspath(filepath) for filepath in input_files}
+        manifest['files'] = {key: entry for key, entry in manifest['files'].items() if key in current}
+        save_manifest(cache_dir, manifest)
+    
+    print(f"\n📁 PER-FILE SUMMARY:")
+    for filepath, df_file, raw_rows, _ in results:
+        source = "cleaned" if filepath in cleaned else "cached"
+        print(f"   {os.path.basename(filepath)}: {len(df_file)} kept, {raw_rows - len(df_file)} dropped ({source})")
+    
+    with measure_step(run_report, 'merge_files') as record:
+        df = pd.concat([df_file for _, df_file, _, _ in results], ignore_index=True)
+        # Files may carry different extra indicators, so flags are rederived over the union
+        df = reorder_columns(add_completeness_flags(df))
+    if record is not None:
+        _add_rows(record, 'rows_in', sum(len(df_file) for _, df_file, _, _ in results))
+        _add_rows(record, 'rows_out', len(df))
+    print(f"\n✓ Merged {len(results)} files: {df.shape[0]} rows × {df.shape[1]} columns")
+    
+    if quarantine_path is not None:
+        reset_quarantine(quarantine_path)
+        dropped = pd.concat([dropped for _, _, _, dropped in results], ignore_index=True)
+        write_quarantine(dropped, quarantine_path)
+        print(f"✓ Quarantined {len(dropped)} dropped rows to: {quarantine_path}")
+    
+    # Rules run on the merged frame so duplicates and vanished states are caught across files
+    reset_quarantine(violations_path)
+    run_step(run_report, 'validate_cleaned_data', validate_cleaned_data, df, violations_path=violations_path)
     
     # Step 8: Save cleaned data
     print("\nSTEP 8: Saving cleaned data...")
-    output_path = '/home/claude/obesity_data_cleaned.csv'
-    df.to_csv(output_path, index=False)
-    print(f"✓ Saved cleaned data to: {output_path}")
+    run_step(run_report, 'write_cleaned_data', write_cleaned_data, df, output_path, write_csv=write_csv,
+             sqlite_path=sqlite_path)
     
     # Step 9: Generate data quality report
-    generate_data_quality_report(df)
+    report = run_step(run_report, 'generate_data_quality_report', generate_data_quality_report, df)
+    if quality_json_path:
+        write_quality_report_json(report, quality_json_path)
+    
+    return df
+
+
+def main(input_path=RAW_DATA_PATH, output_path=CLEANED_DATA_PATH, chunksize=None, batch=None, max_workers=None,
+         cache_dir=None, write_csv=True, compact=False, report_path=None, profile_dir=None,
+         quarantine_path=None, verbose=False, quality_json_path=None, sqlite_path=None, violations_path=None):
+    """
+    Main cleaning pipeline
+    
+    With `chunksize` set, the raw file is streamed in chunks instead of being
+    loaded whole, and nothing is returned. With `batch` (a directory or glob)
+    set, every matching raw export is cleaned in parallel and merged, reusing
+    cached partitions in `cache_dir` for inputs that have not changed.
+    
+    Output is the cleaned CSV at `output_path` (skipped when `write_csv` is
+    False) plus a Parquet dataset next to it, and the SQLite store at
+    `sqlite_path` when that is given. With `compact`, the returned frame is shrunk with
+    compact_cleaned_frame.
+    
+    With `report_path` set, every step's wall time, CPU time, rows in/out and
+    peak traced memory increase are written there as JSON; with `profile_dir` set,
+    each step is also profiled with cProfile into that directory.
+    
+    Contaminated rows are written to `quarantine_path` when it is given;
+    `verbose` also lists them one per line on the console. The data quality
+    report is also written as JSON to `quality_json_path` when it is given.
+    
+    After the derived columns are added the frame is checked against
+    VALIDATION_RULES; violations are reported per rule and written to
+    `violations_path` when it is given. Nothing is dropped by validation.
+    """
+    print("\n" + "=" * 100)
+    print("OBESITY DATA CLEANING PIPELINE - START")
+    print("=" * 100 + "\n")
+    
+    run_report = None
+    if report_path or profile_dir:
+        mode = 'batch' if batch else 'streaming' if chunksize else 'single'
+        run_report = new_run_report(mode, batch or input_path, output_path, profile_dir=profile_dir)
+        tracemalloc.start()
+    
+    df = None
+    if batch:
+        df = run_batch_pipeline(batch, output_path, max_workers=max_workers, cache_dir=cache_dir,
+                                write_csv=write_csv, run_report=run_report, quality_json_path=quality_json_path,
+                                sqlite_path=sqlite_path, violations_path=violations_path,
+                                quarantine_path=quarantine_path)
+    elif chunksize:
+        run_streaming_pipeline(input_path, output_path, chunksize, write_csv=write_csv, run_report=run_report,
+                               quarantine_path=quarantine_path, verbose=verbose,
+                               quality_json_path=quality_json_path, sqlite_path=sqlite_path,
+                               violations_path=violations_path)
+    else:
+        # Step 1: Load raw data
+        print("STEP 1: Loading raw data...")
+        df = run_step(run_report, 'load_raw_data', load_raw_data, input_path)
+        
+        # Step 2: Remove contaminated rows
+        print("\nSTEP 2: Removing contaminated rows...")
+        reset_quarantine(quarantine_path)
+        df = run_step(run_report, 'remove_contaminated_rows', remove_contaminated_rows, df,
+                      quarantine_path=quarantine_path, verbose=verbose)
+        
+        # Step 3: Split Characteristic column
+        print("\nSTEP 3: Splitting Characteristic column...")
+        df = run_step(run_report, 'split_characteristic_column', split_characteristic_column, df)
+        
+        # Step 4: Convert numeric columns
+        print("\nSTEP 4: Converting numeric columns...")
+        df = run_step(run_report, 'convert_numeric_columns', convert_numeric_columns, df)
+        
+        # Step 5: Add derived columns
+        print("\nSTEP 5: Adding derived columns...")
+        df = run_step(run_report, 'add_derived_columns', add_derived_columns, df)
+        reset_quarantine(violations_path)
+        df = run_step(run_report, 'validate_cleaned_data', validate_cleaned_data, df,
+                      violations_path=violations_path)
+        
+        # Step 6: Rename columns
+        print("\nSTEP 6: Creating clean column names...")
+        df = run_step(run_report, 'create_clean_column_names', create_clean_column_names, df)
+        
+        # Step 7: Reorder columns for better readability
+        print("\nSTEP 7: Reordering columns...")
+        df = run_step(run_report, 'reorder_columns', reorder_columns, df)
+        
+        # Step 8: Save cleaned data
+        print("\nSTEP 8: Saving cleaned data...")
+        run_step(run_report, 'write_cleaned_data', write_cleaned_data, df, output_path, write_csv=write_csv,
+                 sqlite_path=sqlite_path)
+        
+        # Step 9: Generate data quality report
+        report = run_step(run_report, 'generate_data_quality_report', generate_data_quality_report, df)
+        if quality_json_path:
+            write_quality_report_json(report, quality_json_path)
+    
+    if compact and df is not None:
+        df = run_step(run_report, 'compact_cleaned_frame', compact_cleaned_frame, df)
+    
+    if run_report is not None:
+        tracemalloc.stop()
+        write_run_report(run_report, report_path or os.path.join(profile_dir, 'run_report.json'))
     
     print("\n" + "=" * 100)
     print("CLEANING PIPELINE COMPLETE ✓")
@@ -323,12 +1705,60 @@ def main():
 
 
 if __name__ == "__main__":
-    df_cleaned = main()
+    parser = argparse.ArgumentParser(description="Clean the raw DHS obesity export")
+    parser.add_argument('--input', default=RAW_DATA_PATH, help="raw StatCompiler CSV export")
+    parser.add_argument('--output', default=CLEANED_DATA_PATH,
+                        help="cleaned CSV path; the Parquet dataset is written beside it as .parquet")
+    parser.add_argument('--no-csv', action='store_true',
+                        help="only write the Parquet dataset (the dashboards read the CSV)")
+    parser.add_argument('--sqlite', default=None,
+                        help="also load the cleaned data into this SQLite database (indexed for lookups)")
+    parser.add_argument('--compact', action='store_true',
+                        help="return the cleaned frame with categoricals, float32 metrics and packed flags")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="stream the raw file in chunks of this many rows")
+    parser.add_argument('--batch', default=None,
+                        help="directory or glob of raw exports to clean in parallel and merge")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes for --batch (default: one per core)")
+    parser.add_argument('--cache-dir', default=None,
+                        help="manifest/partition cache for --batch (default: .cleaning_cache next to the output)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="re-clean every --batch input instead of reusing unchanged ones")
+    parser.add_argument('--report', default=None,
+                        help="write per-step timing/memory measurements to this JSON file")
+    parser.add_argument('--profile', action='store_true',
+                        help="also dump a cProfile .prof file per step (next to the report)")
+    parser.add_argument('--quarantine', default=None,
+                        help="write dropped rows with reason codes here (.csv, or .parquet for a dataset)")
+    parser.add_argument('--violations', default=None,
+                        help="write validation rule violations to this CSV")
+    parser.add_argument('--verbose', action='store_true',
+                        help="list every dropped row on the console")
+    parser.add_argument('--quality-json', default=None,
+                        help="also write the data quality report to this JSON file")
+    args = parser.parse_args()
+    
+    cache_dir = None
+    if args.batch and not args.no_cache:
+        cache_dir = args.cache_dir or os.path.join(os.path.dirname(os.path.abspath(args.output)), '.cleaning_cache')
+    
+    profile_dir = None
+    if args.profile:
+        profile_dir = os.path.join(os.path.dirname(os.path.abspath(args.report or args.output)), 'cleaning_profiles')
+    
+    df_cleaned = main(args.input, args.output, chunksize=args.chunksize,
+                      batch=args.batch, max_workers=args.workers, cache_dir=cache_dir,
+                      write_csv=not args.no_csv, compact=args.compact, report_path=args.report,
+                      profile_dir=profile_dir, quarantine_path=args.quarantine, verbose=args.verbose,
+                      quality_json_path=args.quality_json, sqlite_path=args.sqlite,
+                      violations_path=args.violations)
     
-    print("\n📋 SAMPLE OF CLEANED DATA:")
-    print(df_cleaned.head(10).to_string())
+    if df_cleaned is not None:
+        print("\n📋 SAMPLE OF CLEANED DATA:")
+        print(df_cleaned.head(10).to_string())
     
     print("\n✅ Next steps:")
-    print("   1. Review the cleaned data: obesity_data_cleaned.csv")
+    print("   1. Review the cleaned data: obesity_data_cleaned.csv (typed copy: obesity_data_cleaned.parquet)")
     print("   2. Check the data quality report above")
     print("   3. Use this data for your dashboard visualization")
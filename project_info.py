@@ -3,9 +3,10 @@ Quick Project Information Script
 Displays key information about the India Obesity Dashboard project
 """
 
-import pandas as pd
 import os
 
+from data_index import load_index
+
 print("=" * 80)
 print("INDIA OBESITY DASHBOARD - PROJECT INFORMATION")
 print("=" * 80)
@@ -27,26 +28,27 @@ for file in files:
 
 # Load and display dataset info
 if os.path.exists('obesity_data_cleaned.csv'):
-    df = pd.read_csv('obesity_data_cleaned.csv')
+    index = load_index()
+    df = index.df
 
     print("\nDATASET SUMMARY:")
     print(f"  Total Records: {len(df)}")
     print(f"  Total Columns: {len(df.columns)}")
     print(f"  Survey Years: {sorted(df['Survey_Year'].unique())}")
     print(f"  Categories: {df['Category'].nunique()}")
-    print(f"  States Covered: {len(df[df['Category'] == 'States'])}")
+    print(f"  States Covered: {len(index.slice(category='States'))}")
 
     print("\nLATEST OBESITY RATES (2019):")
-    latest = df[df['Category'] == 'Total'].sort_values('Survey_Year').iloc[-1]
+    latest = index.slice(category='Total').sort_values('Survey_Year').iloc[-1]
     print(f"  Children: {latest['Children_Overweight_Pct']:.1f}%")
     print(f"  Women: {latest['Women_Overweight_Pct']:.1f}%")
     print(f"  Men: {latest['Men_Overweight_Pct']:.1f}%")
 
     print("\nTOP 5 STATES BY WOMEN'S OBESITY (2019):")
-    states = df[(df['Category'] == 'States') & (df['Survey_Year'] == 2019)]
+    states = index.slice(category='States', year=2019)
     top_states = states.nlargest(5, 'Women_Overweight_Pct')
     for idx, row in top_states.iterrows():
-        state = row['Subcategory'].replace('States : ', '').replace(' (L1)', '')
+        state = row['Geo_Name']
         print(f"  {state}: {row['Women_Overweight_Pct']:.1f}%")
 
 print("\nQUICK START:")
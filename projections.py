@@ -0,0 +1,226 @@
+"""
+BATCH PROJECTIONS TO FUTURE SURVEY ROUNDS
+India Obesity Dashboard
+
+Fits a linear or log-linear trend to every (Country, Category, Subcategory,
+metric) series at once and projects it to future survey years (NFHS-6 by
+default) with prediction intervals:
+
+- linear: value = a + b * year, projected values clipped to 0-100%
+- log_linear: log(value) = a + b * year, i.e. constant growth rate;
+  intervals are computed on the log scale and exponentiated
+
+Fits reuse trends.fit_lines, so all series are solved in one batched call.
+Prediction intervals use the t distribution with n - 2 degrees of freedom,
+so a series needs three observed rounds for an interval; with two rounds
+it still gets a projection but NaN bounds.
+
+load_projections() caches the table next to the cleaned CSV and only
+refits when the CSV's content (or the projection settings) change, so
+dashboard generators can plot projected segments without refitting:
+
+    projections = load_projections()
+    segment = projected_segment(projections, 'Women_Overweight_Pct')
+"""
+
+import json
+import math
+import os
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from data_loader import CLEANED_DATA_CSV, cleaned_data_hash, load_cleaned_data
+from obesity_data_cleaning import NFHS_ROUND_YEARS
+from trends import fit_lines, series_matrix
+
+# NFHS-6 fieldwork starts in 2023; Survey_Year is a round's start year
+PROJECTION_YEARS = [NFHS_ROUND_YEARS[6][0]]
+
+PROJECTION_METHODS = ('linear', 'log_linear')
+
+# Bump when the projection output changes so cached tables are refitted
+PROJECTION_VERSION = 2
+
+
+def _t_cdf(t, dof):
+    """Student t CDF for a whole number of degrees of freedom (closed-form series)"""
+    theta = math.atan(t / math.sqrt(dof))
+    cos2 = math.cos(theta) ** 2
+    term = total = 1.0
+    if dof % 2:
+        for k in range(1, (dof - 1) // 2):
+            term *= cos2 * (2 * k) / (2 * k + 1)
+            total += term
+        inner = theta + (math.sin(theta) * math.cos(theta) * total if dof > 1 else 0.0)
+        return 0.5 + inner / math.pi
+    for k in range(1, dof // 2):
+        term *= cos2 * (2 * k - 1) / (2 * k)
+        total += term
+    return 0.5 + math.sin(theta) * total / 2
+
+
+def _t_pdf(t, dof):
+    log_scale = math.lgamma((dof + 1) / 2) - math.lgamma(dof / 2) - 0.5 * math.log(dof * math.pi)
+    return math.exp(log_scale - (dof + 1) / 2 * math.log1p(t * t / dof))
+
+
+def t_quantile(p, dof):
+    """
+    Student t quantile for an array of degrees of freedom (NaN where dof < 1)
+
+    Exact for 1 and 2 degrees of freedom. Otherwise the Cornish-Fisher
+    expansion around the normal quantile is the starting point; for whole
+    degrees of freedom (all that projections use) it is refined by Newton
+    steps on the closed-form t CDF to full float precision. Fractional
+    degrees of freedom keep the bare expansion, which is off by up to 0.05
+    at 3 degrees of freedom and the 99% level.
+    """
+    dof = np.asarray(dof, dtype='float64')
+    z = NormalDist().inv_cdf(p)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        expansion = (z
+                     + (z ** 3 + z) / (4 * dof)
+                     + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * dof ** 2)
+                     + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * dof ** 3)
+                     + (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / (92160 * dof ** 4))
+    quantile = np.where(dof == 1, math.tan(math.pi * (p - 0.5)), expansion)
+    quantile = np.where(dof == 2, (2 * p - 1) / math.sqrt(2 * p * (1 - p)), quantile)
+
+    # The quantile depends only on dof, so each distinct whole value is refined once
+    quantile = np.array(quantile, dtype='float64')
+    whole = (dof > 2) & (dof == np.floor(dof))
+    for value in np.unique(dof[whole]):
+        n = int(value)
+        t = float(quantile[dof == value].flat[0])
+        for _ in range(50):
+            step = (_t_cdf(t, n) - p) / _t_pdf(t, n)
+            t -= step
+            if abs(step) <= 1e-12 * max(1.0, abs(t)):
+                break
+        quantile[dof == value] = t
+    return np.where(dof >= 1, quantile, np.nan)
+
+
+def project_series(df, years=None, method='linear', level=0.95, metrics=None):
+    """
+    Projections with prediction intervals for every series and target year
+
+    One row per (Country, Category, Subcategory, Metric, Projection_Year)
+    with Points, Last_Year, Last_Value, Slope (on the fitted scale),
+    Projected, PI_Low and PI_High. Series with fewer than two observed
+    rounds are left out.
+    """
+    if method not in PROJECTION_METHODS:
+        raise ValueError(f"Unknown projection method: {method} (expected one of {PROJECTION_METHODS})")
+    years = np.asarray(PROJECTION_YEARS if years is None else years, dtype='float64')
+
+    keys, survey_years, values = series_matrix(df, metrics)
+    observed_values = values
+    if method == 'log_linear':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = np.where(values > 0, np.log(values), np.nan)
+
+    intercept, slope, centre = fit_lines(survey_years, values)
+    observed = ~np.isnan(values)
+    points = observed.sum(axis=1)
+
+    # Residual variance and each series' own year spread (only its observed rounds count)
+    fitted = intercept[:, None] + slope[:, None] * (survey_years - centre)
+    residuals = np.where(observed, values - fitted, 0.0)
+    dof = points - 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = (residuals ** 2).sum(axis=1) / dof
+        mean_year = (observed * survey_years).sum(axis=1) / points
+        spread = (np.where(observed, survey_years - mean_year[:, None], 0.0) ** 2).sum(axis=1)
+
+        # (series × target years) predictions and interval half-widths
+        predicted = intercept[:, None] + slope[:, None] * (years - centre)
+        standard_error = np.sqrt(variance[:, None] * (1 + 1 / points[:, None]
+                                                      + (years - mean_year[:, None]) ** 2 / spread[:, None]))
+    margin = t_quantile(1 - (1 - level) / 2, dof)[:, None] * standard_error
+    margin = np.where(dof[:, None] > 0, margin, np.nan)
+    low, high = predicted - margin, predicted + margin
+
+    if method == 'log_linear':
+        predicted, low, high = np.exp(predicted), np.exp(low), np.exp(high)
+    predicted, low, high = (np.clip(values_, 0, 100) for values_ in (predicted, low, high))
+
+    rows = np.flatnonzero(~np.isnan(slope))
+    n_years = len(years)
+    last = values.shape[1] - 1 - np.argmax(observed[rows][:, ::-1], axis=1)
+
+    projections = keys.iloc[np.repeat(rows, n_years)].reset_index(drop=True)
+    projections['Method'] = method
+    projections['Points'] = np.repeat(points[rows], n_years)
+    projections['Last_Year'] = np.repeat(survey_years[last], n_years).astype('int64')
+    projections['Last_Value'] = np.repeat(observed_values[rows, last], n_years)
+    projections['Slope'] = np.repeat(slope[rows], n_years)
+    projections['Projection_Year'] = np.tile(years, len(rows)).astype('int64')
+    projections['Projected'] = predicted[rows].ravel()
+    projections['PI_Low'] = low[rows].ravel()
+    projections['PI_High'] = high[rows].ravel()
+    return projections
+
+
+def projection_cache_paths(csv_path, method):
+    """(table, metadata) cache paths that sit next to the cleaned CSV"""
+    stem = os.path.splitext(csv_path)[0]
+    return f'{stem}.projections.{method}.pkl', f'{stem}.projections.{method}.json'
+
+
+def load_projections(csv_path=CLEANED_DATA_CSV, years=None, method='linear', level=0.95):
+    """
+    Projection table for the cleaned dataset, refitted only when needed
+
+    The cache is reused while the CSV's content hash and the requested
+    years and level match its metadata. A cache that cannot be written
+    (read-only directory) just means the fit runs every time.
+    """
+    years = [int(year) for year in (PROJECTION_YEARS if years is None else years)]
+    table_path, meta_path = projection_cache_paths(csv_path, method)
+    expected = {
+        'version': PROJECTION_VERSION,
+        'source_sha256': cleaned_data_hash(csv_path),
+        'years': years,
+        'level': level,
+    }
+
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        meta = None
+    if meta == expected and os.path.exists(table_path):
+        return pd.read_pickle(table_path)
+
+    projections = project_series(load_cleaned_data(csv_path), years=years, method=method, level=level)
+    try:
+        projections.to_pickle(table_path)
+        with open(meta_path, 'w') as f:
+            json.dump(expected, f, indent=2)
+    except OSError:
+        pass
+    return projections
+
+
+def projected_segment(projections, metric, category='Total', subcategory='Total', country='India'):
+    """
+    Points for drawing one series' projected segment
+
+    Starts at the last observed round (where the bounds equal the value) and
+    continues through each projection year, with Year, Value, PI_Low and
+    PI_High columns, ready to plot as a dashed line with a band.
+    """
+    rows = projections[(projections['Country'] == country) & (projections['Category'] == category)
+                       & (projections['Subcategory'] == subcategory) & (projections['Metric'] == metric)]
+    if rows.empty:
+        return pd.DataFrame(columns=['Year', 'Value', 'PI_Low', 'PI_High'])
+
+    first = rows.iloc[0]
+    start = pd.DataFrame({'Year': [first['Last_Year']], 'Value': [first['Last_Value']],
+                          'PI_Low': [first['Last_Value']], 'PI_High': [first['Last_Value']]})
+    ahead = rows.rename(columns={'Projection_Year': 'Year', 'Projected': 'Value'})[
+        ['Year', 'Value', 'PI_Low', 'PI_High']]
+    return pd.concat([start, ahead], ignore_index=True)
@@ -0,0 +1,128 @@
+"""
+STREAMING STATISTICS FOR OBESITY METRICS
+Out-of-core accumulators for the data quality report
+
+Each accumulator is a plain dict, so it can be fed chunk by chunk, pickled
+back from worker processes and merged in any order.
+
+Moments
+- count, mean and the sum of squared deviations (M2) are combined with
+  Welford/Chan updates, so mean and standard deviation match the exact
+  two-pass figures up to floating-point rounding, without the cancellation
+  problems of a running sum of squares.
+
+Quantile sketch
+- A fixed-width histogram over [low, high] (default 0-100%, resolution 0.1
+  points). Bins are centred on multiples of the resolution, so every value
+  in range lands in the bin whose centre is within resolution/2 of it.
+- Error bound: for values inside [low, high], any quantile (including the
+  median) is within resolution/2 of the exact pandas figure (linear
+  interpolation between order statistics). DHS percentages are published
+  to one decimal, so at the default resolution of 0.1 the median is exact.
+- Values outside [low, high] are clamped into the end bins and counted in
+  `out_of_range`; if that count is non-zero the bound no longer holds.
+- Merging two sketches is adding their bin counts, so merged results are
+  identical to feeding all the data into one sketch.
+"""
+
+import numpy as np
+
+
+def new_metric_stats(low=0.0, high=100.0, resolution=0.1):
+    """Empty accumulator for one metric"""
+    n_bins = int(round((high - low) / resolution)) + 1
+    return {
+        'count': 0,
+        'mean': 0.0,
+        'm2': 0.0,
+        'min': np.nan,
+        'max': np.nan,
+        'low': low,
+        'resolution': resolution,
+        'histogram': np.zeros(n_bins, dtype='int64'),
+        'out_of_range': 0,
+    }
+
+
+def _combine_moments(stats, count, mean, m2):
+    """Chan et al. parallel combination of (count, mean, M2) into `stats`"""
+    total = stats['count'] + count
+    if total == 0:
+        return
+    delta = mean - stats['mean']
+    stats['mean'] += delta * count / total
+    stats['m2'] += m2 + delta ** 2 * stats['count'] * count / total
+    stats['count'] = total
+
+
+def update_metric_stats(stats, values):
+    """Fold a chunk of values (missing values are ignored) into the accumulator"""
+    values = np.asarray(values, dtype='float64')
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return stats
+
+    chunk_mean = values.mean()
+    _combine_moments(stats, len(values), chunk_mean, ((values - chunk_mean) ** 2).sum())
+    stats['min'] = np.fmin(stats['min'], values.min())
+    stats['max'] = np.fmax(stats['max'], values.max())
+
+    n_bins = len(stats['histogram'])
+    bins = np.rint((values - stats['low']) * (1 / stats['resolution']))
+    stats['out_of_range'] += int(((bins < 0) | (bins > n_bins - 1)).sum())
+    bins = np.clip(bins, 0, n_bins - 1).astype('int64')
+    stats['histogram'] += np.bincount(bins, minlength=n_bins)
+    return stats
+
+
+def merge_metric_stats(stats, other):
+    """Merge `other` into `stats` (e.g. accumulators returned by worker processes)"""
+    if stats['low'] != other['low'] or stats['resolution'] != other['resolution'] \
+            or len(stats['histogram']) != len(other['histogram']):
+        raise ValueError("Cannot merge metric stats built with different sketch ranges")
+
+    _combine_moments(stats, other['count'], other['mean'], other['m2'])
+    stats['min'] = np.fmin(stats['min'], other['min'])
+    stats['max'] = np.fmax(stats['max'], other['max'])
+    stats['histogram'] = stats['histogram'] + other['histogram']
+    stats['out_of_range'] += other['out_of_range']
+    return stats
+
+
+def sketch_quantile(stats, q):
+    """
+    Approximate quantile from the histogram sketch
+
+    Uses the same linear interpolation between order statistics as
+    pandas.Series.quantile, with each order statistic read from its bin
+    centre (within resolution/2 of the true value).
+    """
+    count = int(stats['histogram'].sum())
+    if count == 0:
+        return np.nan
+
+    position = (count - 1) * q
+    lower_rank = int(np.floor(position))
+    upper_rank = int(np.ceil(position))
+    cumulative = np.cumsum(stats['histogram'])
+    lower_bin, upper_bin = np.searchsorted(cumulative, [lower_rank + 1, upper_rank + 1])
+
+    # Dividing by the bins-per-unit scale keeps centres like 2.8 exact in float
+    scale = 1 / stats['resolution']
+    lower = stats['low'] + lower_bin / scale
+    upper = stats['low'] + upper_bin / scale
+    return lower + (upper - lower) * (position - lower_rank)
+
+
+def finalize_metric_stats(stats):
+    """Summary figures: count, min, max, mean, median, std (sample, ddof=1)"""
+    count = stats['count']
+    return {
+        'count': count,
+        'min': stats['min'],
+        'max': stats['max'],
+        'mean': stats['mean'] if count else np.nan,
+        'median': sketch_quantile(stats, 0.5),
+        'std': np.sqrt(stats['m2'] / (count - 1)) if count > 1 else np.nan,
+        'median_error_bound': stats['resolution'] / 2 if stats['out_of_range'] == 0 else np.inf,
+    }
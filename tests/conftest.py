@@ -0,0 +1,30 @@
+"""
+Shared fixtures for the test suite: the cleaned CSV bundled with the repository
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from data_loader import read_cleaned_csv
+
+BUNDLED_CSV = os.path.join(os.path.dirname(__file__), '..', 'obesity_data_cleaned.csv')
+
+
+@pytest.fixture(scope='session')
+def bundled_csv():
+    """Path to the bundled cleaned CSV"""
+    return BUNDLED_CSV
+
+
+@pytest.fixture(scope='session')
+def bundled():
+    """The bundled CSV as plain pd.read_csv reads it; shared, so treat as read-only"""
+    return pd.read_csv(BUNDLED_CSV)
+
+
+@pytest.fixture(scope='session')
+def df():
+    """The bundled CSV loaded with the dashboards' dtypes; shared, so treat as read-only"""
+    return read_cleaned_csv(BUNDLED_CSV)
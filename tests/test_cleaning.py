@@ -0,0 +1,334 @@
+"""
+Tests for the cleaning pipeline steps in obesity_data_cleaning.py
+"""
+
+import contextlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from confidence_intervals import Z_95, standard_errors
+from data_loader import load_cleaned_data
+from indicator_store import IndicatorStore
+from obesity_data_cleaning import (
+    CLEANED_DTYPES,
+    CLEAN_COLUMN_NAMES,
+    INDICATOR_REGISTRY,
+    MANIFEST_FILENAME,
+    METRIC_COLUMNS,
+    RAW_SCHEMA,
+    UNCERTAINTY_COLUMNS,
+    classify_contaminated_rows,
+    extract_year_from_survey,
+    extract_years_from_survey_column,
+    load_manifest,
+    main,
+    register_indicator,
+    read_cleaned_parquet,
+    split_characteristic_column,
+    write_cleaned_data,
+)
+
+
+def split_characteristic_rowwise(df):
+    """The original row-by-row split, kept as the reference implementation"""
+    df['Category'] = None
+    df['Subcategory'] = None
+    
+    for idx, char in df['Characteristic'].items():
+        if pd.isna(char):
+            continue
+        
+        char_str = str(char).strip()
+        
+        if ':' in char_str:
+            parts = char_str.split(':', 1)
+            df.at[idx, 'Category'] = parts[0].strip()
+            df.at[idx, 'Subcategory'] = parts[1].strip()
+        else:
+            df.at[idx, 'Category'] = char_str
+            df.at[idx, 'Subcategory'] = char_str
+    
+    return df
+
+
+def assert_same_split(characteristics):
+    frame = pd.DataFrame({'Characteristic': characteristics})
+    expected = split_characteristic_rowwise(frame.copy())
+    actual = split_characteristic_column(frame.copy())
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_split_matches_rowwise_on_bundled_csv(bundled):
+    characteristics = bundled['Characteristic']
+    assert_same_split(characteristics)
+
+
+def test_split_missing_values_stay_none():
+    frame = split_characteristic_column(pd.DataFrame({'Characteristic': [np.nan, None, 'Total']}))
+    assert frame['Category'].tolist() == [None, None, 'Total']
+    assert frame['Subcategory'].tolist() == [None, None, 'Total']
+    assert_same_split([np.nan, None, 'Residence : Urban'])
+
+
+def test_split_without_colon_uses_value_for_both():
+    assert_same_split(['Total', '  Total  ', 'Kerala (L1)', ''])
+
+
+def test_split_on_first_colon_only():
+    assert_same_split(['Time : 10:30', 'Residence:Rural', 'Residence : ', ': Urban'])
+
+
+def write_raw_export(path, cleaned, extra=None):
+    """Rebuild a raw StatCompiler-style export (blank first line) from a cleaned frame"""
+    raw = cleaned.rename(columns={clean: raw for raw, clean in CLEAN_COLUMN_NAMES.items()})[list(RAW_SCHEMA)]
+    if extra is not None:
+        raw = pd.concat([raw, extra], axis=1)
+    with open(path, 'w') as f:
+        f.write('\n')
+        raw.to_csv(f, index=False)
+
+
+def test_streaming_parquet_files_share_one_schema(tmp_path, bundled):
+    pytest.importorskip('pyarrow')
+    raw_path = tmp_path / 'raw.csv'
+    write_raw_export(raw_path, bundled)
+    
+    # One-row chunks: chunks whose Geo_* columns are all missing must not be typed as null
+    with contextlib.redirect_stdout(io.StringIO()):
+        main(str(raw_path), str(tmp_path / 'streamed.csv'), chunksize=1)
+        main(str(raw_path), str(tmp_path / 'single.csv'))
+    
+    streamed = read_cleaned_parquet(str(tmp_path / 'streamed.parquet'))
+    single = read_cleaned_parquet(str(tmp_path / 'single.parquet'))
+    key = ['Survey_Year', 'Characteristic']
+    pd.testing.assert_frame_equal(streamed.sort_values(key).reset_index(drop=True),
+                                  single.sort_values(key).reset_index(drop=True))
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'streamed.csv'), pd.read_csv(tmp_path / 'single.csv'))
+
+
+def test_missing_pyarrow_is_reported_when_writing_csv(tmp_path, monkeypatch, capsys, bundled_csv):
+    monkeypatch.setattr('obesity_data_cleaning.HAS_PYARROW', False)
+    df = pd.read_csv(bundled_csv, nrows=5)
+    
+    write_cleaned_data(df, str(tmp_path / 'out.csv'))
+    assert 'skipping the partitioned Parquet dataset' in capsys.readouterr().out
+    assert not (tmp_path / 'out.parquet').exists()
+    
+    write_cleaned_data(df, str(tmp_path / 'only.csv'), write_csv=False)
+    assert 'writing CSV instead of Parquet' in capsys.readouterr().out
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'only.csv'), df)
+
+
+def test_uncertainty_columns_reach_the_cleaned_data(tmp_path, bundled):
+    pytest.importorskip('pyarrow')
+    cleaned = bundled
+    raw_headers = {clean: raw for raw, clean in CLEAN_COLUMN_NAMES.items()}
+    children, women, men = METRIC_COLUMNS
+    extra = pd.DataFrame({
+        raw_headers[children] + ' SE': cleaned[children] / 20,
+        raw_headers[women] + ' SE': cleaned[women] / 20,
+        raw_headers[men] + ' CI low': cleaned[men] - 2,
+        raw_headers[men] + ' CI high': cleaned[men] + 2,
+    })
+    write_raw_export(tmp_path / 'raw.csv', cleaned, extra)
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        main(str(tmp_path / 'raw.csv'), str(tmp_path / 'streamed.csv'), chunksize=50)
+        main(str(tmp_path / 'raw.csv'), str(tmp_path / 'single.csv'))
+    
+    expected = [children + '_SE', women + '_SE', men + '_CI_Low', men + '_CI_High']
+    single = load_cleaned_data(str(tmp_path / 'single.csv'))
+    assert [col for col in single.columns if col in UNCERTAINTY_COLUMNS] == expected
+    assert single[expected].dtypes.eq('float64').all()
+    pd.testing.assert_frame_equal(load_cleaned_data(str(tmp_path / 'streamed.csv')), single)
+    
+    errors = standard_errors(single)
+    np.testing.assert_allclose(errors[women], single[women] / 20)
+    assert errors[men].isna().equals(single[men].isna())
+    np.testing.assert_allclose(errors[men].dropna(), 4 / (2 * Z_95))
+    
+    parquet = read_cleaned_parquet(str(tmp_path / 'single.parquet'))
+    assert list(parquet.columns[-len(expected):]) == expected
+
+
+@pytest.fixture
+def anemia():
+    """A registered indicator beyond the three core ones, removed again afterwards"""
+    meta = register_indicator('women_anemia', 'Women with any anemia', raw_column='Women with any anemia',
+                              population='Women 15-49', definition='Hemoglobin < 12.0 g/dl (< 11.0 if pregnant)')
+    yield meta
+    del INDICATOR_REGISTRY['women_anemia']
+    del CLEANED_DTYPES[meta['wide_column']], CLEANED_DTYPES[meta['flag_column']]
+
+
+def test_registered_indicator_reaches_the_store(tmp_path, anemia, bundled):
+    cleaned = bundled
+    anemia_values = (cleaned['Women_Overweight_Pct'] / 2).where(cleaned.index % 5 != 0)
+    write_raw_export(tmp_path / 'raw.csv', cleaned, pd.DataFrame({anemia['raw_column']: anemia_values}))
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        main(str(tmp_path / 'raw.csv'), str(tmp_path / 'streamed.csv'), chunksize=50)
+        main(str(tmp_path / 'raw.csv'), str(tmp_path / 'single.csv'))
+    
+    single = load_cleaned_data(str(tmp_path / 'single.csv'))
+    pd.testing.assert_frame_equal(load_cleaned_data(str(tmp_path / 'streamed.csv')), single)
+    columns = list(single.columns)
+    assert columns.index('Women_Anemia_Pct') == columns.index('Men_Overweight_Pct') + 1
+    assert columns.index('Has_Women_Anemia_Pct') == columns.index('Has_All_Metrics') - 1
+    np.testing.assert_array_equal(single['Has_Women_Anemia_Pct'], single['Women_Anemia_Pct'].notna())
+    np.testing.assert_array_equal(single['Has_All_Metrics'],
+                                  single[METRIC_COLUMNS + ['Women_Anemia_Pct']].notna().all(axis=1))
+    np.testing.assert_allclose(single['Women_Anemia_Pct'], anemia_values.to_numpy(), equal_nan=True)
+    
+    store = IndicatorStore.from_frame(single)
+    assert 'women_anemia' in store.indicators()
+    pd.testing.assert_frame_equal(store.wide(), single)
+
+
+def test_batch_quarantine_collects_every_file(tmp_path, bundled):
+    cleaned = bundled
+    raw = cleaned.rename(columns={clean: raw for raw, clean in CLEAN_COLUMN_NAMES.items()})[list(RAW_SCHEMA)]
+    contaminated = pd.DataFrame({'Country': ['ICF, 2015. The DHS Program', 'India'],
+                                 'Survey': ['2015-16 DHS', 'Percentage of women']})
+    (tmp_path / 'in').mkdir()
+    for name, part in (('a', pd.concat([raw.iloc[:100], contaminated], ignore_index=True)),
+                       ('b', pd.concat([raw.iloc[100:], contaminated.iloc[:1]], ignore_index=True))):
+        with open(tmp_path / 'in' / f'{name}.csv', 'w') as f:
+            f.write('\n')
+            part.to_csv(f, index=False)
+    
+    quarantine_path = tmp_path / 'quarantine.csv'
+    for _ in range(2):  # the second run reads both files' dropped rows from the cache
+        with contextlib.redirect_stdout(io.StringIO()):
+            main(batch=str(tmp_path / 'in'), output_path=str(tmp_path / 'out.csv'),
+                 cache_dir=str(tmp_path / 'cache'), quarantine_path=str(quarantine_path))
+        quarantine = pd.read_csv(quarantine_path)
+        assert [os.path.basename(path) for path in quarantine['Source_File']] == ['a.csv', 'a.csv', 'b.csv']
+        assert quarantine['Source_Row'].tolist() == [100, 101, len(raw) - 100]
+        assert quarantine['Contamination_Reason'].tolist() == ['citation', 'description', 'citation']
+
+
+def test_manifest_recleans_only_changed_inputs(tmp_path, bundled):
+    cleaned = bundled
+    raw = cleaned.rename(columns={clean: raw for raw, clean in CLEAN_COLUMN_NAMES.items()})[list(RAW_SCHEMA)]
+    in_dir, cache_dir = tmp_path / 'in', tmp_path / 'cache'
+    in_dir.mkdir()
+    
+    def write_input(name, part):
+        with open(in_dir / f'{name}.csv', 'w') as f:
+            f.write('\n')
+            part.to_csv(f, index=False)
+    
+    def run_batch():
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            main(batch=str(in_dir), output_path=str(tmp_path / 'out.csv'), cache_dir=str(cache_dir))
+        return output.getvalue()
+    
+    parts = np.array_split(np.arange(len(raw)), 3)
+    for name, part in zip('abc', parts):
+        write_input(name, raw.iloc[part])
+    assert '0 unchanged, 3 to clean' in run_batch()
+    first = pd.read_csv(tmp_path / 'out.csv')
+    
+    log = run_batch()
+    assert '3 unchanged, 0 to clean' in log
+    assert log.count('(cached)') == 3
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'out.csv'), first)
+    
+    write_input('b', raw.iloc[parts[1][:10]])
+    log = run_batch()
+    assert '2 unchanged, 1 to clean' in log
+    assert 'b.csv: 10 kept, 0 dropped (cleaned)' in log
+    assert log.count('(cached)') == 2
+    
+    entries = load_manifest(str(cache_dir))['files']
+    pruned = entries[str(in_dir / 'c.csv')]
+    os.remove(in_dir / 'c.csv')
+    assert '2 unchanged, 0 to clean' in run_batch()
+    entries = load_manifest(str(cache_dir))['files']
+    assert sorted(entries) == [str(in_dir / 'a.csv'), str(in_dir / 'b.csv')]
+    remaining = {MANIFEST_FILENAME} | {entry[name] for entry in entries.values() for name in ('partition', 'quarantine')}
+    assert set(os.listdir(cache_dir)) == remaining
+    assert pruned['partition'] not in remaining and pruned['quarantine'] not in remaining
+
+
+@pytest.mark.parametrize('survey_name, years', [
+    ('2019-21 DHS', (2019, 2021)),
+    ('1998-99 DHS', (1998, 1999)),
+    ('1999-00 DHS', (1999, 2000)),
+    ('2005-2006 DHS', (2005, 2006)),
+    ('2022 DHS', (2022, 2022)),
+    ('NFHS-5', (2019, 2021)),
+    ('NFHS 4', (2015, 2016)),
+    ('NFHS-5 (2019-21)', (2019, 2021)),
+    ('NFHS-9', (None, None)),
+    ('Special survey', (None, None)),
+    (np.nan, (None, None)),
+    (None, (None, None)),
+])
+def test_extract_year_from_survey(survey_name, years):
+    assert extract_year_from_survey(survey_name) == years
+
+
+def test_extract_years_from_survey_column():
+    surveys = pd.Series(['1999-00 DHS', None, 'NFHS-4', '1999-00 DHS', 'Special survey'])
+    start_years, end_years = extract_years_from_survey_column(surveys)
+    assert start_years.dtype == 'Int64' and end_years.dtype == 'Int64'
+    assert start_years.tolist() == [1999, pd.NA, 2015, 1999, pd.NA]
+    assert end_years.tolist() == [2000, pd.NA, 2016, 2000, pd.NA]
+
+
+def identify_contaminated_rows_multipass(df):
+    """The original one-scan-per-pattern contamination check, kept as the reference implementation"""
+    contaminated_mask = pd.Series([False] * len(df), index=df.index)
+    contaminated_mask |= df['Country'].astype(str).str.contains('http|ICF|USAID|statcompiler', case=False, na=False)
+    
+    column_names = ['Children overweight', 'Women who are overweight', 'Men who are overweight']
+    for col_name in column_names:
+        contaminated_mask |= df['Country'].astype(str).str.contains(col_name, case=False, na=False)
+        contaminated_mask |= df['Survey'].astype(str).str.contains(col_name, case=False, na=False)
+    
+    contaminated_mask |= df['Survey'].astype(str).str.contains('^Percentage of', case=False, na=False)
+    contaminated_mask |= pd.to_numeric(df['Country'], errors='coerce').notna()
+    return contaminated_mask
+
+
+# (Country, Survey, expected reason)
+CONTAMINATION_CASES = [
+    ('India', '2019-21 DHS', None),
+    ('ICF, 2015. The DHS Program STATcompiler. http://www.statcompiler.com', np.nan, 'citation'),
+    ('Funded by usaid', '2015-16 DHS', 'citation'),
+    ('Children overweight', 'Percentage of children under 5 years who are overweight', 'column_header'),
+    ('India', 'Men who are overweight or obese according to BMI (>=25.0)', 'column_header'),
+    (np.nan, 'Percentage of women who are overweight', 'description'),
+    ('India', 'percentage of men', 'description'),
+    ('12', np.nan, 'numeric_country'),
+    ('4.5', 'Percentage of women', 'description'),
+    ('Women who are overweight (ICF)', '2019-21 DHS', 'citation'),
+    ('ICF', 'Children overweight', 'citation'),
+    (np.nan, np.nan, None),
+    ('nan', '2019-21 DHS', None),
+    ('India', 'nan', None),
+]
+
+
+def test_contamination_mask_matches_multipass_scan(bundled):
+    cleaned = bundled[['Country', 'Survey']]
+    cases = pd.DataFrame([case[:2] for case in CONTAMINATION_CASES], columns=['Country', 'Survey'])
+    df = pd.concat([cleaned, cases, cases.iloc[::-1]], ignore_index=True).astype(object)
+    
+    mask, _ = classify_contaminated_rows(df)
+    pd.testing.assert_series_equal(mask, identify_contaminated_rows_multipass(df))
+
+
+def test_contamination_reason_priority():
+    df = pd.DataFrame([case[:2] for case in CONTAMINATION_CASES], columns=['Country', 'Survey'], dtype=object)
+    mask, reasons = classify_contaminated_rows(df)
+    expected = [case[2] for case in CONTAMINATION_CASES]
+    assert [None if pd.isna(reason) else reason for reason in reasons] == expected
+    assert mask.tolist() == [reason is not None for reason in expected]
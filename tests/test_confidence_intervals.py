@@ -0,0 +1,113 @@
+"""
+Tests for the parametric bootstrap intervals in confidence_intervals.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from confidence_intervals import (
+    Z_95,
+    absolute_change_intervals,
+    change_intervals,
+    gap_intervals,
+    has_uncertainty,
+    ratio_intervals,
+    slope_intervals,
+    trend_intervals,
+)
+from data_loader import read_cleaned_csv
+from gap_metrics import GAP_DEFINITIONS, compute_gaps
+from obesity_data_cleaning import METRIC_COLUMNS
+from trends import compute_trends
+
+REPLICATES = 40000
+
+
+@pytest.fixture(scope='module')
+def df(df):
+    """The bundled data with a known standard error of 1 point for every value"""
+    return df.assign(**{metric + '_SE': np.where(df[metric].notna(), 1.0, np.nan)
+                        for metric in METRIC_COLUMNS})
+
+
+def test_slope_interval_width_matches_ols_standard_error():
+    years = np.array([1998.0, 2005.0, 2015.0, 2019.0])
+    values = np.array([[10.0, 12.0, 15.0, 18.0],
+                       [10.0, np.nan, 15.0, 18.0]])  # a series with a gap
+    errors = np.full(values.shape, 2.0)
+    low, high = slope_intervals(years, values, errors, n_replicates=REPLICATES, seed=1)
+    
+    for row in range(len(values)):
+        observed = years[~np.isnan(values[row])]
+        slope_se = 2.0 / np.sqrt(((observed - observed.mean()) ** 2).sum())
+        assert high[row] - low[row] == pytest.approx(2 * Z_95 * slope_se, rel=0.03)
+
+
+def test_change_interval_width_matches_combined_standard_error():
+    low, high = change_intervals(np.array([10.0]), np.array([1.0]), np.array([15.0]), np.array([2.0]),
+                                 n_replicates=REPLICATES, seed=2)
+    assert high[0] - low[0] == pytest.approx(2 * Z_95 * np.sqrt(5.0), rel=0.03)
+    assert low[0] < 5.0 < high[0]
+
+
+def test_ratio_interval_contains_point_ratio():
+    high_values, low_values = np.array([30.0, 12.0, 5.0]), np.array([20.0, 10.0, 4.0])
+    low, high = ratio_intervals(high_values, np.ones(3), low_values, np.ones(3), n_replicates=REPLICATES, seed=3)
+    ratio = high_values / low_values
+    assert ((low < ratio) & (ratio < high)).all()
+
+
+def test_fixed_seed_is_reproducible():
+    args = (np.array([30.0, 12.0]), np.ones(2), np.array([20.0, 10.0]), np.ones(2))
+    first = ratio_intervals(*args, n_replicates=1000, seed=7)
+    np.testing.assert_array_equal(first, ratio_intervals(*args, n_replicates=1000, seed=7))
+    assert not np.array_equal(first, ratio_intervals(*args, n_replicates=1000, seed=8))
+
+
+def test_missing_series_stay_nan():
+    years = np.array([2005.0, 2015.0, 2019.0])
+    values = np.array([[np.nan, np.nan, np.nan], [10.0, np.nan, np.nan], [10.0, 12.0, 15.0]])
+    low, high = slope_intervals(years, values, np.ones(values.shape), n_replicates=1000, seed=4)
+    assert np.isnan(low[:2]).all() and np.isnan(high[:2]).all()
+    assert np.isfinite(low[2]) and np.isfinite(high[2])
+    
+    low, high = ratio_intervals(np.array([np.nan, 3.0]), np.ones(2), np.array([2.0, 2.0]), np.array([1.0, np.nan]),
+                                n_replicates=1000, seed=5)
+    assert np.isnan(low).all() and np.isnan(high).all()
+    
+    low, high = change_intervals(np.array([np.nan]), np.ones(1), np.array([2.0]), np.ones(1), n_replicates=1000)
+    assert np.isnan(low).all() and np.isnan(high).all()
+
+
+def test_frame_helpers_need_uncertainty_columns(bundled_csv):
+    cleaned = read_cleaned_csv(bundled_csv)
+    assert not has_uncertainty(cleaned)
+    with pytest.raises(ValueError):
+        trend_intervals(cleaned)
+
+
+def test_gap_intervals_bracket_the_gap_ratio(df):
+    intervals = gap_intervals(df, 'urban_rural', 'Women_Overweight_Pct', n_replicates=5000, seed=6)
+    gaps = compute_gaps(df, ['Women_Overweight_Pct'], {'urban_rural': GAP_DEFINITIONS['urban_rural']})
+    np.testing.assert_array_equal(intervals['Ratio'], gaps['Ratio'])
+    known = intervals['Ratio'].notna()
+    assert known.any()
+    assert (intervals.loc[known, 'Ratio_Low'] < intervals.loc[known, 'Ratio']).all()
+    assert (intervals.loc[known, 'Ratio'] < intervals.loc[known, 'Ratio_High']).all()
+    assert intervals.loc[~known, ['Ratio_Low', 'Ratio_High']].isna().all().all()
+
+
+def test_absolute_change_intervals_follow_compute_trends(df):
+    intervals = absolute_change_intervals(df, n_replicates=5000, seed=9)
+    trends = compute_trends(df)
+    pd.testing.assert_frame_equal(intervals[trends.columns[:4]], trends[trends.columns[:4]])
+    
+    change = trends['Absolute_Change']
+    assert (intervals['Change_Low'].isna() == change.isna()).all()
+    known = change.notna()
+    assert (intervals.loc[known, 'Change_Low'] < change[known]).all()
+    assert (change[known] < intervals.loc[known, 'Change_High']).all()
+    # Every value has SE 1, so every change has SE sqrt(2)
+    width = intervals.loc[known, 'Change_High'] - intervals.loc[known, 'Change_Low']
+    np.testing.assert_allclose(width, 2 * Z_95 * np.sqrt(2), rtol=0.1)
@@ -0,0 +1,43 @@
+"""
+Tests for the indexed lookups in data_index.py
+"""
+
+import pandas as pd
+import pytest
+
+from data_index import ObesityIndex
+
+
+@pytest.fixture(scope='module')
+def index(df):
+    return ObesityIndex(df)
+
+
+def mask_slice(df, category=None, year=None, country=None):
+    """The boolean-mask equivalent of ObesityIndex.slice"""
+    mask = pd.Series(True, index=df.index)
+    for col, value in (('Category', category), ('Survey_Year', year), ('Country', country)):
+        if value is not None:
+            mask &= df[col].isin(value if isinstance(value, list) else [value]).fillna(False)
+    return df[mask]
+
+
+@pytest.mark.parametrize('selectors', [
+    {'category': 'States', 'year': 2019},
+    {'category': 'States', 'year': [2019, 2020]},
+    {'category': ['Total', 'Nope']},
+    {'category': ['Residence', 'Education'], 'year': [2015, 2019], 'country': 'India'},
+    {'year': 2020},
+    {'category': 'Nope'},
+    {'country': ['Nowhere']},
+    {},
+])
+def test_slice_matches_isin_masks(df, index, selectors):
+    pd.testing.assert_frame_equal(index.slice(**selectors), mask_slice(df, **selectors))
+
+
+def test_get_returns_first_matching_row(df, index):
+    row = index.get('India', 2019, 'Total', 'Total')
+    expected = df[(df['Category'] == 'Total') & (df['Survey_Year'] == 2019)].iloc[0]
+    pd.testing.assert_series_equal(row, expected)
+    assert index.get('India', 2020, 'Total', 'Total', default='missing') == 'missing'
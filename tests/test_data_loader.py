@@ -0,0 +1,50 @@
+"""
+Tests for the snapshot cache in data_loader.py
+"""
+
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import data_loader
+from data_loader import load_cleaned_data, read_cleaned_csv, snapshot_paths
+
+
+@pytest.fixture
+def csv_path(tmp_path, bundled_csv):
+    path = tmp_path / 'cleaned.csv'
+    shutil.copy(bundled_csv, path)
+    return str(path)
+
+
+def test_snapshot_rebuilt_when_csv_changes(csv_path):
+    first = load_cleaned_data(csv_path)
+    pd.testing.assert_frame_equal(first, read_cleaned_csv(csv_path))
+    assert all(os.path.exists(path) for path in snapshot_paths(csv_path))
+    
+    first.iloc[:-1].to_csv(csv_path, index=False)
+    second = load_cleaned_data(csv_path)
+    assert len(second) == len(first) - 1
+    pd.testing.assert_frame_equal(pd.read_pickle(snapshot_paths(csv_path)[0]), second)
+
+
+def test_snapshot_reused_when_only_mtime_changes(csv_path, monkeypatch):
+    expected = load_cleaned_data(csv_path)
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    
+    def fail(path):
+        raise AssertionError("CSV reparsed although only its mtime changed")
+    
+    monkeypatch.setattr(data_loader, 'read_cleaned_csv', fail)
+    pd.testing.assert_frame_equal(load_cleaned_data(csv_path), expected)
+    assert data_loader._read_snapshot_meta(snapshot_paths(csv_path)[1])['mtime_ns'] == stat.st_mtime_ns + 10 ** 9
+
+
+def test_snapshot_writes_leave_no_temporary_files(csv_path):
+    load_cleaned_data(csv_path)
+    pd.read_csv(csv_path).iloc[:10].to_csv(csv_path, index=False)
+    load_cleaned_data(csv_path)
+    assert not [name for name in os.listdir(os.path.dirname(csv_path)) if name.endswith('.tmp')]
@@ -0,0 +1,43 @@
+"""
+Tests for the inequality gap metrics in gap_metrics.py
+"""
+
+import numpy as np
+import pytest
+
+from gap_metrics import GAP_COLUMNS, GAP_DEFINITIONS, compute_gaps, gap_value
+from obesity_data_cleaning import METRIC_COLUMNS
+
+
+def group_row(df, year, category, subcategory):
+    return df[(df['Country'] == 'India') & (df['Survey_Year'] == year)
+              & (df['Category'] == category) & (df['Subcategory'] == subcategory)].iloc[0]
+
+
+@pytest.mark.parametrize('metric', METRIC_COLUMNS)
+def test_urban_rural_matches_dashboard_formula(df, metric):
+    urban_2019 = group_row(df, 2019, 'Residence', 'Urban')
+    rural_2019 = group_row(df, 2019, 'Residence', 'Rural')
+    expected = ((urban_2019[metric] / rural_2019[metric]) - 1) * 100
+    
+    gaps = compute_gaps(df)
+    assert gap_value(gaps, 'urban_rural', metric, 2019) == pytest.approx(expected)
+    assert gap_value(gaps, 'urban_rural', metric, 2019, 'Difference') == pytest.approx(
+        urban_2019[metric] - rural_2019[metric])
+
+
+def test_every_gap_and_round_has_a_row(df):
+    gaps = compute_gaps(df)
+    assert list(gaps.columns) == GAP_COLUMNS
+    rounds = df[['Country', 'Survey_Year']].drop_duplicates()
+    assert len(gaps) == len(rounds) * len(METRIC_COLUMNS) * len(GAP_DEFINITIONS)
+    assert not gaps.duplicated(['Country', 'Survey_Year', 'Gap', 'Metric']).any()
+
+
+def test_missing_group_gives_nan(df):
+    without_rural = df[~((df['Survey_Year'] == 2019) & (df['Subcategory'] == 'Rural'))]
+    gaps = compute_gaps(without_rural, ['Women_Overweight_Pct'])
+    for column in ['Low_Value', 'Difference', 'Ratio', 'Pct_Higher']:
+        assert np.isnan(gap_value(gaps, 'urban_rural', 'Women_Overweight_Pct', 2019, column))
+    assert not np.isnan(gap_value(gaps, 'urban_rural', 'Women_Overweight_Pct', 2015))
+    assert not np.isnan(gap_value(gaps, 'richest_poorest', 'Women_Overweight_Pct', 2019))
@@ -0,0 +1,91 @@
+"""
+Tests for the geography tree in geography.py
+"""
+
+import contextlib
+import io
+
+import pandas as pd
+import pytest
+
+from geography import GeographyTree
+from obesity_data_cleaning import (
+    add_derived_columns,
+    create_clean_column_names,
+    reorder_columns,
+    split_characteristic_column,
+)
+
+# Aurangabad is a district of both Bihar and Maharashtra
+DISTRICT_ROWS = [
+    ('States : Bihar (L1)', 20.0),
+    ('Districts : Aurangabad (L2)', 10.0),
+    ('Districts : Patna (L2)', 30.0),
+    ('States : Maharashtra (L1)', 25.0),
+    ('Districts : Aurangabad (L2)', 40.0),
+    ('Districts : Pune (L2)', 50.0),
+]
+
+
+def clean_rows(rows, survey='2019-21 DHS'):
+    raw = pd.DataFrame({
+        'Country': 'India',
+        'Survey': survey,
+        'Characteristic': [characteristic for characteristic, _ in rows],
+        'Children overweight': None,
+        'Women who are overweight or obese according to BMI (>=25.0)': [value for _, value in rows],
+        'Men who are overweight or obese according to BMI (>=25.0)': None,
+    })
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = add_derived_columns(split_characteristic_column(raw))
+        df = reorder_columns(create_clean_column_names(df))
+    return df.astype({'Children_Overweight_Pct': 'float64', 'Men_Overweight_Pct': 'float64'})
+
+
+@pytest.fixture
+def tree():
+    return GeographyTree(clean_rows(DISTRICT_ROWS))
+
+
+def test_same_district_name_in_two_states(tree):
+    bihar = tree.unit('Bihar', 2019)
+    maharashtra = tree.unit('Maharashtra', 2019)
+    assert tree.children(tree.root('India', 2019)) == [bihar, maharashtra]
+    assert tree.children(maharashtra) == [('India', 2019, 'Maharashtra', 'Aurangabad'),
+                                          ('India', 2019, 'Maharashtra', 'Pune')]
+    
+    with pytest.raises(ValueError):
+        tree.unit('Aurangabad', 2019)
+    aurangabad = tree.unit('Aurangabad', 2019, parent='Maharashtra')
+    assert tree.parent(aurangabad) == maharashtra
+    assert tree.ancestors(aurangabad) == [maharashtra, tree.root('India', 2019)]
+    assert tree.row(aurangabad)['Women_Overweight_Pct'] == 40.0
+    assert tree.level(aurangabad) == 2
+    assert len(tree.find('Aurangabad', 2019)) == 2
+
+
+def test_units_and_descendants_below_a_parent(tree):
+    bihar = tree.unit('Bihar', 2019)
+    assert tree.units(level=2, year=2019, parent=bihar)['Geo_Name'].tolist() == ['Aurangabad', 'Patna']
+    assert [key[3] for key in tree.descendants(tree.root('India', 2019), level=2)] == \
+        ['Aurangabad', 'Patna', 'Aurangabad', 'Pune']
+
+
+def test_rollup_keeps_same_named_districts_apart(tree):
+    states = tree.rollup(metrics=['Women_Overweight_Pct'], level=1, year=2019)
+    assert states['Geo_Name'].tolist() == ['Bihar', 'Maharashtra']
+    assert states['Women_Overweight_Pct'].tolist() == [20.0, 45.0]
+    assert states['Units'].tolist() == [2, 2]
+    
+    country = tree.rollup(metrics=['Women_Overweight_Pct'], level=0, from_level=2, year=2019)
+    assert country[['Geo_Name', 'Units']].values.tolist() == [['India', 4]]
+
+
+def test_bundled_states_hang_off_the_country(df):
+    tree = GeographyTree(df)
+    for year in (2015, 2019):
+        states = tree.units(level=1, year=year)
+        children = tree.children(tree.root('India', year))
+        assert len(children) == 36
+        assert [key[3] for key in children] == states['Geo_Name'].tolist()
+        assert all(tree.parent(key) == tree.root('India', year) for key in children)
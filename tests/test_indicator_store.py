@@ -0,0 +1,47 @@
+"""
+Tests for the long-format indicator store in indicator_store.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicator_store import ALL_METRICS_FLAG, INDICATOR_REGISTRY, SERIES_KEY_COLUMNS, IndicatorStore
+
+SUBSET = ['women_overweight', 'men_overweight']
+
+
+@pytest.fixture(scope='module')
+def store(df):
+    return IndicatorStore.from_frame(df)
+
+
+def test_wide_round_trips_cleaned_frame(df, store):
+    pd.testing.assert_frame_equal(store.wide(), df)
+
+
+def test_long_holds_only_present_values(df, store):
+    long = store.long(SUBSET)
+    assert list(long.columns) == SERIES_KEY_COLUMNS + ['indicator', 'value']
+    for indicator_id in SUBSET:
+        column = INDICATOR_REGISTRY[indicator_id]['wide_column']
+        block = long[long['indicator'] == indicator_id]
+        np.testing.assert_array_equal(block['value'].to_numpy(), df[column].dropna().to_numpy())
+        pd.testing.assert_frame_equal(block[SERIES_KEY_COLUMNS].reset_index(drop=True),
+                                      df.loc[df[column].notna(), SERIES_KEY_COLUMNS].reset_index(drop=True))
+
+
+def test_wide_subset_pivots_only_chosen_indicators(df, store):
+    wide = store.wide(SUBSET)
+    values = [INDICATOR_REGISTRY[i]['wide_column'] for i in SUBSET]
+    flags = [INDICATOR_REGISTRY[i]['flag_column'] for i in SUBSET]
+    assert list(wide.columns) == SERIES_KEY_COLUMNS + values + flags + [ALL_METRICS_FLAG]
+    pd.testing.assert_frame_equal(wide[values + flags], df[values + flags])
+    np.testing.assert_array_equal(wide[ALL_METRICS_FLAG], df[values].notna().all(axis=1))
+
+
+def test_wide_without_flags_and_unknown_indicator(store):
+    assert list(store.wide(['children_overweight'], flags=False).columns) == SERIES_KEY_COLUMNS + [
+        'Children_Overweight_Pct']
+    with pytest.raises(KeyError):
+        store.long(['not_registered'])
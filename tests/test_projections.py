@@ -0,0 +1,33 @@
+"""
+Tests for the Student t quantiles behind the projection intervals in projections.py
+"""
+
+import numpy as np
+import pytest
+
+from projections import t_quantile
+
+# Published t table values (p, degrees of freedom, quantile)
+T_TABLE = [
+    (0.975, 1, 12.706204736),
+    (0.975, 2, 4.302652730),
+    (0.975, 3, 3.182446305),
+    (0.995, 3, 5.840909310),
+    (0.975, 4, 2.776445105),
+    (0.900, 5, 1.475884049),
+    (0.975, 10, 2.228138852),
+    (0.950, 20, 1.724718243),
+    (0.995, 30, 2.749995652),
+    (0.025, 3, -3.182446305),
+]
+
+
+@pytest.mark.parametrize('p, dof, expected', T_TABLE)
+def test_t_quantile_matches_table(p, dof, expected):
+    assert t_quantile(p, dof) == pytest.approx(expected, abs=1e-8)
+
+
+def test_t_quantile_array_of_dof():
+    quantiles = t_quantile(0.975, np.array([0, 3, 1, 3, 10]))
+    assert np.isnan(quantiles[0])
+    np.testing.assert_allclose(quantiles[1:], [3.182446305, 12.706204736, 3.182446305, 2.228138852], atol=1e-8)
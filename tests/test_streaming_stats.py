@@ -0,0 +1,87 @@
+"""
+Tests for the mergeable streaming statistics in streaming_stats.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from obesity_data_cleaning import METRIC_COLUMNS
+from streaming_stats import (
+    finalize_metric_stats,
+    merge_metric_stats,
+    new_metric_stats,
+    sketch_quantile,
+    update_metric_stats,
+)
+
+QUANTILES = [0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0]
+
+
+def chunked_stats(values, chunksize):
+    """Feed `values` in chunks into two accumulators (alternating) and merge them"""
+    first, second = new_metric_stats(), new_metric_stats()
+    for number, start in enumerate(range(0, len(values), chunksize)):
+        update_metric_stats(first if number % 2 == 0 else second, values[start:start + chunksize])
+    return merge_metric_stats(first, second)
+
+
+@pytest.mark.parametrize('metric', METRIC_COLUMNS)
+@pytest.mark.parametrize('chunksize', [1, 17, 1000])
+def test_chunked_and_merged_stats_match_pandas(bundled, metric, chunksize):
+    values = bundled[metric]
+    stats = chunked_stats(values.to_numpy(), chunksize)
+    summary = finalize_metric_stats(stats)
+    
+    assert summary['count'] == values.count()
+    assert summary['min'] == values.min()
+    assert summary['max'] == values.max()
+    assert summary['mean'] == pytest.approx(values.mean(), rel=1e-12)
+    assert summary['std'] == pytest.approx(values.std(), rel=1e-12)
+    
+    # One-decimal percentages: the median is exact, other quantiles within the bound
+    assert stats['out_of_range'] == 0
+    assert summary['median_error_bound'] == pytest.approx(0.05)
+    assert summary['median'] == pytest.approx(values.median(), abs=1e-9)
+    for q in QUANTILES:
+        assert abs(sketch_quantile(stats, q) - values.quantile(q)) <= summary['median_error_bound'] + 1e-9
+
+
+def test_merge_matches_single_accumulator(bundled):
+    values = bundled['Women_Overweight_Pct'].to_numpy()
+    single = update_metric_stats(new_metric_stats(), values)
+    merged = chunked_stats(values, 10)
+    
+    assert np.array_equal(single['histogram'], merged['histogram'])
+    assert merged['count'] == single['count']
+    assert merged['mean'] == pytest.approx(single['mean'], rel=1e-12)
+    assert merged['m2'] == pytest.approx(single['m2'], rel=1e-12)
+
+
+def test_missing_values_are_ignored():
+    stats = update_metric_stats(new_metric_stats(), [np.nan, 10.0, np.nan, 20.0])
+    summary = finalize_metric_stats(stats)
+    assert summary['count'] == 2
+    assert summary['mean'] == 15.0
+    assert summary['median'] == 15.0
+
+
+def test_out_of_range_values_void_the_error_bound():
+    stats = new_metric_stats()
+    update_metric_stats(stats, [10.0, 20.0])
+    assert finalize_metric_stats(stats)['median_error_bound'] == pytest.approx(0.05)
+    
+    other = update_metric_stats(new_metric_stats(), [-5.0, 30.0, 120.0])
+    merge_metric_stats(stats, other)
+    summary = finalize_metric_stats(stats)
+    assert stats['out_of_range'] == 2
+    assert summary['median_error_bound'] == np.inf
+    # Moments still use the exact values; only the sketch is clamped
+    assert summary['min'] == -5.0
+    assert summary['max'] == 120.0
+    assert summary['mean'] == pytest.approx(np.mean([10.0, 20.0, -5.0, 30.0, 120.0]))
+
+
+def test_merging_different_sketch_ranges_fails():
+    with pytest.raises(ValueError):
+        merge_metric_stats(new_metric_stats(), new_metric_stats(resolution=0.5))
@@ -0,0 +1,59 @@
+"""
+Tests for the batched trend estimation in trends.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from obesity_data_cleaning import METRIC_COLUMNS
+from trends import compute_trends, series_matrix
+
+
+def series_frame(series):
+    """A cleaned-style frame from {subcategory: {year: Women_Overweight_Pct}}"""
+    rows = [{'Country': 'India', 'Category': 'Test', 'Subcategory': subcategory, 'Survey_Year': year,
+             'Children_Overweight_Pct': np.nan, 'Women_Overweight_Pct': value, 'Men_Overweight_Pct': np.nan}
+            for subcategory, values in series.items() for year, value in values.items()]
+    return pd.DataFrame(rows)
+
+
+def test_slopes_match_polyfit_on_bundled_data(df):
+    trends = compute_trends(df)
+    keys, years, values = series_matrix(df)
+    assert len(trends) == len(keys)
+    
+    for row, slope in enumerate(trends['Slope']):
+        observed = ~np.isnan(values[row])
+        if observed.sum() < 2:
+            assert np.isnan(slope)
+            continue
+        assert slope == pytest.approx(np.polyfit(years[observed], values[row, observed], 1)[0], abs=1e-9)
+
+
+def test_slopes_match_polyfit_with_gaps():
+    series = {
+        'full': {1998: 10.0, 2005: 12.5, 2015: 17.0, 2019: 21.0},
+        'gap': {1998: 10.0, 2015: 16.0, 2019: 22.5},
+        'ends': {1998: 5.0, 2019: 9.0},
+        'single': {2015: 14.0},
+    }
+    trends = compute_trends(series_frame(series), metrics=['Women_Overweight_Pct']).set_index('Subcategory')
+    
+    for name in ['full', 'gap', 'ends']:
+        years, values = zip(*series[name].items())
+        assert trends.loc[name, 'Slope'] == pytest.approx(np.polyfit(years, values, 1)[0], abs=1e-12)
+        assert trends.loc[name, 'Points'] == len(years)
+    assert np.isnan(trends.loc['single', ['Slope', 'Absolute_Change', 'Relative_Change']].astype(float)).all()
+    
+    gap = trends.loc['gap']
+    assert (gap['First_Year'], gap['Last_Year']) == (1998, 2019)
+    assert gap['Absolute_Change'] == pytest.approx(12.5)
+    assert gap['Relative_Change'] == pytest.approx(1.25)
+    assert gap['Annualized_Growth'] == pytest.approx(2.25 ** (1 / 21) - 1)
+
+
+def test_every_metric_series_is_present(df):
+    trends = compute_trends(df)
+    assert set(trends['Metric']) == set(METRIC_COLUMNS)
+    assert not trends.duplicated(['Country', 'Category', 'Subcategory', 'Metric']).any()
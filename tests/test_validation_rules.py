@@ -0,0 +1,54 @@
+"""
+Tests for the declarative validation rules in validation_rules.py
+"""
+
+import pandas as pd
+import pytest
+
+from obesity_data_cleaning import VALIDATION_RULES
+from validation_rules import (
+    VIOLATION_COLUMNS,
+    evaluate_rules,
+    finish_rule_state,
+    is_frame_rule,
+    new_rule_state,
+    update_rule_state,
+)
+
+FRAME_RULES = [rule for rule in VALIDATION_RULES if is_frame_rule(rule)]
+
+
+@pytest.fixture(scope='module')
+def df(df):
+    """The bundled data with a few repeated rows, so both frame rules fire"""
+    repeats = df.iloc[[3, 3, 40, 200]]
+    return pd.concat([df, repeats], ignore_index=True)
+
+
+def sorted_violations(violations):
+    return violations.astype(str).sort_values(VIOLATION_COLUMNS).reset_index(drop=True)
+
+
+@pytest.mark.parametrize('chunksize', [1, 7, 100, 10000])
+def test_chunked_state_matches_whole_frame(df, chunksize):
+    state = new_rule_state(FRAME_RULES)
+    tables = [update_rule_state(state, df.iloc[start:start + chunksize], FRAME_RULES)
+              for start in range(0, len(df), chunksize)]
+    tables.append(finish_rule_state(state, FRAME_RULES))
+    chunked = pd.concat(tables, ignore_index=True)
+    
+    expected = evaluate_rules(df, FRAME_RULES)
+    assert set(expected['Rule']) == {'duplicate_key', 'state_vanished'}
+    pd.testing.assert_frame_equal(sorted_violations(chunked), sorted_violations(expected))
+
+
+def test_state_keeps_keys_not_rows(df):
+    state = new_rule_state(FRAME_RULES)
+    for start in range(0, len(df), 50):
+        update_rule_state(state, df.iloc[start:start + 50], FRAME_RULES)
+    
+    assert len(state['duplicate_key']['keys']) == len(df.drop_duplicates(['Country', 'Survey', 'Characteristic']))
+    units = state['state_vanished']['units']
+    expected_units = df.loc[df['Geo_Level'] == 1, units.columns.drop('Rows')]
+    assert len(units) == len(expected_units.drop_duplicates())
+    assert units['Rows'].sum() == len(expected_units)
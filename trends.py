@@ -0,0 +1,130 @@
+"""
+BATCHED TREND ESTIMATION
+India Obesity Dashboard
+
+Every (Country, Category, Subcategory, metric) series is stacked into one
+NumPy matrix with a column per survey year, NaN where a round has no
+value. All trend figures are then computed for every series at once:
+
+- slope: least-squares percentage points per year, from one batched
+  np.linalg.solve over the per-series 2×2 normal equations (missing rounds
+  get zero weight, so series with gaps are fitted on the rounds they have)
+- absolute_change / relative_change: last observed value vs first
+- annualized_growth: compound yearly growth between those two rounds
+
+    trends = compute_trends(load_cleaned_data())
+    rank_trends(trends, category='States', metric='Women_Overweight_Pct')
+"""
+
+import numpy as np
+import pandas as pd
+
+from obesity_data_cleaning import METRIC_COLUMNS
+
+SERIES_KEYS = ['Country', 'Category', 'Subcategory', 'Metric']
+
+
+def series_matrix(df, metrics=None):
+    """
+    Stack every series into a (series × survey years) matrix
+
+    Returns (keys, years, values): a DataFrame of SERIES_KEYS per matrix
+    row, the sorted survey years of the columns, and the float64 matrix.
+    Series with no values at all are left out.
+    """
+    metrics = metrics or METRIC_COLUMNS
+    long = df.melt(id_vars=['Country', 'Category', 'Subcategory', 'Survey_Year'], value_vars=metrics,
+                   var_name='Metric', value_name='Value')
+    long = long[long['Value'].notna() & long['Survey_Year'].notna()]
+
+    wide = long.pivot_table(index=SERIES_KEYS, columns='Survey_Year', values='Value',
+                            aggfunc='first', sort=True)
+    years = wide.columns.to_numpy(dtype='float64')
+    return wide.index.to_frame(index=False), years, wide.to_numpy(dtype='float64')
+
+
+def fit_lines(years, values):
+    """
+    Least-squares intercept and slope for every row of `values` at once
+
+    Missing values get zero weight. The fit is done on years centred on
+    their mean, so the returned intercept is the fitted value at
+    years.mean(). Rows with fewer than two distinct observed years get NaN.
+    Returns (intercept, slope, centre).
+    """
+    centre = years.mean() if len(years) else 0.0
+    t = years - centre
+    weight = ~np.isnan(values)
+    y = np.where(weight, values, 0.0)
+
+    # Per-series normal equations [[Σw, Σwt], [Σwt, Σwt²]] · [a, b] = [Σwy, Σwty]
+    sw = weight.sum(axis=1)
+    swt = weight @ t
+    swtt = weight @ (t * t)
+    normal = np.stack([np.stack([sw, swt], axis=-1), np.stack([swt, swtt], axis=-1)], axis=-2)
+    rhs = np.stack([y.sum(axis=1), y @ t], axis=-1)
+
+    solvable = np.abs(np.linalg.det(normal)) > 1e-9
+    solution = np.full((len(values), 2), np.nan)
+    if solvable.any():
+        solution[solvable] = np.linalg.solve(normal[solvable], rhs[solvable][..., None])[..., 0]
+    return solution[:, 0], solution[:, 1], centre
+
+
+def _first_last(years, values):
+    """Year and value of each row's first and last observation"""
+    if values.shape[1] == 0:
+        nan = np.full(len(values), np.nan)
+        return nan, nan, nan, nan
+
+    observed = ~np.isnan(values)
+    first = np.argmax(observed, axis=1)
+    last = values.shape[1] - 1 - np.argmax(observed[:, ::-1], axis=1)
+    rows = np.arange(len(values))
+    return years[first], values[rows, first], years[last], values[rows, last]
+
+
+def compute_trends(df, metrics=None):
+    """
+    Trend figures for every series, one row per (Country, Category, Subcategory, Metric)
+
+    Columns: Points, First_Year, First_Value, Last_Year, Last_Value,
+    Slope (points per year), Absolute_Change, Relative_Change (fraction),
+    Annualized_Growth (fraction per year). Changes need two rounds and
+    growth rates a non-zero first value; otherwise they are NaN.
+    """
+    keys, years, values = series_matrix(df, metrics)
+    _, slope, _ = fit_lines(years, values)
+    first_year, first_value, last_year, last_value = _first_last(years, values)
+
+    span = last_year - first_year
+    has_change = span > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        absolute = np.where(has_change, last_value - first_value, np.nan)
+        ratio = np.where(has_change & (first_value > 0), last_value / first_value, np.nan)
+        annualized = ratio ** (1 / span) - 1
+
+    trends = keys.copy()
+    trends['Points'] = (~np.isnan(values)).sum(axis=1)
+    trends['First_Year'] = pd.array(first_year, dtype='Int64')
+    trends['First_Value'] = first_value
+    trends['Last_Year'] = pd.array(last_year, dtype='Int64')
+    trends['Last_Value'] = last_value
+    trends['Slope'] = slope
+    trends['Absolute_Change'] = absolute
+    trends['Relative_Change'] = ratio - 1
+    trends['Annualized_Growth'] = annualized
+    return trends
+
+
+def rank_trends(trends, category='States', metric='Women_Overweight_Pct', by='Slope', ascending=False):
+    """Series of one category and metric, sorted by a trend column (fastest rising first)"""
+    selected = trends[(trends['Category'] == category) & (trends['Metric'] == metric)]
+    return selected.sort_values(by, ascending=ascending, kind='stable').reset_index(drop=True)
+
+
+def trend_for(trends, metric, category='Total', subcategory='Total', country='India'):
+    """The trend row for one series"""
+    match = trends[(trends['Country'] == country) & (trends['Category'] == category)
+                   & (trends['Subcategory'] == subcategory) & (trends['Metric'] == metric)]
+    return match.iloc[0]
@@ -0,0 +1,233 @@
+"""
+DECLARATIVE VALIDATION RULES
+Columnar checks for the cleaned obesity data
+
+A rule is a plain dict: a `name`, a `check` type, a `severity`, a
+`message`, and whatever parameters that check needs, e.g.
+
+    {'name': 'percentage_out_of_range', 'check': 'range',
+     'columns': ['Women_Overweight_Pct'], 'min': 0, 'max': 100,
+     'severity': 'error', 'message': 'percentage outside 0-100'}
+
+Every check evaluates to a boolean mask over the whole frame (comparisons,
+duplicated(), MultiIndex membership), never a Python loop over rows, and
+evaluate_rules() turns the masks into one violations table.
+
+Check types
+- range:      values of each of `columns` outside [min, max]
+- not_before: `column` < `other` (e.g. end year before start year)
+- unique:     rows sharing the same `columns` key
+- persists:   units at geography `level` that are missing from the next
+              survey round of the same country
+
+`range` and `not_before` only look at one row at a time, so they can run
+chunk by chunk. `unique` and `persists` compare rows with each other; to
+check them chunk by chunk, feed every chunk to update_rule_state() and
+call finish_rule_state() at the end. The running state holds only the
+keys those checks compare (a MultiIndex of every key seen for `unique`,
+a drop-duplicated table of units for `persists`), not the rows, so
+memory grows with the number of distinct keys and units rather than with
+the file. State updates are columnar too: isin() against the seen keys
+and duplicated() within the chunk.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Columns that identify a row in the violations table
+VIOLATION_KEY_COLUMNS = ['Country', 'Survey', 'Characteristic']
+
+VIOLATION_COLUMNS = ['Rule', 'Severity', 'Column', 'Value'] + VIOLATION_KEY_COLUMNS + ['Message']
+
+FRAME_CHECKS = {'unique', 'persists'}
+
+
+def _check_range(df, rule):
+    for col in rule['columns']:
+        values = df[col]
+        mask = (values < rule['min']) | (values > rule['max'])
+        yield col, mask.to_numpy(dtype=bool, na_value=False), values
+
+
+def _check_not_before(df, rule):
+    values = df[rule['column']]
+    mask = values < df[rule['other']]
+    yield rule['column'], mask.to_numpy(dtype=bool, na_value=False), values
+
+
+def _check_unique(df, rule):
+    columns = rule['columns']
+    mask = df.duplicated(columns, keep=False) & df[columns].notna().all(axis=1)
+    yield ' + '.join(columns), mask.to_numpy(dtype=bool), None
+
+
+def _check_persists(df, rule):
+    is_unit = (df['Geo_Level'] == rule['level']).to_numpy(dtype=bool, na_value=False)
+    units = df.loc[is_unit, ['Country', 'Survey_Year', 'Geo_Name']]
+
+    # Each round's next round, among rounds that report units at this level
+    rounds = units[['Country', 'Survey_Year']].drop_duplicates().sort_values(['Country', 'Survey_Year'])
+    rounds['Next_Year'] = rounds.groupby('Country')['Survey_Year'].shift(-1)
+    next_year = units.merge(rounds, on=['Country', 'Survey_Year'], how='left')['Next_Year']
+
+    present = pd.MultiIndex.from_frame(units)
+    expected = pd.MultiIndex.from_arrays([units['Country'].to_numpy(), next_year.to_numpy(),
+                                          units['Geo_Name'].to_numpy()])
+    vanished = next_year.notna().to_numpy() & ~expected.isin(present)
+
+    mask = np.zeros(len(df), dtype=bool)
+    mask[np.flatnonzero(is_unit)[vanished]] = True
+    yield 'Geo_Name', mask, df['Geo_Name']
+
+
+RULE_CHECKS = {
+    'range': _check_range,
+    'not_before': _check_not_before,
+    'unique': _check_unique,
+    'persists': _check_persists,
+}
+
+
+def is_frame_rule(rule):
+    """True if the rule compares rows with each other (cannot run per chunk)"""
+    return rule['check'] in FRAME_CHECKS
+
+
+def empty_violations():
+    return pd.DataFrame(columns=VIOLATION_COLUMNS)
+
+
+def _violation_table(rule, column, keys, values):
+    """Violations of one rule: `keys` holds the VIOLATION_KEY_COLUMNS of the offending rows"""
+    table = keys.reset_index(drop=True)
+    table.insert(0, 'Rule', rule['name'])
+    table.insert(1, 'Severity', rule['severity'])
+    table.insert(2, 'Column', column)
+    table.insert(3, 'Value', values)
+    table['Message'] = rule['message']
+    return table
+
+
+def _combine_violations(tables):
+    if not tables:
+        return empty_violations()
+    return pd.concat(tables, ignore_index=True)[VIOLATION_COLUMNS]
+
+
+def evaluate_rules(df, rules):
+    """Evaluate every rule over `df` and return one row per violation"""
+    tables = []
+    for rule in rules:
+        for column, mask, values in RULE_CHECKS[rule['check']](df, rule):
+            positions = np.flatnonzero(mask)
+            if len(positions) == 0:
+                continue
+            tables.append(_violation_table(
+                rule, column, df[VIOLATION_KEY_COLUMNS].iloc[positions],
+                None if values is None else values.iloc[positions].astype(object).to_numpy()
+            ))
+    return _combine_violations(tables)
+
+
+def _update_unique(state, df, rule):
+    """
+    Rows whose key was already seen, in this chunk or an earlier one
+
+    `state` holds every key seen so far (a MultiIndex), the violation key
+    of each one's first row, and whether that first row has been reported.
+    Returns the violation keys to report now: every repeat, plus a key's
+    first row on its first repeat.
+    """
+    columns = rule['columns']
+    rows = df[df[columns].notna().all(axis=1).to_numpy()]
+    keys = pd.MultiIndex.from_frame(rows[columns])
+    identities = rows[VIOLATION_KEY_COLUMNS].reset_index(drop=True)
+    if not state:
+        state.update(keys=keys[:0], first=identities.iloc[:0], reported=np.zeros(0, dtype=bool))
+
+    seen = keys.isin(state['keys'])
+    is_first = ~seen & ~keys.duplicated(keep='first')
+
+    # First rows of earlier chunks whose key repeats here for the first time
+    earlier = np.unique(state['keys'].get_indexer(keys[seen]))
+    earlier = earlier[~state['reported'][earlier]]
+    state['reported'][earlier] = True
+
+    # First rows of this chunk whose key repeats within it
+    reported_here = keys.duplicated(keep=False)[is_first]
+
+    found = pd.concat([state['first'].iloc[earlier], identities[is_first][reported_here], identities[~is_first]],
+                      ignore_index=True)
+    state['keys'] = state['keys'].append(keys[is_first])
+    state['first'] = pd.concat([state['first'], identities[is_first]], ignore_index=True)
+    state['reported'] = np.concatenate([state['reported'], reported_here])
+    return found
+
+
+# Columns of the `persists` state: the unit and the violation key of a row naming it
+PERSISTS_STATE_COLUMNS = list(dict.fromkeys(['Country', 'Survey_Year', 'Geo_Name'] + VIOLATION_KEY_COLUMNS))
+
+
+def _update_persists(state, df, rule):
+    """
+    Fold one chunk's units into the table of units seen so far
+
+    `state['units']` has one row per distinct unit row (PERSISTS_STATE_COLUMNS)
+    and how many times it occurred, so it grows with the number of units
+    rather than with the file.
+    """
+    is_unit = (df['Geo_Level'] == rule['level']).to_numpy(dtype=bool, na_value=False)
+    units = df.loc[is_unit, PERSISTS_STATE_COLUMNS].assign(Rows=1)
+    if 'units' in state:
+        units = pd.concat([state['units'], units], ignore_index=True)
+    state['units'] = units.groupby(PERSISTS_STATE_COLUMNS, dropna=False, sort=False)['Rows'].sum().reset_index()
+    return units.iloc[:0][VIOLATION_KEY_COLUMNS]
+
+
+def _finish_persists(state, rule):
+    """Violation keys and names of units missing from their country's next round"""
+    units = state.get('units', pd.DataFrame(columns=PERSISTS_STATE_COLUMNS + ['Rows']))
+    _, mask, _ = next(_check_persists(units.assign(Geo_Level=rule['level']), rule))
+    vanished = units[mask]
+    vanished = vanished.iloc[np.repeat(np.arange(len(vanished)), vanished['Rows'].to_numpy(dtype='int64'))]
+    return vanished[VIOLATION_KEY_COLUMNS], vanished['Geo_Name'].to_numpy()
+
+
+STATE_UPDATES = {
+    'unique': _update_unique,
+    'persists': _update_persists,
+}
+
+
+def new_rule_state(rules):
+    """Empty running state for the frame rules among `rules`"""
+    return {rule['name']: {} for rule in rules if is_frame_rule(rule)}
+
+
+def update_rule_state(state, df, rules):
+    """
+    Fold one chunk into the frame rules' running state
+
+    Returns the violations that are already certain (repeated `unique`
+    keys); `persists` is only decided by finish_rule_state().
+    """
+    tables = []
+    for rule in rules:
+        if not is_frame_rule(rule):
+            continue
+        keys = STATE_UPDATES[rule['check']](state[rule['name']], df, rule)
+        if len(keys):
+            tables.append(_violation_table(rule, ' + '.join(rule['columns']), keys, None))
+    return _combine_violations(tables)
+
+
+def finish_rule_state(state, rules):
+    """Violations that need every chunk to have been seen (vanished `persists` units)"""
+    tables = []
+    for rule in rules:
+        if rule['check'] != 'persists':
+            continue
+        keys, names = _finish_persists(state[rule['name']], rule)
+        if len(keys):
+            tables.append(_violation_table(rule, 'Geo_Name', keys, names))
+    return _combine_violations(tables)